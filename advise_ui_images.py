@@ -0,0 +1,298 @@
+import os
+import re
+import sys
+import json
+import argparse
+
+from import_eez_ui import DEFAULT_SOURCE_DIR
+from convert_ui_images import (COLOR_FORMATS, DECODER_FORMATS, MANIFEST_VERSION, analyze_images, describe_color,
+                               draw_target, file_images, load_image_libraries, lvgl_color_config, print_analysis,
+                               project_color_order, project_images, read_sdkconfig)
+
+# What the formats are called outside of LVGL 8, at LV_COLOR_DEPTH 16.
+# TRUE_COLOR_ALPHA is RGB565 with an alpha byte after every pixel
+FORMAT_LABELS = {"TRUE_COLOR": "RGB565", "TRUE_COLOR_ALPHA": "RGB565A8", "PNG": "PNG (lv_png)", "SJPG": "SJPG (lv_sjpg)"}
+# flash: smallest image, time: fastest draw, budget: fastest draws whose
+# images fit the flash left in the app partition
+POLICIES = ("flash", "time", "budget")
+DEFAULT_MANIFEST = "ui_image_formats.json"
+DATA_SIZE_RE = re.compile(r"^\s*\.data_size = (\d+),", re.M)
+SIZE_RE = re.compile(r"^(0x[0-9a-fA-F]+|\d+)([KM]?)$")
+
+
+def parse_size(value):
+    """
+    Parses a size of partitions.csv, e.g. '0x7E0000', '1M' or '64K'.
+
+    Returns:
+        int: Bytes, or None if the size is empty or not a number.
+    """
+    match = SIZE_RE.match(value.strip())
+    if not match:
+        return None
+    return int(match.group(1), 0) * {"": 1, "K": 1024, "M": 1024 * 1024}[match.group(2)]
+
+
+def app_partition(project_root="."):
+    """
+    Finds the largest app partition of the partition table of the project.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+
+    Returns:
+        tuple: (name, size in bytes), or None if there is no custom partition
+            table.
+    """
+    sdkconfig = read_sdkconfig(project_root)
+    table_file = os.path.join(project_root, sdkconfig.get("CONFIG_PARTITION_TABLE_CUSTOM_FILENAME", "partitions.csv"))
+    if not os.path.isfile(table_file):
+        return None
+    apps = []
+    with open(table_file, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = [field.strip() for field in line.split("#")[0].split(",")]
+            if len(fields) >= 5 and fields[1] == "app" and parse_size(fields[4]):
+                apps.append((fields[0], parse_size(fields[4])))
+    return max(apps, key=lambda app: app[1]) if apps else None
+
+
+def built_app_size(project_root="."):
+    """
+    Finds the size of the app binary of the last build.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+
+    Returns:
+        int: Bytes, or None if the project wasn't built.
+    """
+    description_file = os.path.join(project_root, "build", "project_description.json")
+    if not os.path.isfile(description_file):
+        return None
+    with open(description_file, "r", encoding="utf-8") as f:
+        description = json.load(f)
+    app_bin = os.path.join(description.get("build_dir", os.path.join(project_root, "build")), description.get("app_bin", ""))
+    return os.path.getsize(app_bin) if os.path.isfile(app_bin) else None
+
+
+def linked_image_size(source_dir):
+    """
+    Adds up the pixel data of the ui_image_<name>.c files in the source
+    directory, which the last build linked into the app.
+
+    Args:
+        source_dir: Path to the UI source directory.
+
+    Returns:
+        int: Bytes.
+    """
+    total = 0
+    if os.path.isdir(source_dir):
+        for file in sorted(os.listdir(source_dir)):
+            if re.fullmatch(r"ui_image_\w+\.c", file):
+                with open(os.path.join(source_dir, file), "r", encoding="utf-8", errors="replace") as f:
+                    total += sum(int(size) for size in DATA_SIZE_RE.findall(f.read()))
+    return total
+
+
+def image_budget(project_root=".", source_dir=DEFAULT_SOURCE_DIR):
+    """
+    Computes the flash the images may use: the app partition minus the app
+    without its images.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+        source_dir: Path to the UI source directory.
+
+    Returns:
+        dict: 'partition' (name), 'partition_size', 'app_size' (None if the
+            project wasn't built), 'linked_images' and 'budget' (None if it
+            can't be computed).
+    """
+    partition = app_partition(project_root)
+    app_size = built_app_size(project_root)
+    linked = linked_image_size(source_dir)
+    budget = None
+    if partition and app_size is not None:
+        budget = partition[1] - (app_size - linked)
+    return {"partition": partition[0] if partition else None, "partition_size": partition[1] if partition else None,
+            "app_size": app_size, "linked_images": linked, "budget": budget}
+
+
+def enabled_decoders(project_root="."):
+    """
+    Returns the DECODER_FORMATS whose LVGL option is enabled in the sdkconfig.
+    """
+    sdkconfig = read_sdkconfig(project_root)
+    return tuple(name for name in DECODER_FORMATS if sdkconfig.get(f"CONFIG_{COLOR_FORMATS[name]['option']}") == "y")
+
+
+def pick_formats(analyses, policy, budget=None, max_error=None):
+    """
+    Picks the format of every image.
+
+    The budget policy starts with the fastest format of every image. While
+    the images don't fit, it moves the image that loses the least draw time
+    per byte saved to its next smaller format.
+
+    Args:
+        analyses: Result of analyze_images().
+        policy: One of POLICIES.
+        budget: Flash in bytes the images may use, for the budget policy.
+        max_error: Largest channel error a format may have, None allows
+            lossless formats only.
+
+    Returns:
+        tuple: (dict of image name -> chosen candidate, True if the images fit
+            the budget or there is none)
+    """
+    options = {}
+    for name, analysis, before in analyses:
+        if before is None:
+            continue
+        options[name] = [candidate for candidate in analysis["candidates"] if candidate["error"] <= (max_error or 0)]
+    if policy == "flash":
+        return {name: min(candidates, key=lambda c: (c["size"], c["draw_us"])) for name, candidates in options.items()}, True
+    chosen = {name: min(candidates, key=lambda c: (c["draw_us"], c["size"])) for name, candidates in options.items()}
+    if policy == "time" or budget is None:
+        return chosen, True
+    total = sum(candidate["size"] for candidate in chosen.values())
+    while total > budget:
+        best = None
+        for name, candidates in options.items():
+            current = chosen[name]
+            for candidate in candidates:
+                saved = current["size"] - candidate["size"]
+                if saved <= 0:
+                    continue
+                cost = (candidate["draw_us"] - current["draw_us"]) / saved
+                if best is None or (cost, -saved) < best[0]:
+                    best = ((cost, -saved), name, candidate)
+        if best is None:
+            return chosen, False
+        _, name, candidate = best
+        total -= chosen[name]["size"] - candidate["size"]
+        chosen[name] = candidate
+    return chosen, True
+
+
+def manifest_content(chosen, policy, budget, color, max_error=None):
+    """
+    Builds the manifest convert_ui_images.py reads with --manifest.
+
+    Args:
+        chosen: Image name -> chosen candidate, see pick_formats().
+        policy: Policy the formats were picked with.
+        budget: Flash budget in bytes, or None.
+        color: Color settings the images were analyzed for.
+        max_error: Max error the images were analyzed with.
+
+    Returns:
+        dict: Content of the manifest.
+    """
+    return {
+        "version": MANIFEST_VERSION,
+        "policy": policy,
+        "budget": budget,
+        "color": describe_color(color),
+        "images": {name: {"format": candidate["format"],
+                          # The converter quantizes with the same bound, so it gets the same palette
+                          "max_error": max_error if COLOR_FORMATS[candidate["format"]]["kind"] == "indexed" else None,
+                          "size": candidate["size"],
+                          "draw_us": round(candidate["draw_us"], 1),
+                          "ram": candidate["ram"]}
+                   for name, candidate in sorted(chosen.items())},
+    }
+
+
+def print_advice(chosen, budget_info, policy, fits):
+    """
+    Prints the chosen format of every image and the totals.
+
+    Args:
+        chosen: Image name -> chosen candidate, see pick_formats().
+        budget_info: Result of image_budget().
+        policy: Policy the formats were picked with.
+        fits: Whether the images fit the budget.
+    """
+    print(f"\nFormats picked for {policy}:")
+    print(f"  {'image':<24} {'format':<18} {'as':<15} {'size':>11} {'draw':>11} {'heap':>11}  quality")
+    for name, candidate in sorted(chosen.items()):
+        error = f"error {candidate['error']}" if candidate["error"] else "lossless"
+        print(f"  {name:<24} {candidate['format']:<18} {FORMAT_LABELS.get(candidate['format'], ''):<15} "
+              f"{candidate['size'] / 1024:>8.1f} KB {candidate['draw_us'] / 1000:>8.2f} ms "
+              f"{candidate['ram'] / 1024:>8.1f} KB  {error}")
+    total = sum(candidate["size"] for candidate in chosen.values())
+    draw = sum(candidate["draw_us"] for candidate in chosen.values())
+    print(f"  {'total':<24} {'':<18} {'':<15} {total / 1024:>8.1f} KB {draw / 1000:>8.2f} ms")
+    if budget_info["partition"]:
+        print(f"\nApp partition '{budget_info['partition']}': {budget_info['partition_size'] / 1024:.0f} KB")
+    if budget_info["app_size"] is not None:
+        print(f"Last build: {budget_info['app_size'] / 1024:.1f} KB with {budget_info['linked_images'] / 1024:.1f} KB of images")
+    if policy == "budget":
+        print(f"Flash budget of the images: {budget_info['budget'] / 1024:.1f} KB")
+    if not fits:
+        print("ERROR: The images don't fit the budget, even in their smallest formats. "
+              "Allow lossy formats with --max-error or raise the budget.")
+
+
+def main():
+    """
+    Main function to run the advisor with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Pick the LVGL format of every image by flash size and estimated draw time, and write a manifest for convert_ui_images.py')
+    parser.add_argument('inputs', nargs='+', help='.eez-project file, or PNG/JPEG files and directories')
+    parser.add_argument('-p', '--policy', choices=POLICIES, default='budget', help='flash: smallest images, time: fastest draws, budget: fastest draws that fit the flash left in the app partition (default)')
+    parser.add_argument('--budget', type=int, default=None, metavar='KB', help='Flash the images may use, instead of the app partition minus the built app')
+    parser.add_argument('-e', '--max-error', type=int, default=None, metavar='N', help='Allow quantized and JPEG formats that change no color channel by more than N (0-255)')
+    parser.add_argument('--decoders', choices=['auto', 'all', 'none'], default='auto', help='Consider PNG and SJPG: auto if LV_USE_PNG/LV_USE_SJPG are enabled in the sdkconfig, all, or none')
+    parser.add_argument('-o', '--output', default=DEFAULT_MANIFEST, help=f'Manifest to write (default: {DEFAULT_MANIFEST})')
+    parser.add_argument('-s', '--source-dir', default=DEFAULT_SOURCE_DIR, help=f'UI source directory with the images of the last build (default: {DEFAULT_SOURCE_DIR})')
+    parser.add_argument('--color-order', choices=['auto', 'rgb', 'bgr'], default='auto', help='Channel order of the panel (default: auto, RGB like LVGL)')
+    parser.add_argument('--project-root', default='.', help='ESP-IDF project with the sdkconfig and partitions.csv (default: .)')
+    parser.add_argument('-a', '--analyze', action='store_true', help='Also print every format of every image')
+    args = parser.parse_args()
+
+    try:
+        load_image_libraries()
+    except ImportError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    project_file = args.inputs[0] if args.inputs[0].endswith(".eez-project") else None
+    color = lvgl_color_config(args.project_root, project_color_order(project_file, args.color_order))
+    if project_file:
+        images = project_images(project_file) + file_images(args.inputs[1:])
+    else:
+        images = file_images(args.inputs)
+    decoders = {"auto": enabled_decoders(args.project_root), "all": DECODER_FORMATS, "none": ()}[args.decoders]
+    target = draw_target(args.project_root)
+    budget_info = image_budget(args.project_root, args.source_dir)
+    if args.budget is not None:
+        budget_info["budget"] = args.budget * 1024
+    if args.policy == "budget" and budget_info["budget"] is None:
+        print("ERROR: The flash left for images is unknown, build the project with 'idf.py build' or set --budget <KB>.")
+        sys.exit(1)
+
+    analyses = analyze_images(images, color, args.max_error, target, decoders)
+    if args.analyze:
+        print_analysis(analyses, target)
+    for name, error, before in analyses:
+        if before is None:
+            print(f"ERROR: Could not analyze '{name}': {error}")
+    chosen, fits = pick_formats(analyses, args.policy, budget_info["budget"], args.max_error)
+    print_advice(chosen, budget_info, args.policy, fits)
+    skipped = [name for name in DECODER_FORMATS if name not in decoders]
+    if skipped:
+        print(f"Not considered: {', '.join(skipped)} (enable "
+              + " / ".join(f"CONFIG_{COLOR_FORMATS[name]['option']}" for name in skipped) + " or use --decoders all).")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(manifest_content(chosen, args.policy, budget_info["budget"], color, args.max_error), f, indent=2)
+    print(f"\nManifest saved to {args.output}. Convert with 'convert_ui_images.py --manifest {args.output}' "
+          f"or set 'image_manifest = {args.output}' in the import config.")
+    sys.exit(0 if fits and all(before is not None for _, _, before in analyses) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+import os
+import shutil
+import argparse
+import subprocess
+import sys
+import json
+import time
+import tempfile
+
+# Path of the importer that is benchmarked
+IMPORTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_eez_ui.py")
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backup", "templates")
+
+# File the results of every run are appended to
+DEFAULT_HISTORY_FILE = "benchmark_results.jsonl"
+
+# Importer modes that are benchmarked. 'all' runs the full default pipeline.
+BENCHMARK_MODES = ['copy-ui', 'fix-headers', 'fix-actions', 'all']
+
+# Export sizes, from the example project to a large production HMI
+PRESETS = {
+    'tiny': {'screens': 1, 'widgets': 4, 'images': 0, 'image_size': 0, 'actions': 0},
+    'small': {'screens': 10, 'widgets': 20, 'images': 10, 'image_size': 16 * 1024, 'actions': 10},
+    'medium': {'screens': 50, 'widgets': 40, 'images': 50, 'image_size': 64 * 1024, 'actions': 50},
+    'production': {'screens': 200, 'widgets': 60, 'images': 200, 'image_size': 128 * 1024, 'actions': 200},
+}
+
+HEADER_TEMPLATE = """#ifndef EEZ_LVGL_UI_{guard}_H
+#define EEZ_LVGL_UI_{guard}_H
+
+#include <lvgl/lvgl.h>
+
+#ifdef __cplusplus
+extern "C" {{
+#endif
+
+{body}
+
+#ifdef __cplusplus
+}}
+#endif
+
+#endif /*EEZ_LVGL_UI_{guard}_H*/
+"""
+
+
+def generate_screen(index, widgets):
+    """
+    Generates the create_screen_* and tick_screen_* functions of one screen.
+
+    The code follows the structure of the EEZ-Studio LVGL 8.3 output: a screen
+    object with a tabview holding tabs with flex styles, labels and buttons.
+
+    Args:
+        index: Number of the screen.
+        widgets: Number of labels and buttons on the screen.
+
+    Returns:
+        tuple: (C source of the screen, names of the objects stored in objects_t)
+    """
+    name = f"screen_{index}"
+    objects = [name]
+    lines = [
+        f"void create_screen_{name}() {{",
+        "    lv_obj_t *obj = lv_obj_create(0);",
+        f"    objects.{name} = obj;",
+        "    lv_obj_set_pos(obj, 0, 0);",
+        "    lv_obj_set_size(obj, 800, 480);",
+        "    {",
+        "        lv_obj_t *parent_obj = obj;",
+        "        {",
+        "            lv_obj_t *obj = lv_tabview_create(parent_obj, LV_DIR_TOP, 75);",
+        "            lv_obj_set_pos(obj, 0, 0);",
+        "            lv_obj_set_size(obj, LV_PCT(100), LV_PCT(100));",
+        "            {",
+        "                lv_obj_t *parent_obj = obj;",
+        "                {",
+        f"                    lv_obj_t *obj = lv_tabview_add_tab(parent_obj, \"Tab {index}\");",
+        "                    lv_obj_set_style_layout(obj, LV_LAYOUT_FLEX, LV_PART_MAIN | LV_STATE_DEFAULT);",
+        "                    lv_obj_set_style_flex_flow(obj, LV_FLEX_FLOW_ROW, LV_PART_MAIN | LV_STATE_DEFAULT);",
+        "                    lv_obj_set_style_flex_main_place(obj, LV_FLEX_ALIGN_CENTER, LV_PART_MAIN | LV_STATE_DEFAULT);",
+        "                    lv_obj_set_style_flex_track_place(obj, LV_FLEX_ALIGN_CENTER, LV_PART_MAIN | LV_STATE_DEFAULT);",
+        "                    {",
+        "                        lv_obj_t *parent_obj = obj;",
+    ]
+    for widget in range(widgets):
+        if widget % 2 == 0:
+            label = f"label_{index}_{widget}"
+            objects.append(label)
+            lines += [
+                "                        {",
+                f"                            // {label}",
+                "                            lv_obj_t *obj = lv_label_create(parent_obj);",
+                f"                            objects.{label} = obj;",
+                f"                            lv_obj_set_pos(obj, {widget * 10 % 800}, {widget * 7 % 480});",
+                "                            lv_obj_set_size(obj, LV_SIZE_CONTENT, LV_SIZE_CONTENT);",
+                f"                            lv_label_set_text(obj, \"Label {widget} on screen {index}\");",
+                "                        }",
+            ]
+        else:
+            lines += [
+                "                        {",
+                "                            lv_obj_t *obj = lv_btn_create(parent_obj);",
+                f"                            lv_obj_set_pos(obj, {widget * 10 % 800}, {widget * 7 % 480});",
+                "                            lv_obj_set_size(obj, 100, 50);",
+                "                            lv_obj_add_flag(obj, LV_OBJ_FLAG_SCROLL_ON_FOCUS);",
+                "                            lv_obj_clear_flag(obj, LV_OBJ_FLAG_SCROLLABLE);",
+                "                        }",
+            ]
+    lines += [
+        "                    }",
+        "                }",
+        "            }",
+        "        }",
+        "    }",
+        "}",
+        "",
+        f"void tick_screen_{name}() {{",
+        "}",
+        "",
+    ]
+    return "\n".join(lines), objects
+
+
+def generate_image(index, size):
+    """
+    Generates the C source of one LVGL 8.3 image with `size` bytes of pixel data.
+
+    Args:
+        index: Number of the image.
+        size: Size of the pixel data in bytes (RGB565, 2 bytes per pixel).
+
+    Returns:
+        str: C source of the image.
+    """
+    width = 100
+    height = max(1, size // (width * 2))
+    data = bytes((index + i) & 0xFF for i in range(256)) * (size // 256 + 1)
+    rows = []
+    for offset in range(0, size, 16):
+        rows.append("    " + ", ".join(f"0x{b:02x}" for b in data[offset:offset + 16]) + ",")
+    return (
+        "#ifdef __has_include\n"
+        "    #if __has_include(\"lvgl.h\")\n"
+        "        #ifndef LV_LVGL_H_INCLUDE_SIMPLE\n"
+        "            #define LV_LVGL_H_INCLUDE_SIMPLE\n"
+        "        #endif\n"
+        "    #endif\n"
+        "#endif\n\n"
+        "#include \"lvgl/lvgl.h\"\n\n"
+        f"const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_LARGE_CONST uint8_t img_{index}_map[] = {{\n"
+        + "\n".join(rows) + "\n};\n\n"
+        f"const lv_img_dsc_t img_img_{index} = {{\n"
+        "    .header.always_zero = 0,\n"
+        f"    .header.w = {width},\n"
+        f"    .header.h = {height},\n"
+        f"    .data_size = sizeof(img_{index}_map),\n"
+        "    .header.cf = LV_IMG_CF_TRUE_COLOR,\n"
+        f"    .data = img_{index}_map,\n"
+        "};\n"
+    )
+
+
+def generate_export(directory, screens, widgets, images, image_size, actions):
+    """
+    Writes a synthetic EEZ-Studio export (the src/ui folder) to a directory.
+
+    Args:
+        directory: Directory to write the export to. Created if it doesn't exist.
+        screens: Number of screens in screens.c.
+        widgets: Number of widgets per screen.
+        images: Number of image .c files.
+        image_size: Size of the pixel data of every image in bytes.
+        actions: Number of extern action functions in actions.h.
+
+    Returns:
+        int: Total size of the export in bytes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+
+    screen_sources = []
+    objects = []
+    for index in range(screens):
+        source, screen_objects = generate_screen(index, widgets)
+        screen_sources.append(source)
+        objects += screen_objects
+    files["screens.c"] = (
+        "#include <string.h>\n\n"
+        "#include \"screens.h\"\n#include \"images.h\"\n#include \"fonts.h\"\n"
+        "#include \"actions.h\"\n#include \"vars.h\"\n#include \"styles.h\"\n#include \"ui.h\"\n\n"
+        "objects_t objects;\nlv_obj_t *tick_value_change_obj;\n\n"
+        + "\n".join(screen_sources)
+        + "\nvoid create_screens() {\n"
+        "    lv_disp_t *dispp = lv_disp_get_default();\n"
+        "    lv_theme_t *theme = lv_theme_default_init(dispp, lv_palette_main(LV_PALETTE_BLUE), "
+        "lv_palette_main(LV_PALETTE_RED), true, LV_FONT_DEFAULT);\n"
+        "    lv_disp_set_theme(dispp, theme);\n    \n"
+        + "".join(f"    create_screen_screen_{index}();\n" for index in range(screens))
+        + "}\n\ntypedef void (*tick_screen_func_t)();\n\ntick_screen_func_t tick_screen_funcs[] = {\n"
+        + "".join(f"    tick_screen_screen_{index},\n" for index in range(screens))
+        + "};\n\nvoid tick_screen(int screen_index) {\n    tick_screen_funcs[screen_index]();\n}\n"
+    )
+    files["screens.h"] = HEADER_TEMPLATE.format(guard="SCREENS", body=(
+        "typedef struct _objects_t {\n"
+        + "".join(f"    lv_obj_t *{name};\n" for name in objects)
+        + "} objects_t;\n\nextern objects_t objects;\n\nenum ScreensEnum {\n"
+        + "".join(f"    SCREEN_ID_SCREEN_{index} = {index + 1},\n" for index in range(screens))
+        + "};\n\n"
+        + "".join(f"void create_screen_screen_{index}();\nvoid tick_screen_screen_{index}();\n"
+                  for index in range(screens))
+        + "\nvoid create_screens();\nvoid tick_screen(int screen_index);\n"
+    ))
+    files["actions.h"] = HEADER_TEMPLATE.format(guard="EVENTS", body="".join(
+        f"extern void action_{index}(lv_event_t * e);\n" for index in range(actions)))
+
+    for index in range(images):
+        files[f"ui_image_img_{index}.c"] = generate_image(index, image_size)
+    files["images.h"] = HEADER_TEMPLATE.format(guard="IMAGES", body=(
+        "".join(f"extern const lv_img_dsc_t img_img_{index};\n" for index in range(images))
+        + "\n#ifndef EXT_IMG_DESC_T\n#define EXT_IMG_DESC_T\ntypedef struct _ext_img_desc_t {\n"
+        "    const char *name;\n    const lv_img_dsc_t *img_dsc;\n} ext_img_desc_t;\n#endif\n\n"
+        f"extern const ext_img_desc_t images[{max(images, 1)}];\n"
+    ))
+    files["images.c"] = (
+        f"#include \"images.h\"\n\nconst ext_img_desc_t images[{max(images, 1)}] = {{\n"
+        + ("".join(f"    {{ \"img_{index}\", &img_img_{index} }},\n" for index in range(images)) or "    0\n")
+        + "};\n"
+    )
+    for name, guard in [("fonts.h", "FONTS"), ("styles.h", "STYLES"), ("vars.h", "VARS")]:
+        files[name] = HEADER_TEMPLATE.format(guard=guard, body="")
+    files["styles.c"] = "#include \"styles.h\"\n#include \"images.h\"\n#include \"fonts.h\"\n\n#include \"screens.h\"\n"
+    files["ui.h"] = HEADER_TEMPLATE.format(guard="GUI", body=(
+        "#include \"screens.h\"\n\nvoid ui_init();\nvoid ui_tick();\n\nvoid loadScreen(enum ScreensEnum screenId);\n"))
+    files["ui.c"] = (
+        "#include \"ui.h\"\n#include \"screens.h\"\n#include \"images.h\"\n#include \"actions.h\"\n#include \"vars.h\"\n\n"
+        "#include <string.h>\n\nstatic int16_t currentScreen = -1;\n\n"
+        "static lv_obj_t *getLvglObjectFromIndex(int32_t index) {\n    if (index == -1) {\n        return 0;\n    }\n"
+        "    return ((lv_obj_t **)&objects)[index];\n}\n\n"
+        "void loadScreen(enum ScreensEnum screenId) {\n    currentScreen = screenId - 1;\n"
+        "    lv_obj_t *screen = getLvglObjectFromIndex(currentScreen);\n"
+        "    lv_scr_load_anim(screen, LV_SCR_LOAD_ANIM_FADE_IN, 200, 0, false);\n}\n\n"
+        "void ui_init() {\n    create_screens();\n    loadScreen(SCREEN_ID_SCREEN_0);\n}\n\n"
+        "void ui_tick() {\n    tick_screen(currentScreen);\n}\n"
+    )
+
+    total_size = 0
+    for name, content in files.items():
+        data = content.encode("utf-8")
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+        total_size += len(data)
+    return total_size
+
+
+def create_workspace(workspace, export_dir):
+    """
+    Creates a project directory the importer can run in.
+
+    Args:
+        workspace: Directory of the project. Must not exist yet.
+        export_dir: Path of the synthetic export used as source directory.
+    """
+    shutil.copytree(TEMPLATES_DIR, os.path.join(workspace, "backup", "templates"))
+    os.makedirs(os.path.join(workspace, "components", "ui"))
+    with open(os.path.join(workspace, ".ui_import_config"), "w") as f:
+        f.write("[ImportSettings]\n"
+                f"source_dir = {export_dir}\n"
+                "project_dir = ./components/ui\n"
+                "backup_dir = ./backup/ui\n"
+                "user_selected_modes = all\n")
+
+
+def run_importer(workspace, mode):
+    """
+    Runs the importer in a workspace and measures it.
+
+    Args:
+        workspace: Project directory to run the importer in.
+        mode: Importer mode, or 'all' to run the default pipeline.
+
+    Returns:
+        dict: Wall time of the whole process and the importer's own stage report.
+    """
+    report_file = os.path.join(workspace, "import_report.json")
+    command = [sys.executable, IMPORTER, "--report", report_file]
+    if mode != "all":
+        command += ["-m", mode]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=workspace, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            stdin=subprocess.DEVNULL, text=True)
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout)
+        print(f"ERROR: '{' '.join(command)}' failed with exit code {result.returncode}")
+        sys.exit(1)
+    report = {}
+    if os.path.isfile(report_file):
+        with open(report_file, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        os.remove(report_file)
+    return {"seconds": seconds, "stages": report.get("stages", [])}
+
+
+def benchmark_mode(export_dir, mode, repeat):
+    """
+    Times one importer mode cold and warm.
+
+    Cold runs start from a fresh workspace (for fix modes, one that only had
+    copy-ui run on it). Warm runs repeat the mode on the same, unchanged
+    workspace, which is what a no-op re-import costs. The fastest of `repeat`
+    runs is kept for both.
+
+    Args:
+        export_dir: Path of the synthetic export.
+        mode: Importer mode to time.
+        repeat: Number of runs.
+
+    Returns:
+        dict: The cold and warm measurements.
+    """
+    cold = []
+    warm = []
+    for _ in range(repeat):
+        workspace = tempfile.mkdtemp(prefix="eez_bench_")
+        try:
+            project = os.path.join(workspace, "project")
+            create_workspace(project, export_dir)
+            if mode.startswith("fix-"):
+                run_importer(project, "copy-ui")
+            cold.append(run_importer(project, mode))
+            warm.append(run_importer(project, mode))
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+    return {
+        "cold": min(cold, key=lambda run: run["seconds"]),
+        "warm": min(warm, key=lambda run: run["seconds"]),
+    }
+
+
+def main():
+    """
+    Main function to run the benchmark with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark import_eez_ui.py on synthetic EEZ-Studio exports')
+    parser.add_argument('-p', '--preset', choices=sorted(PRESETS), default='small', help='Export size preset')
+    parser.add_argument('--screens', type=int, help='Number of screens in screens.c')
+    parser.add_argument('--widgets', type=int, help='Number of widgets per screen')
+    parser.add_argument('--images', type=int, help='Number of image .c files')
+    parser.add_argument('--image-size', type=int, help='Pixel data size of every image in bytes')
+    parser.add_argument('--actions', type=int, help='Number of extern functions in actions.h')
+    parser.add_argument('-m', '--modes', default=",".join(BENCHMARK_MODES), help='Comma separated importer modes to time')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per mode, the fastest is kept')
+    parser.add_argument('--history', default=DEFAULT_HISTORY_FILE, help='File the results are appended to (JSON lines)')
+    parser.add_argument('--no-history', action='store_true', help='Do not record the results')
+    args = parser.parse_args()
+
+    scale = dict(PRESETS[args.preset])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    modes = [mode for mode in args.modes.split(",") if mode]
+
+    export_root = tempfile.mkdtemp(prefix="eez_export_")
+    try:
+        export_dir = os.path.join(export_root, "src", "ui")
+        export_size = generate_export(export_dir, **scale)
+        print(f"\nSynthetic export ({args.preset}): {scale['screens']} screens x {scale['widgets']} widgets, "
+              f"{scale['images']} images x {scale['image_size']} bytes, {scale['actions']} actions, "
+              f"{export_size / 1024:.0f} KB total")
+
+        results = {}
+        print(f"\n  {'mode':<12} {'cold (ms)':>10} {'warm (ms)':>10}")
+        for mode in modes:
+            results[mode] = benchmark_mode(export_dir, mode, args.repeat)
+            print(f"  {mode:<12} {results[mode]['cold']['seconds'] * 1000:>10.1f} "
+                  f"{results[mode]['warm']['seconds'] * 1000:>10.1f}")
+    finally:
+        shutil.rmtree(export_root, ignore_errors=True)
+
+    if not args.no_history:
+        record = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "preset": args.preset,
+            "scale": scale,
+            "export_bytes": export_size,
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
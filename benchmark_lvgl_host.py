@@ -0,0 +1,711 @@
+import os
+import re
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import generate_eez_ui
+from benchmark_import_eez_ui import DEFAULT_HISTORY_FILE, create_workspace, run_importer
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+# LVGL component of the project, built for the host
+LVGL_DIR = os.path.join(REPO_DIR, "components", "lvgl__lvgl")
+# Project the build file templates of the synthetic project are taken from
+EXAMPLE_PROJECT = os.path.join(REPO_DIR, "example", "eez-project", "project_name", "name_here.eez-project")
+
+# LVGL is built once into this directory and reused by later runs
+DEFAULT_BUILD_DIR = os.path.join(tempfile.gettempdir(), "eez_lvgl_host")
+CC = os.environ.get("CC", "gcc")
+CFLAGS = ["-O2", "-DLV_CONF_INCLUDE_SIMPLE"]
+# lv_conf.h settings that differ from lv_conf_template.h. The heap must hold
+# the largest synthetic screen.
+HOST_LV_CONF = {
+    "LV_MEM_SIZE": "(4096U * 1024U)",
+}
+
+# Synthetic screen sizes: number of cards, every card holds a title, a value
+# label and a bar bound to variables, and a button with a label bound to a
+# variable all cards share
+PRESETS = {
+    'small': {'screens': 2, 'cards': 8},
+    'medium': {'screens': 4, 'cards': 24},
+    'production': {'screens': 8, 'cards': 48},
+}
+
+# Variants of the UI that are built. Each is generated with the generator
+# options and imported with the importer modes after the default import.
+VARIANTS = {
+    'plain': {'options': {}, 'modes': []},
+    'hoisted': {'options': {}, 'modes': ['hoist-styles']},
+    'static': {'options': {}, 'modes': ['static-text']},
+    'cached': {'options': {'cache_bindings': True}, 'modes': []},
+}
+# What the harness measures, and the variants it compares:
+#   construct: time to create every screen and lay it out
+#   tick:      time of tick_screen_*() and the areas, widgets and variables
+#              it invalidates, updates and reads while the variables change
+BENCHMARKS = {
+    'construct': ('plain', 'hoisted', 'static'),
+    'tick': ('plain', 'cached'),
+}
+DEFAULT_TICKS = 1000
+# LVGL functions the harness counts calls of, with -Wl,--wrap
+WRAPPED_FUNCTIONS = {
+    "_lv_inv_area": ("void", "lv_disp_t *disp, const lv_area_t *area", "disp, area", "invalidations"),
+    "lv_label_set_text": ("void", "lv_obj_t *obj, const char *text", "obj, text", "updates"),
+    "lv_bar_set_value": ("void", "lv_obj_t *obj, int32_t value, lv_anim_enable_t anim", "obj, value, anim", "updates"),
+}
+
+HARNESS_TEMPLATE = """#include <stdio.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+#include <lvgl.h>
+#include "screens.h"
+#include "vars.h"
+
+#define HOR_RES {width}
+#define VER_RES {height}
+
+static lv_color_t draw_buf_pixels[HOR_RES * 40];
+static uint32_t tick_count;
+static uint32_t invalidations;
+static uint32_t updates;
+static uint32_t var_reads;
+
+{wrappers}
+{variables}
+static void flush_cb(lv_disp_drv_t *drv, const lv_area_t *area, lv_color_t *color_p) {{
+    LV_UNUSED(area);
+    LV_UNUSED(color_p);
+    lv_disp_flush_ready(drv);
+}}
+
+static uint64_t now_ns(void) {{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (uint64_t)ts.tv_sec * 1000000000u + (uint64_t)ts.tv_nsec;
+}}
+
+static void hash_value(uint32_t *hash, uint32_t value) {{
+    *hash = (*hash ^ value) * 16777619u;
+}}
+
+// Hashes the coordinates of every object, the label texts and the bar values,
+// so the variants can be compared
+static lv_obj_tree_walk_res_t hash_obj(lv_obj_t *obj, void *user_data) {{
+    uint32_t *hash = user_data;
+    lv_area_t coords;
+    lv_obj_get_coords(obj, &coords);
+    hash_value(hash, (uint32_t)coords.x1);
+    hash_value(hash, (uint32_t)coords.y1);
+    hash_value(hash, (uint32_t)coords.x2);
+    hash_value(hash, (uint32_t)coords.y2);
+    hash_value(hash, (uint32_t)lv_obj_get_scroll_top(obj));
+    if (lv_obj_check_type(obj, &lv_label_class)) {{
+        for (const char *c = lv_label_get_text(obj); *c; c++) {{
+            hash_value(hash, (uint8_t)*c);
+        }}
+    }} else if (lv_obj_check_type(obj, &lv_bar_class)) {{
+        hash_value(hash, (uint32_t)lv_bar_get_value(obj));
+    }}
+    hash[1]++;
+    return LV_OBJ_TREE_WALK_NEXT;
+}}
+
+typedef struct {{
+    const char *name;
+    void (*create)();
+    void (*tick)();
+    lv_obj_t **screen;
+}} screen_t;
+
+static const screen_t screens[] = {{
+{screens}
+}};
+
+// Creates every screen 'rounds' times and keeps the fastest creation and layout
+static void benchmark_construct(int rounds) {{
+    for (size_t i = 0; i < sizeof(screens) / sizeof(screens[0]); i++) {{
+        uint64_t best = UINT64_MAX;
+        uint32_t hash[2] = {{ 2166136261u, 0 }};
+        for (int round = 0; round < rounds; round++) {{
+            // Creating the screen and its first layout is what loading it costs
+            uint64_t start = now_ns();
+            screens[i].create();
+            lv_obj_update_layout(*screens[i].screen);
+            uint64_t elapsed = now_ns() - start;
+            if (elapsed < best) {{
+                best = elapsed;
+            }}
+            if (round == 0) {{
+                lv_obj_tree_walk(*screens[i].screen, hash_obj, hash);
+            }}
+            lv_obj_del(*screens[i].screen);
+        }}
+        printf("screen=%s ns=%llu hash=%08x objects=%u\\n", screens[i].name, (unsigned long long)best, (unsigned)hash[0], (unsigned)hash[1]);
+    }}
+}}
+
+// Shows every screen and runs its tick function 'ticks' times while the
+// variables change, redrawing after every tick
+static void benchmark_tick(int ticks) {{
+    lv_obj_t *blank = lv_scr_act();
+    for (size_t i = 0; i < sizeof(screens) / sizeof(screens[0]); i++) {{
+        screens[i].create();
+        lv_scr_load(*screens[i].screen);
+        lv_refr_now(NULL);
+        invalidations = 0;
+        updates = 0;
+        var_reads = 0;
+        uint64_t total = 0;
+        for (int tick = 0; tick < ticks; tick++) {{
+            tick_count = (uint32_t)tick;
+            uint64_t start = now_ns();
+            screens[i].tick();
+            total += now_ns() - start;
+            lv_refr_now(NULL);
+        }}
+        uint32_t hash[2] = {{ 2166136261u, 0 }};
+        lv_obj_tree_walk(*screens[i].screen, hash_obj, hash);
+        printf("screen=%s ns=%llu invalidations=%u updates=%u var_reads=%u hash=%08x objects=%u\\n", screens[i].name,
+               (unsigned long long)total, (unsigned)invalidations, (unsigned)updates, (unsigned)var_reads, (unsigned)hash[0], (unsigned)hash[1]);
+        lv_scr_load(blank);
+        lv_obj_del(*screens[i].screen);
+    }}
+}}
+
+int main(int argc, char **argv) {{
+    const char *benchmark = argc > 1 ? argv[1] : "construct";
+    int count = argc > 2 ? atoi(argv[2]) : 5;
+
+    lv_init();
+    static lv_disp_draw_buf_t draw_buf;
+    lv_disp_draw_buf_init(&draw_buf, draw_buf_pixels, NULL, HOR_RES * 40);
+    static lv_disp_drv_t disp_drv;
+    lv_disp_drv_init(&disp_drv);
+    disp_drv.hor_res = HOR_RES;
+    disp_drv.ver_res = VER_RES;
+    disp_drv.flush_cb = flush_cb;
+    disp_drv.draw_buf = &draw_buf;
+    lv_disp_t *dispp = lv_disp_drv_register(&disp_drv);
+    lv_theme_t *theme = lv_theme_default_init(dispp, lv_palette_main(LV_PALETTE_BLUE), lv_palette_main(LV_PALETTE_RED), {dark}, LV_FONT_DEFAULT);
+    lv_disp_set_theme(dispp, theme);
+
+    if (strcmp(benchmark, "tick") == 0) {{
+        benchmark_tick(count);
+    }} else {{
+        benchmark_construct(count);
+    }}
+    return 0;
+}}
+"""
+
+
+def synthetic_widget(widget_type, left, top, width, height, units=("px", "px", "px", "px"), styles=None, children=(), **props):
+    """
+    Creates a widget of an EEZ-Studio project.
+
+    Args:
+        widget_type: EEZ widget type, e.g. 'LVGLLabelWidget'.
+        left, top, width, height: Position and size.
+        units: Units of left, top, width and height ('px', '%' or 'content').
+        styles: Local styles of the MAIN part in the DEFAULT state.
+        children: Child widgets.
+        **props: Type specific properties, e.g. text.
+
+    Returns:
+        dict: The widget.
+    """
+    widget = {
+        "type": widget_type,
+        "left": left,
+        "top": top,
+        "width": width,
+        "height": height,
+        "leftUnit": units[0],
+        "topUnit": units[1],
+        "widthUnit": units[2],
+        "heightUnit": units[3],
+        "localStyles": {"definition": {"MAIN": {"DEFAULT": dict(styles)}}} if styles else {},
+        "children": list(children),
+    }
+    widget.update(props)
+    return widget
+
+
+def synthetic_card(screen, card):
+    """
+    Creates a card as EEZ-Studio users build them: a styled panel with a flex
+    column layout holding a title, a value label and a bar bound to the card's
+    variables, and a button with a label bound to the shared 'mode' variable.
+
+    Args:
+        screen: Number of the screen.
+        card: Number of the card on the screen.
+
+    Returns:
+        tuple: (the panel widget, the card's global variables)
+    """
+    content = ("px", "px", "content", "content")
+    text_variable = f"screen_{screen}_card_{card}_text"
+    level_variable = f"screen_{screen}_card_{card}_level"
+    variables = [{"name": text_variable, "type": "string"}, {"name": level_variable, "type": "integer"}]
+    panel = synthetic_widget(
+        "LVGLPanelWidget", 0, 0, 180, 150, ("px", "px", "px", "content"),
+        styles={
+            "layout": "FLEX", "flex_flow": "COLUMN", "pad_top": 8, "pad_bottom": 8, "pad_left": 8,
+            "pad_right": 8, "pad_row": 6, "radius": 8, "bg_color": "#202830", "border_width": 1,
+            "border_color": "#3a4650", "shadow_width": 12, "shadow_color": "#000000", "text_color": "#e0e0e0",
+        },
+        children=[
+            synthetic_widget("LVGLLabelWidget", 0, 0, 0, 0, content, styles={"text_letter_space": 1},
+                             text=f"Card {card} on screen {screen}"),
+            synthetic_widget("LVGLLabelWidget", 0, 0, 0, 0, content, text=text_variable, textType="expression"),
+            synthetic_widget("LVGLBarWidget", 0, 0, 100, 10, ("px", "px", "%", "px"),
+                             styles={"bg_color": "#304050", "radius": 4}, value=level_variable, valueType="expression"),
+            synthetic_widget("LVGLButtonWidget", 0, 0, 100, 36, ("px", "px", "%", "px"),
+                             styles={"bg_color": "#2060a0", "radius": 6, "shadow_width": 4},
+                             children=[synthetic_widget("LVGLLabelWidget", 0, 0, 0, 0, content,
+                                                        styles={"align": "CENTER", "text_color": "#ffffff"},
+                                                        text="mode", textType="expression")]),
+        ],
+    )
+    return panel, variables
+
+
+def synthetic_project(screens, cards):
+    """
+    Creates an EEZ-Studio project with the build files of the example project
+    and synthetic screens of styled cards in a wrapping flex layout, with
+    global variables bound to the cards.
+
+    Args:
+        screens: Number of screens.
+        cards: Number of cards per screen.
+
+    Returns:
+        dict: The project.
+    """
+    project = copy.deepcopy(generate_eez_ui.load_project(EXAMPLE_PROJECT))
+    general = project["settings"]["general"]
+    project["userPages"] = []
+    variables = [{"name": "mode", "type": "string"}]
+    for screen in range(screens):
+        panels = []
+        for card in range(cards):
+            panel, card_variables = synthetic_card(screen, card)
+            panels.append(panel)
+            variables += card_variables
+        grid = synthetic_widget(
+            "LVGLContainerWidget", 0, 0, 100, 100, ("px", "px", "%", "%"),
+            styles={"layout": "FLEX", "flex_flow": "ROW_WRAP", "pad_top": 10, "pad_bottom": 10,
+                    "pad_left": 10, "pad_right": 10, "pad_row": 10, "pad_column": 10},
+            children=panels,
+        )
+        root = synthetic_widget("LVGLScreenWidget", 0, 0, general["displayWidth"], general["displayHeight"],
+                                styles={"bg_color": "#101418"}, children=[grid])
+        project["userPages"].append({"name": f"Screen {screen}", "components": [root]})
+    project["variables"]["globalVariables"] = variables
+    return project
+
+
+def host_lv_conf(build_dir):
+    """
+    Writes the lv_conf.h the host build uses: lv_conf_template.h, enabled and
+    with the HOST_LV_CONF settings.
+
+    Args:
+        build_dir: Build directory.
+
+    Returns:
+        bool: True if lv_conf.h changed, so LVGL must be rebuilt.
+    """
+    with open(os.path.join(LVGL_DIR, "lv_conf_template.h"), "r", encoding="utf-8") as f:
+        content = f.read()
+    content = content.replace("#if 0 /*Set it to \"1\" to enable content*/", "#if 1", 1)
+    for name, value in HOST_LV_CONF.items():
+        content = re.sub(rf"(#define {name}) .*", lambda match: f"{match.group(1)} {value}", content, count=1)
+    conf_file = os.path.join(build_dir, "lv_conf.h")
+    if os.path.isfile(conf_file):
+        with open(conf_file, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    with open(conf_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+def compile_c(source, output, include_dirs):
+    """
+    Compiles one C file for the host.
+
+    Args:
+        source: Path of the C file.
+        output: Path of the object file.
+        include_dirs: Include directories.
+    """
+    command = [CC, *CFLAGS, *(f"-I{directory}" for directory in include_dirs), "-c", source, "-o", output]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(f"ERROR: Compiling '{source}' failed.")
+        sys.exit(1)
+
+
+def build_lvgl(build_dir, jobs):
+    """
+    Builds the LVGL component as a static library for the host. Object files
+    that are newer than their source and lv_conf.h are reused.
+
+    Args:
+        build_dir: Build directory.
+        jobs: Number of parallel compilers.
+
+    Returns:
+        str: Path of liblvgl.a.
+    """
+    os.makedirs(os.path.join(build_dir, "lvgl"), exist_ok=True)
+    rebuild = host_lv_conf(build_dir)
+    conf_time = os.path.getmtime(os.path.join(build_dir, "lv_conf.h"))
+    sources = []
+    for root, _, files in os.walk(os.path.join(LVGL_DIR, "src")):
+        sources += [os.path.join(root, file) for file in files if file.endswith(".c")]
+    jobs_to_run = []
+    objects = []
+    for source in sorted(sources):
+        rel_path = os.path.relpath(source, LVGL_DIR)
+        output = os.path.join(build_dir, "lvgl", rel_path.replace(os.sep, "_")[:-2] + ".o")
+        objects.append(output)
+        if rebuild or not os.path.isfile(output) or os.path.getmtime(output) < max(os.path.getmtime(source), conf_time):
+            jobs_to_run.append((source, output))
+    library = os.path.join(build_dir, "liblvgl.a")
+    if jobs_to_run or not os.path.isfile(library):
+        print(f"Building LVGL for the host ({len(jobs_to_run)} of {len(sources)} files)...")
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(lambda job: compile_c(job[0], job[1], [build_dir, LVGL_DIR]), jobs_to_run))
+        if os.path.isfile(library):
+            os.remove(library)
+        subprocess.run(["ar", "rcs", library, *objects], check=True)
+    return library
+
+
+def harness_variables(vars_header):
+    """
+    Generates the get_var_* and set_var_* functions of vars.h for the harness.
+
+    Every variable changes every few ticks, each at its own rate. Every read is
+    counted. String variables are formatted into a buffer on every read, like
+    native EEZ-Studio projects usually do.
+
+    Args:
+        vars_header: Content of vars.h.
+
+    Returns:
+        str: C source of the functions.
+    """
+    functions = []
+    for index, (c_type, name) in enumerate(re.findall(r"^extern (.+?) ?get_var_(\w+)\(\);", vars_header, re.M)):
+        period = 5 + index * 7 % 31
+        separator = "" if c_type.endswith("*") else " "
+        if c_type == "const char *":
+            body = ("    static char value[48];\n"
+                    f"    snprintf(value, sizeof(value), \"{name} %u\", (unsigned)(tick_count / {period}));\n"
+                    "    return value;\n")
+        elif c_type == "bool":
+            body = f"    return (tick_count / {period}) % 2 != 0;\n"
+        else:
+            body = f"    return ({c_type})(tick_count / {period} % 100);\n"
+        functions.append(f"{c_type}{separator}get_var_{name}() {{\n    var_reads++;\n{body}}}\n\n"
+                         f"void set_var_{name}({c_type}{separator}value) {{\n    LV_UNUSED(value);\n}}\n")
+    return "\n".join(functions)
+
+
+def harness_wrappers():
+    """
+    Generates the -Wl,--wrap functions that count the calls of WRAPPED_FUNCTIONS.
+
+    Returns:
+        str: C source of the functions.
+    """
+    functions = []
+    for name, (return_type, params, args, counter) in WRAPPED_FUNCTIONS.items():
+        functions.append(f"{return_type} __real_{name}({params});\n"
+                         f"{return_type} __wrap_{name}({params}) {{\n"
+                         f"    {counter}++;\n"
+                         f"    __real_{name}({args});\n"
+                         "}\n")
+    return "\n".join(functions)
+
+
+def build_harness(project_dir, build_dir, library, project, binary):
+    """
+    Builds the benchmark harness with the imported UI files of a project.
+
+    Args:
+        project_dir: Directory with the imported UI files.
+        build_dir: Build directory with lv_conf.h.
+        library: Path of liblvgl.a.
+        project: The synthetic project.
+        binary: Path of the executable.
+    """
+    with open(os.path.join(project_dir, "screens.h"), "r", encoding="utf-8") as f:
+        names = re.findall(r"^void create_screen_(\w+)\(\);", f.read(), re.M)
+    with open(os.path.join(project_dir, "vars.h"), "r", encoding="utf-8") as f:
+        vars_header = f.read()
+    general = project["settings"]["general"]
+    harness = HARNESS_TEMPLATE.format(
+        width=general["displayWidth"], height=general["displayHeight"],
+        dark="true" if general.get("darkTheme", True) else "false",
+        wrappers=harness_wrappers(), variables=harness_variables(vars_header),
+        screens="\n".join(f"    {{ \"{name}\", create_screen_{name}, tick_screen_{name}, &objects.{name} }},"
+                          for name in names),
+    )
+    harness_file = os.path.join(project_dir, "benchmark_harness.c")
+    with open(harness_file, "w", encoding="utf-8") as f:
+        f.write(harness)
+    sources = [harness_file, os.path.join(project_dir, "styles.c")] + [
+        os.path.join(project_dir, file) for file in sorted(os.listdir(project_dir))
+        if file == "screens.c" or re.fullmatch(r"screen_\w+\.c", file)
+    ]
+    wraps = [f"-Wl,--wrap={name}" for name in WRAPPED_FUNCTIONS]
+    command = [CC, *CFLAGS, f"-I{build_dir}", f"-I{LVGL_DIR}", f"-I{project_dir}", *sources, library, *wraps, "-lm", "-o", binary]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(f"ERROR: Building '{binary}' failed.")
+        sys.exit(1)
+
+
+def run_harness(binary, benchmark, count):
+    """
+    Runs a benchmark harness.
+
+    Args:
+        binary: Path of the executable.
+        benchmark: Name of the benchmark in BENCHMARKS.
+        count: Rounds of the construct benchmark, ticks of the tick benchmark.
+
+    Returns:
+        dict: Screen name -> measurements ('ns', 'hash', 'objects', and the
+            counters of the tick benchmark).
+    """
+    result = subprocess.run([binary, benchmark, str(count)], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(f"ERROR: '{binary}' failed with exit code {result.returncode}")
+        sys.exit(1)
+    screens = {}
+    for line in result.stdout.splitlines():
+        values = dict(item.split("=", 1) for item in line.split() if "=" in item)
+        if "screen" in values:
+            name = values.pop("screen")
+            screens[name] = {key: value if key == "hash" else int(value) for key, value in values.items()}
+    return screens
+
+
+def benchmark_variants(project, variants, build_dir, library, benchmark, count, repeat=1):
+    """
+    Generates and imports the UI of a project once per variant, builds it with
+    the harness and runs a benchmark on it.
+
+    The harnesses of all variants are run in turn, `repeat` times, so a change
+    in the load of the machine hits every variant alike.
+
+    Args:
+        project: The synthetic project.
+        variants: Names of the VARIANTS to compare.
+        build_dir: Build directory.
+        library: Path of liblvgl.a.
+        benchmark: Name of the benchmark in BENCHMARKS.
+        count: Rounds of the construct benchmark, ticks of the tick benchmark.
+        repeat: Number of runs of every harness.
+
+    Returns:
+        dict: Variant -> screen name -> measurements of the median run, with
+            the times of all runs in 'runs'.
+    """
+    workspace = tempfile.mkdtemp(prefix="eez_host_bench_")
+    try:
+        binaries = {}
+        for variant in variants:
+            files, warnings = generate_eez_ui.generate_ui(project, **VARIANTS[variant]["options"])
+            for warning in warnings:
+                print(f"Warning: {warning}")
+            export_dir = os.path.join(workspace, variant, "src", "ui")
+            os.makedirs(export_dir)
+            for name, content in files.items():
+                with open(os.path.join(export_dir, name), "w", encoding="utf-8") as f:
+                    f.write(content)
+            project_dir = os.path.join(workspace, variant, "project")
+            create_workspace(project_dir, export_dir)
+            run_importer(project_dir, "all")
+            for mode in VARIANTS[variant]["modes"]:
+                run_importer(project_dir, mode)
+            binaries[variant] = os.path.join(workspace, variant, "harness")
+            build_harness(os.path.join(project_dir, "components", "ui"), build_dir, library, project, binaries[variant])
+        runs = {variant: [] for variant in variants}
+        for _ in range(repeat):
+            for variant in variants:
+                runs[variant].append(run_harness(binaries[variant], benchmark, count))
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    results = {}
+    for variant in variants:
+        results[variant] = {}
+        for name in runs[variant][0]:
+            times = sorted(run[name]["ns"] for run in runs[variant])
+            median = statistics.median_low(times)
+            measurement = next(run[name] for run in runs[variant] if run[name]["ns"] == median)
+            results[variant][name] = dict(measurement, runs=[run[name]["ns"] for run in runs[variant]])
+    return results
+
+
+def spread(values):
+    """
+    Formats the relative spread of a list of values around their median.
+
+    Args:
+        values: The values.
+
+    Returns:
+        str: '-a%/+b%' of the smallest and largest value.
+    """
+    median = statistics.median(values)
+    if not median:
+        return "-"
+    return f"-{(median - min(values)) / median:.0%}/+{(max(values) - median) / median:.0%}"
+
+
+def print_construct_results(results, variants):
+    """
+    Prints the median construction time of every screen per variant, the
+    spread of the total over the runs and the speed-up of every variant.
+
+    The speed-up is the ratio of the totals of the same run, since the runs
+    of the variants alternate. It counts as stable only when every run agrees
+    on whether the variant is faster or slower.
+
+    Args:
+        results: Result of benchmark_variants().
+        variants: Names of the compared variants, the first is the baseline.
+
+    Returns:
+        bool: True if every variant laid the screens out identically.
+    """
+    baseline = results[variants[0]]
+    print(f"\n  {'screen':<12} {'objects':>8}" + "".join(f" {variant + ' (ms)':>14}" for variant in variants) + "  layout")
+    identical = True
+    for name, measurement in baseline.items():
+        same = all(results[variant][name]["hash"] == measurement["hash"] for variant in variants)
+        identical = identical and same
+        print(f"  {name:<12} {measurement['objects']:>8}"
+              + "".join(f" {results[variant][name]['ns'] / 1e6:>14.3f}" for variant in variants)
+              + f"  {'identical' if same else 'DIFFERS'}")
+    # Total of every run
+    totals = {variant: [sum(runs) for runs in zip(*(screen["runs"] for screen in results[variant].values()))]
+              for variant in variants}
+    print(f"  {'total':<12} {'':>8}" + "".join(f" {statistics.median(totals[variant]) / 1e6:>14.3f}" for variant in variants))
+    print(f"  {'spread':<12} {'':>8}" + "".join(f" {spread(totals[variant]):>14}" for variant in variants))
+    print(f"\nMedian of {len(totals[variants[0]])} run(s), spread of the total over the runs.")
+    for variant in variants[1:]:
+        ratios = [base / total for base, total in zip(totals[variants[0]], totals[variant]) if total]
+        if not ratios:
+            continue
+        stable = len(ratios) > 1 and (min(ratios) > 1 or max(ratios) < 1)
+        print(f"{variant}: {statistics.median(ratios):.2f}x the speed of {variants[0]} "
+              f"(runs {min(ratios):.2f}x to {max(ratios):.2f}x, {'stable' if stable else 'not stable'})")
+    return identical
+
+
+def print_tick_results(results, variants, ticks):
+    """
+    Prints the tick time and the invalidations, widget updates and variable
+    reads of all screens per variant.
+
+    Args:
+        results: Result of benchmark_variants().
+        variants: Names of the compared variants, the first is the baseline.
+        ticks: Number of ticks every screen ran.
+
+    Returns:
+        bool: True if every variant ended with the same widget values.
+    """
+    baseline = results[variants[0]]
+    identical = all(results[variant][name]["hash"] == measurement["hash"]
+                    for variant in variants for name, measurement in baseline.items())
+    print(f"\n{len(baseline)} screens x {ticks} ticks")
+    print(f"\n  {'variant':<10} {'tick (ms)':>10} {'invalidations':>14} {'updates':>10} {'variable reads':>15}")
+    for variant in variants:
+        totals = {key: sum(screen[key] for screen in results[variant].values())
+                  for key in ("ns", "invalidations", "updates", "var_reads")}
+        print(f"  {variant:<10} {totals['ns'] / 1e6:>10.3f} {totals['invalidations']:>14} "
+              f"{totals['updates']:>10} {totals['var_reads']:>15}")
+    print(f"\nWidget values after the last tick: {'identical' if identical else 'DIFFER'}")
+    return identical
+
+
+def main():
+    """
+    Main function to run the benchmark with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark imported EEZ-Studio screens with LVGL built for the host')
+    parser.add_argument('-b', '--benchmark', choices=sorted(BENCHMARKS), default='construct',
+                        help='construct: time screen creation and layout, tick: time tick_screen and count invalidations')
+    parser.add_argument('-p', '--preset', choices=sorted(PRESETS), default='medium', help='Screen size preset')
+    parser.add_argument('--screens', type=int, help='Number of screens')
+    parser.add_argument('--cards', type=int, help='Number of cards per screen')
+    parser.add_argument('-r', '--rounds', type=int, default=5, help='Times every screen is created, the fastest is kept (construct)')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='Runs of every harness, the median is reported')
+    parser.add_argument('-t', '--ticks', type=int, default=DEFAULT_TICKS, help='Ticks every screen runs (tick)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of parallel compilers')
+    parser.add_argument('--build-dir', default=DEFAULT_BUILD_DIR, help='Directory LVGL is built in and reused from')
+    parser.add_argument('--history', default=DEFAULT_HISTORY_FILE, help='File the results are appended to (JSON lines)')
+    parser.add_argument('--no-history', action='store_true', help='Do not record the results')
+    args = parser.parse_args()
+
+    scale = dict(PRESETS[args.preset])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    variants = BENCHMARKS[args.benchmark]
+    count = args.ticks if args.benchmark == "tick" else args.rounds
+
+    library = build_lvgl(args.build_dir, args.jobs)
+    project = synthetic_project(**scale)
+    print(f"\nSynthetic project ({args.preset}): {scale['screens']} screens x {scale['cards']} cards")
+    results = benchmark_variants(project, variants, args.build_dir, library, args.benchmark, count, args.repeat)
+    if args.benchmark == "tick":
+        identical = print_tick_results(results, variants, count)
+    else:
+        identical = print_construct_results(results, variants)
+    if not identical:
+        print("\nERROR: The variants don't produce the same screens.")
+
+    if not args.no_history:
+        record = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmark": f"lvgl_host_{args.benchmark}",
+            "preset": args.preset,
+            "scale": scale,
+            "count": count,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {args.history}")
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
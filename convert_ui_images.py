@@ -0,0 +1,1091 @@
+import os
+import re
+import io
+import sys
+import json
+import base64
+import hashlib
+import argparse
+
+from import_eez_ui import write_if_changed, DEFAULT_SOURCE_DIR
+from generate_eez_ui import c_name, load_project, ROTATIONS
+
+# First line of every converted image. It ends with the hash of the image and
+# the conversion settings, so an image whose hash didn't change is not decoded
+# again
+IMAGE_MARKER = "// Converted by convert_ui_images.py. Changes are overwritten by the next import."
+IMAGE_HASH_RE = re.compile(r"^// Source: (.*) \(hash ([0-9a-f]{64})\)$", re.M)
+# Bumped whenever the output of the same image and settings changes
+CONVERTER_VERSION = 2
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# LVGL 8 image formats:
+#   cf: value of header.cf
+#   bpp: bits per pixel of the pixel data (0: the size of lv_color_t)
+#   kind: 'true_color' (lv_color_t per pixel, with an alpha byte for
+#       TRUE_COLOR_ALPHA), 'indexed' (palette of 2^bpp lv_color32_t and an
+#       index per pixel), 'alpha' (alpha only, recolored by the style), or
+#       'png' and 'sjpg' (a file the decoder of the LVGL option decodes on
+#       every draw)
+COLOR_FORMATS = {
+    "TRUE_COLOR": {"cf": "LV_IMG_CF_TRUE_COLOR", "bpp": 0, "kind": "true_color"},
+    "TRUE_COLOR_ALPHA": {"cf": "LV_IMG_CF_TRUE_COLOR_ALPHA", "bpp": 0, "kind": "true_color"},
+    "INDEXED_1BIT": {"cf": "LV_IMG_CF_INDEXED_1BIT", "bpp": 1, "kind": "indexed"},
+    "INDEXED_2BIT": {"cf": "LV_IMG_CF_INDEXED_2BIT", "bpp": 2, "kind": "indexed"},
+    "INDEXED_4BIT": {"cf": "LV_IMG_CF_INDEXED_4BIT", "bpp": 4, "kind": "indexed"},
+    "INDEXED_8BIT": {"cf": "LV_IMG_CF_INDEXED_8BIT", "bpp": 8, "kind": "indexed"},
+    "ALPHA_1BIT": {"cf": "LV_IMG_CF_ALPHA_1BIT", "bpp": 1, "kind": "alpha"},
+    "ALPHA_2BIT": {"cf": "LV_IMG_CF_ALPHA_2BIT", "bpp": 2, "kind": "alpha"},
+    "ALPHA_4BIT": {"cf": "LV_IMG_CF_ALPHA_4BIT", "bpp": 4, "kind": "alpha"},
+    "ALPHA_8BIT": {"cf": "LV_IMG_CF_ALPHA_8BIT", "bpp": 8, "kind": "alpha"},
+    "PNG": {"cf": "LV_IMG_CF_RAW_ALPHA", "bpp": 0, "kind": "png", "option": "LV_USE_PNG"},
+    "SJPG": {"cf": "LV_IMG_CF_RAW", "bpp": 0, "kind": "sjpg", "option": "LV_USE_SJPG"},
+}
+# Formats decoded by an LVGL library instead of the built-in decoder
+DECODER_FORMATS = tuple(name for name, info in COLOR_FORMATS.items() if "option" in info)
+# Split JPEG of lv_sjpg: JPEG fragments of 16 rows behind a header with their
+# sizes, so only one fragment has to be decoded at a time
+SJPG_MAGIC = b"_SJPG__\x00V1.00\x00"
+SJPG_SPLIT_HEIGHT = 16
+JPEG_QUALITY = 90
+# Work buffer lv_sjpg allocates for TJpgDec
+TJPGD_WORKBUFF_SIZE = 4096
+# 'bpp' settings of an EEZ-Studio bitmap without alpha channel. Bitmaps of 32
+# bpp keep their alpha channel only if it isn't fully opaque
+OPAQUE_BITMAP_BPP = (16, 24)
+# Size of a palette entry (lv_color32_t)
+PALETTE_ENTRY_SIZE = 4
+SUPPORTED_COLOR_DEPTHS = (8, 16, 32)
+# Channel orders of the panel. LVGL 8 only draws RGB, so a BGR panel needs the
+# red and blue of every color constant and image swapped at build time
+COLOR_ORDERS = ("RGB", "BGR")
+DEFAULT_COLOR = {"depth": 16, "swap": False, "order": "RGB"}
+# Bits of the red, green and blue channel that lv_color_t keeps. Colors that
+# only differ in the other bits are the same color on the display
+COLOR_MASKS = {8: (0xE0, 0xE0, 0xC0), 16: (0xF8, 0xFC, 0xF8), 32: (0xFF, 0xFF, 0xFF)}
+# Estimated CPU cycles per pixel to draw an image of a format (not scaled or
+# rotated) on the ESP32-S3, without reading its data from flash. LVGL copies
+# TRUE_COLOR rows as they are, all other formats are decoded line by line on
+# every draw (LV_IMG_CACHE_DEF_SIZE is 0) and blended pixel by pixel. The
+# ratios were measured with lv_canvas_draw_img() on a host build of LVGL 8.4,
+# scaled to about 2 cycles per pixel for TRUE_COLOR. PNG and SJPG were
+# measured with a photo, PNG takes longer for images that compress worse.
+# Good for comparing formats, not for absolute frame times
+DRAW_CYCLES_PER_PIXEL = {
+    "TRUE_COLOR": 2,
+    "TRUE_COLOR_ALPHA": 45,
+    "INDEXED_1BIT": 36,
+    "INDEXED_2BIT": 39,
+    "INDEXED_4BIT": 39,
+    "INDEXED_8BIT": 38,
+    "ALPHA_1BIT": 86,
+    "ALPHA_2BIT": 93,
+    "ALPHA_4BIT": 72,
+    "ALPHA_8BIT": 21,
+    "PNG": 610,
+    "SJPG": 550,
+}
+# Data bits per flash clock of the SPI flash modes
+FLASH_MODE_BITS = {"QIO": 4, "QOUT": 4, "DIO": 2, "DOUT": 2, "OPI": 8}
+DEFAULT_DRAW_TARGET = {"cpu_mhz": 240, "flash_mb_s": 40.0, "flash": "QIO 80 MHz"}
+DATA_URL_RE = re.compile(r"^data:image/[\w+.-]+;base64,")
+# Version of the format manifest written by advise_ui_images.py
+MANIFEST_VERSION = 1
+# Bytes per line of the C arrays
+ARRAY_LINE_BYTES = 16
+
+
+def load_image_libraries():
+    """
+    Imports NumPy and Pillow, which only the image converter needs.
+
+    Returns:
+        tuple: (numpy module, PIL.Image module)
+
+    Raises:
+        ImportError: With the pip command that installs them.
+    """
+    try:
+        import numpy
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError(f"Converting images needs NumPy and Pillow ({e.name} is missing). "
+                          "Install them with 'pip install numpy pillow'.") from e
+    return numpy, Image
+
+
+def color_format_name(value):
+    """
+    Finds the color format of a name as LVGL, EEZ-Studio or the user writes it.
+
+    Example: 'LV_IMG_CF_INDEXED_4BIT', 'CF_INDEXED_4BIT' or 'indexed_4bit' -> 'INDEXED_4BIT'
+
+    Args:
+        value: Name of the color format.
+
+    Returns:
+        str: Key of COLOR_FORMATS, or None if the format isn't supported.
+    """
+    name = re.sub(r"^(?:LV_IMG_)?CF_", "", str(value).strip().upper())
+    return name if name in COLOR_FORMATS else None
+
+
+def read_sdkconfig(project_root="."):
+    """
+    Reads the CONFIG_ options of the sdkconfig of the project.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+
+    Returns:
+        dict: Option -> value as str, empty if there is no sdkconfig.
+    """
+    options = {}
+    sdkconfig_path = os.path.join(project_root, "sdkconfig")
+    if os.path.isfile(sdkconfig_path):
+        with open(sdkconfig_path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                if key.startswith("CONFIG_"):
+                    options[key] = value.strip('"')
+    return options
+
+
+def lvgl_color_config(project_root=".", order="RGB"):
+    """
+    Finds the color settings of LVGL in the sdkconfig or lv_conf.h of the
+    project.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+        order: Channel order of the panel, 'RGB' or 'BGR'. Neither LVGL nor
+            the RGB panel driver has a setting for it.
+
+    Returns:
+        dict: 'depth' -> LV_COLOR_DEPTH, 'swap' -> LV_COLOR_16_SWAP, 'order'
+            -> order, 'source' -> file it was read from or None for the
+            defaults of 16 bit without swap.
+    """
+    color = dict(DEFAULT_COLOR, order=order.upper(), source=None)
+    sdkconfig = read_sdkconfig(project_root)
+    if sdkconfig.get("CONFIG_LV_CONF_SKIP") == "y" and sdkconfig.get("CONFIG_LV_COLOR_DEPTH"):
+        color["depth"] = int(sdkconfig["CONFIG_LV_COLOR_DEPTH"])
+        color["swap"] = sdkconfig.get("CONFIG_LV_COLOR_16_SWAP") == "y"
+        color["source"] = os.path.join(project_root, "sdkconfig")
+        return color
+    for candidate in ("lv_conf.h", os.path.join("main", "lv_conf.h"), os.path.join("components", "lv_conf.h"),
+                      os.path.join("include", "lv_conf.h")):
+        conf_path = os.path.join(project_root, candidate)
+        if not os.path.isfile(conf_path):
+            continue
+        with open(conf_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        depth = re.search(r"^\s*#\s*define\s+LV_COLOR_DEPTH\s+(\d+)", content, re.M)
+        if depth:
+            swap = re.search(r"^\s*#\s*define\s+LV_COLOR_16_SWAP\s+(\d+)", content, re.M)
+            color["depth"] = int(depth.group(1))
+            color["swap"] = bool(swap and swap.group(1) != "0")
+            color["source"] = conf_path
+            return color
+    return color
+
+
+def project_color_order(project_file, order="auto"):
+    """
+    Decides the channel order the images and color constants are built for.
+
+    'auto' is RGB: LVGL 8 draws RGB and the RGB panel driver sends lv_color_t
+    to the panel as it is. A colorFormat other than RGB in the .eez-project
+    file is only reported, as following it would swap red and blue of the
+    images against everything else LVGL draws.
+
+    Args:
+        project_file: Path to the .eez-project file, or None.
+        order: 'auto', 'rgb' or 'bgr'.
+
+    Returns:
+        str: 'RGB' or 'BGR'.
+    """
+    if order.upper() in COLOR_ORDERS:
+        return order.upper()
+    if project_file and os.path.isfile(project_file):
+        color_format = load_project(project_file).get("settings", {}).get("general", {}).get("colorFormat")
+        if color_format and color_format.upper() != "RGB":
+            print(f"NOTE: '{project_file}' declares colorFormat {color_format}. Images and colors are built as RGB "
+                  "like the rest of LVGL. Use color_order = bgr if red and blue of the panel are swapped.")
+    return "RGB"
+
+
+def draw_target(project_root="."):
+    """
+    Finds the CPU clock and the flash speed the draw times are estimated for
+    in the sdkconfig of the project.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+
+    Returns:
+        dict: 'cpu_mhz' -> CPU clock, 'flash_mb_s' -> MB (bytes per
+            microsecond) read from flash per second, 'flash' -> description of
+            the flash mode. DEFAULT_DRAW_TARGET for the missing settings.
+    """
+    target = dict(DEFAULT_DRAW_TARGET)
+    sdkconfig = read_sdkconfig(project_root)
+    if sdkconfig.get("CONFIG_ESP_DEFAULT_CPU_FREQ_MHZ"):
+        target["cpu_mhz"] = int(sdkconfig["CONFIG_ESP_DEFAULT_CPU_FREQ_MHZ"])
+    mode = next((m for m in FLASH_MODE_BITS if sdkconfig.get(f"CONFIG_ESPTOOLPY_FLASHMODE_{m}") == "y"), None)
+    frequency = next((int(match.group(1)) for key, value in sdkconfig.items()
+                      for match in [re.fullmatch(r"CONFIG_ESPTOOLPY_FLASHFREQ_(\d+)M", key)] if match and value == "y"), None)
+    if mode and frequency:
+        target["flash_mb_s"] = frequency * FLASH_MODE_BITS[mode] / 8
+        target["flash"] = f"{mode} {frequency} MHz"
+    return target
+
+
+def draw_time_us(color_format, pixels, size, target=DEFAULT_DRAW_TARGET):
+    """
+    Estimates how long drawing a whole image takes (see DRAW_CYCLES_PER_PIXEL).
+
+    Args:
+        color_format: Key of COLOR_FORMATS.
+        pixels: Width x height of the image.
+        size: Size of the pixel data in bytes, read from flash on every draw.
+        target: CPU and flash speed (see draw_target()).
+
+    Returns:
+        float: Microseconds.
+    """
+    return pixels * DRAW_CYCLES_PER_PIXEL[color_format] / target["cpu_mhz"] + size / target["flash_mb_s"]
+
+
+def describe_color(color):
+    """
+    Describes color settings, e.g. 'RGB565, LV_COLOR_16_SWAP 0'.
+    """
+    names = {8: "332", 16: "565", 32: "888"}
+    text = color["order"] + names.get(color["depth"], str(color["depth"]))
+    if color["depth"] == 16:
+        text += f", LV_COLOR_16_SWAP {int(color['swap'])}"
+    return text
+
+
+def decode_image(data, opaque=False):
+    """
+    Decodes a PNG or JPEG image.
+
+    Args:
+        data: Content of the image file.
+        opaque: Drop the alpha channel, every pixel becomes fully opaque.
+
+    Returns:
+        tuple: (RGBA pixels as a height x width x 4 uint8 array, True if the
+            image has an alpha channel or a transparent color)
+    """
+    numpy, Image = load_image_libraries()
+    with Image.open(io.BytesIO(data)) as image:
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        rgba = numpy.array(image.convert("RGBA"), dtype=numpy.uint8)
+    if opaque:
+        rgba[..., 3] = 0xFF
+        has_alpha = False
+    return rgba, has_alpha
+
+
+def rotate_pixels(rgba, rotation):
+    """
+    Rotates pixels counterclockwise for screens generated in a rotation (see
+    generate_eez_ui.rotate_project()), the way rotate_copy_pixel() of
+    main/lvgl_port.c rotates the frame.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+        rotation: Rotation in degrees (see ROTATIONS).
+
+    Returns:
+        Rotated array, width x height for 90 and 270 degrees.
+    """
+    numpy, _ = load_image_libraries()
+    return numpy.ascontiguousarray(numpy.rot90(rgba, rotation // 90))
+
+
+def pack_colors(rgba, depth, swap=False):
+    """
+    Converts RGBA pixels to the bytes of lv_color_t, in the same byte order
+    LVGL keeps its draw buffers in, so LVGL copies them without converting.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+        depth: LV_COLOR_DEPTH, 8, 16 or 32.
+        swap: LV_COLOR_16_SWAP, the two bytes of a 16 bit color are swapped.
+
+    Returns:
+        numpy.ndarray: Height x width x (depth / 8) uint8 array.
+    """
+    numpy, _ = load_image_libraries()
+    red, green, blue = (rgba[..., channel] for channel in range(3))
+    if depth == 32:
+        # lv_color32_t is blue, green, red, alpha in memory
+        colors = rgba[..., [2, 1, 0, 3]].copy()
+        colors[..., 3] = 0xFF
+        return colors
+    if depth == 16:
+        # lv_color16_t: blue in the lowest 5 bits, stored little endian, or
+        # big endian with LV_COLOR_16_SWAP
+        value = ((red.astype(numpy.uint16) >> 3) << 11) | ((green.astype(numpy.uint16) >> 2) << 5) | (blue >> 3)
+        return value.astype(">u2" if swap else "<u2").view(numpy.uint8).reshape(rgba.shape[0], rgba.shape[1], 2)
+    if depth == 8:
+        # lv_color8_t: 3 bits red, 3 bits green, 2 bits blue
+        return ((red & 0xE0) | ((green & 0xE0) >> 3) | (blue >> 6)).astype(numpy.uint8)[..., None]
+    raise ValueError(f"LV_COLOR_DEPTH {depth} is not supported, only {', '.join(map(str, SUPPORTED_COLOR_DEPTHS))}")
+
+
+def pack_bits(values, bpp):
+    """
+    Packs values of bpp bits into bytes, the first pixel in the most
+    significant bits. Every row starts at a new byte, as LVGL expects.
+
+    Args:
+        values: Height x width uint8 array of values below 2^bpp.
+        bpp: Bits per value, 1, 2, 4 or 8.
+
+    Returns:
+        numpy.ndarray: Height x stride uint8 array.
+    """
+    numpy, _ = load_image_libraries()
+    if bpp == 8:
+        return values.astype(numpy.uint8)
+    per_byte = 8 // bpp
+    height, width = values.shape
+    stride = -(-width // per_byte)
+    padded = numpy.zeros((height, stride * per_byte), dtype=numpy.uint8)
+    padded[:, :width] = values
+    shifts = (8 - bpp * (numpy.arange(per_byte) + 1)).astype(numpy.uint8)
+    return numpy.bitwise_or.reduce(padded.reshape(height, stride, per_byte) << shifts, axis=2).astype(numpy.uint8)
+
+
+def display_colors(rgba, color=DEFAULT_COLOR):
+    """
+    Drops the bits of every channel that lv_color_t doesn't keep, and the
+    color of fully transparent pixels.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+        color: Color settings (see lvgl_color_config()).
+
+    Returns:
+        numpy.ndarray: Height x width x 4 uint8 array of the colors as they
+            appear on the display.
+    """
+    numpy, _ = load_image_libraries()
+    masks = COLOR_MASKS[color["depth"]]
+    if color["order"] == "BGR":
+        # Red and blue are swapped before LVGL drops their bits
+        masks = masks[::-1]
+    pixels = rgba & numpy.array(masks + (0xFF,), dtype=numpy.uint8)
+    pixels[pixels[..., 3] == 0] = 0
+    return pixels
+
+
+def quantize_colors(rgba, count, color=DEFAULT_COLOR):
+    """
+    Reduces an image to a number of colors, without dithering.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+        count: Maximum number of colors.
+        color: Color settings (see lvgl_color_config()).
+
+    Returns:
+        numpy.ndarray: Height x width x 4 uint8 array of at most count display
+            colors (see display_colors()).
+    """
+    numpy, Image = load_image_libraries()
+    pixels = display_colors(rgba, color)
+    if (pixels[..., 3] == 0xFF).all():
+        image = Image.fromarray(numpy.ascontiguousarray(pixels[..., :3])).quantize(
+            count, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    else:
+        # Median cut only works without alpha
+        image = Image.fromarray(pixels).quantize(count, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    return display_colors(numpy.asarray(image.convert("RGBA")), color)
+
+
+def image_data_size(color_format, width, height, depth=16):
+    """
+    Computes the size of the pixel data of an image without packing it. The
+    size of PNG and SJPG depends on the pixels, pack them instead.
+
+    Args:
+        color_format: Key of COLOR_FORMATS.
+        width: Width of the image in pixels.
+        height: Height of the image in pixels.
+        depth: LV_COLOR_DEPTH.
+
+    Returns:
+        int: Size of lv_img_dsc_t.data in bytes.
+    """
+    info = COLOR_FORMATS[color_format]
+    if color_format in DECODER_FORMATS:
+        raise ValueError(f"the size of {color_format} depends on the pixels")
+    if info["kind"] == "true_color":
+        alpha = color_format == "TRUE_COLOR_ALPHA" and depth != 32
+        return width * height * (depth // 8 + alpha)
+    stride = -(-width * info["bpp"] // 8)
+    palette = PALETTE_ENTRY_SIZE << info["bpp"] if info["kind"] == "indexed" else 0
+    return palette + stride * height
+
+
+def decode_ram(color_format, width, height, depth=16):
+    """
+    Estimates the heap the decoder of a format allocates while an image is
+    drawn.
+
+    Args:
+        color_format: Key of COLOR_FORMATS.
+        width: Width of the image in pixels.
+        height: Height of the image in pixels.
+        depth: LV_COLOR_DEPTH.
+
+    Returns:
+        int: Bytes.
+    """
+    info = COLOR_FORMATS[color_format]
+    if info["kind"] == "png":
+        # lodepng inflates the RGBA rows with their filter byte, then decodes
+        # the whole image as RGBA, which lv_png keeps until the image is closed
+        return (width * 4 + 1) * height + width * height * 4
+    if info["kind"] == "sjpg":
+        # One fragment as RGB888 and the work buffer of TJpgDec
+        return width * SJPG_SPLIT_HEIGHT * 3 + TJPGD_WORKBUFF_SIZE
+    if info["kind"] == "indexed":
+        # The palette converted to lv_color_t and an opacity per entry
+        return (depth // 8 + 1) << info["bpp"]
+    return 0
+
+
+def encode_png(rgba):
+    """
+    Encodes pixels as PNG, with a palette if they have at most 256 colors.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+
+    Returns:
+        bytes: Content of the PNG file.
+    """
+    numpy, Image = load_image_libraries()
+    colors, indices = image_palette(rgba)
+    options = {"optimize": True}
+    if len(colors) <= 256:
+        image = Image.fromarray(indices.astype(numpy.uint8))
+        image.putpalette(colors[:, :3].tobytes())
+        if (colors[:, 3] != 0xFF).any():
+            options["transparency"] = colors[:, 3].tobytes()
+    elif (rgba[..., 3] == 0xFF).all():
+        image = Image.fromarray(numpy.ascontiguousarray(rgba[..., :3]))
+    else:
+        image = Image.fromarray(numpy.ascontiguousarray(rgba))
+    output = io.BytesIO()
+    image.save(output, "PNG", **options)
+    return output.getvalue()
+
+
+def encode_sjpg(rgba):
+    """
+    Encodes pixels as split JPEG for lv_sjpg, like LVGL's jpg_to_sjpg.py.
+    JPEG has no alpha channel, transparent pixels keep their color.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+
+    Returns:
+        bytes: Content of the SJPG file.
+
+    Raises:
+        ValueError: If a fragment is too large for the header.
+    """
+    numpy, Image = load_image_libraries()
+    height, width = rgba.shape[:2]
+    image = Image.fromarray(numpy.ascontiguousarray(rgba[..., :3]))
+    fragments = []
+    for top in range(0, height, SJPG_SPLIT_HEIGHT):
+        output = io.BytesIO()
+        image.crop((0, top, width, min(height, top + SJPG_SPLIT_HEIGHT))).save(output, "JPEG", quality=JPEG_QUALITY)
+        if output.tell() > 0xFFFF:
+            raise ValueError(f"a JPEG fragment of {output.tell()} bytes is too large for SJPG")
+        fragments.append(output.getvalue())
+    header = SJPG_MAGIC + b"".join(value.to_bytes(2, "little") for value in
+                                   (width, height, len(fragments), SJPG_SPLIT_HEIGHT, *map(len, fragments)))
+    return header + b"".join(fragments)
+
+
+def decode_sjpg(data):
+    """
+    Decodes the pixels of an SJPG file made by encode_sjpg().
+
+    Args:
+        data: Content of the SJPG file.
+
+    Returns:
+        numpy.ndarray: Height x width x 4 uint8 array, fully opaque.
+    """
+    numpy, Image = load_image_libraries()
+    offset = len(SJPG_MAGIC)
+    count = int.from_bytes(data[offset + 4:offset + 6], "little")
+    sizes = [int.from_bytes(data[offset + 8 + 2 * i:offset + 10 + 2 * i], "little") for i in range(count)]
+    offset += 8 + 2 * count
+    rows = []
+    for size in sizes:
+        with Image.open(io.BytesIO(data[offset:offset + size])) as fragment:
+            rows.append(numpy.asarray(fragment.convert("RGBA")))
+        offset += size
+    return numpy.concatenate(rows)
+
+
+def analyze_image(rgba, color=DEFAULT_COLOR, max_error=None, target=DEFAULT_DRAW_TARGET, decoders=()):
+    """
+    Finds the formats an image can be stored in without changing how it looks,
+    or within max_error if it is quantized to fewer colors.
+
+    Colors are counted as the display shows them, so an image whose colors
+    only differ in bits RGB565 drops fits a smaller palette. An image whose
+    pixels are all fully opaque doesn't need TRUE_COLOR_ALPHA.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+        color: Color settings (see lvgl_color_config()).
+        max_error: Largest difference of a channel (0-255) an indexed format
+            may have after quantizing, or None to only offer indexed formats
+            the image fits without quantizing.
+        target: CPU and flash speed (see draw_target()).
+        decoders: DECODER_FORMATS to add as candidates. They are never
+            picked as 'format'. SJPG is only added for opaque images, with
+            the error of the JPEG compression.
+
+    Returns:
+        dict: 'width', 'height', 'opaque' (no pixel is transparent), 'colors'
+            (number of display colors), 'candidates' (list of dicts with
+            'format', 'size', 'draw_us', 'ram' (see decode_ram()), 'error'
+            and the 'pixels' to pack, largest palette first) and 'format'
+            (the smallest built-in candidate if max_error is set, else
+            TRUE_COLOR or TRUE_COLOR_ALPHA).
+    """
+    numpy, _ = load_image_libraries()
+    height, width = rgba.shape[:2]
+    opaque = bool((rgba[..., 3] == 0xFF).all())
+    screen = display_colors(rgba, color)
+    colors = len(numpy.unique(screen.reshape(-1, 4).view(numpy.uint32)))
+    candidates = []
+
+    def add(color_format, pixels, error, size=None):
+        if size is None:
+            size = image_data_size(color_format, width, height, color["depth"])
+        candidates.append({"format": color_format, "size": size, "error": error, "pixels": pixels,
+                           "draw_us": draw_time_us(color_format, width * height, size, target),
+                           "ram": decode_ram(color_format, width, height, color["depth"])})
+
+    if opaque:
+        add("TRUE_COLOR", rgba, 0)
+    add("TRUE_COLOR_ALPHA", rgba, 0)
+    for bpp in (8, 4, 2, 1):
+        if colors <= 1 << bpp:
+            add(f"INDEXED_{bpp}BIT", screen, 0)
+            continue
+        if max_error is None:
+            break
+        pixels = quantize_colors(rgba, 1 << bpp, color)
+        error = int(numpy.abs(pixels.astype(numpy.int16) - screen).max())
+        if error > max_error:
+            # Fewer colors only make it worse
+            break
+        add(f"INDEXED_{bpp}BIT", pixels, error)
+    if max_error is None:
+        color_format = "TRUE_COLOR" if opaque else "TRUE_COLOR_ALPHA"
+    else:
+        color_format = min(candidates, key=lambda candidate: candidate["size"])["format"]
+    if "PNG" in decoders:
+        add("PNG", rgba, 0, len(pack_image(rgba, "PNG", color)))
+    if "SJPG" in decoders and opaque:
+        data = pack_image(rgba, "SJPG", color)
+        decoded = decode_sjpg(data)
+        if color["order"] == "BGR":
+            decoded = decoded[..., [2, 1, 0, 3]]
+        error = int(numpy.abs(display_colors(decoded, color).astype(numpy.int16) - screen).max())
+        add("SJPG", rgba, error, len(data))
+    return {"width": width, "height": height, "opaque": opaque, "colors": colors,
+            "candidates": candidates, "format": color_format}
+
+
+def image_palette(rgba):
+    """
+    Finds the distinct colors of an image. The color of fully transparent
+    pixels doesn't matter, so they are all counted as one color.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+
+    Returns:
+        tuple: (colors as an n x 4 RGBA uint8 array, height x width array of
+            the index of the color of every pixel)
+    """
+    numpy, _ = load_image_libraries()
+    pixels = rgba.reshape(-1, 4).copy()
+    pixels[pixels[:, 3] == 0] = 0
+    colors, indices = numpy.unique(pixels.view(numpy.uint32).ravel(), return_inverse=True)
+    return colors.view(numpy.uint8).reshape(-1, 4), indices.reshape(rgba.shape[:2])
+
+
+def pack_image(rgba, color_format, color=DEFAULT_COLOR):
+    """
+    Converts RGBA pixels to the pixel data of an LVGL image.
+
+    Args:
+        rgba: Height x width x 4 uint8 array.
+        color_format: Key of COLOR_FORMATS.
+        color: Color settings (see lvgl_color_config()).
+
+    Returns:
+        bytes: Content of lv_img_dsc_t.data.
+
+    Raises:
+        ValueError: If an indexed format has too few colors for the image.
+    """
+    numpy, _ = load_image_libraries()
+    info = COLOR_FORMATS[color_format]
+    if info["kind"] in ("indexed", "png"):
+        rgba = display_colors(rgba, color)
+    if color["order"] == "BGR":
+        rgba = rgba[..., [2, 1, 0, 3]]
+    if info["kind"] == "true_color":
+        colors = pack_colors(rgba, color["depth"], color["swap"])
+        if color_format == "TRUE_COLOR_ALPHA":
+            # The alpha byte follows every color, at 32 bit it replaces the last byte
+            if color["depth"] == 32:
+                colors[..., 3] = rgba[..., 3]
+            else:
+                colors = numpy.concatenate((colors, rgba[..., 3:4]), axis=2)
+        return colors.tobytes()
+    if info["kind"] == "png":
+        return encode_png(rgba)
+    if info["kind"] == "sjpg":
+        return encode_sjpg(rgba)
+    if info["kind"] == "alpha":
+        return pack_bits(rgba[..., 3] >> (8 - info["bpp"]), info["bpp"]).tobytes()
+    colors, indices = image_palette(rgba)
+    palette_size = 1 << info["bpp"]
+    if len(colors) > palette_size:
+        raise ValueError(f"the image has {len(colors)} colors, {color_format} can only hold {palette_size} "
+                         "(set a max error to quantize it)")
+    # The palette always has 2^bpp lv_color32_t entries: blue, green, red, alpha
+    palette = numpy.zeros((palette_size, PALETTE_ENTRY_SIZE), dtype=numpy.uint8)
+    palette[:len(colors)] = colors[:, [2, 1, 0, 3]]
+    return palette.tobytes() + pack_bits(indices.astype(numpy.uint8), info["bpp"]).tobytes()
+
+
+def c_array(data):
+    """
+    Formats bytes as the body of a C array, 16 bytes per line.
+
+    Args:
+        data: Bytes to format.
+
+    Returns:
+        str: Indented lines of '0x..,' values.
+    """
+    numpy, _ = load_image_libraries()
+    if not data:
+        return "    0x00,\n"
+    values = numpy.frombuffer(data, dtype=numpy.uint8)
+    digits = numpy.frombuffer(b"0123456789abcdef", dtype=numpy.uint8)
+    # Every byte becomes '0x', two digits, ',' and a space, or a newline at the end of a line
+    text = numpy.empty((len(values), 6), dtype=numpy.uint8)
+    text[:, 0] = ord("0")
+    text[:, 1] = ord("x")
+    text[:, 2] = digits[values >> 4]
+    text[:, 3] = digits[values & 0x0F]
+    text[:, 4] = ord(",")
+    text[:, 5] = ord(" ")
+    text[ARRAY_LINE_BYTES - 1::ARRAY_LINE_BYTES, 5] = ord("\n")
+    text[-1, 5] = ord("\n")
+    lines = text.tobytes().decode("ascii").replace(" \n", "\n")
+    return "    " + lines[:-1].replace("\n", "\n    ") + "\n"
+
+
+def image_source(image, width, height, color_format, data, image_hash, color=DEFAULT_COLOR):
+    """
+    Generates the C file of an image.
+
+    Args:
+        image: Image dict (see project_images()).
+        width: Width of the image in pixels.
+        height: Height of the image in pixels.
+        color_format: Key of COLOR_FORMATS.
+        data: Pixel data of the image.
+        image_hash: Hash of the image and the conversion settings.
+        color: Color settings the pixels were packed for.
+
+    Returns:
+        str: Content of the C file.
+    """
+    name = image["var"]
+    attribute = f"LV_ATTRIBUTE_IMG_{name[len('img_'):].upper()}"
+    check = ""
+    if color_format in DECODER_FORMATS:
+        option = COLOR_FORMATS[color_format]["option"]
+        check = (f"#if !{option}\n"
+                 f"#error \"{name} is a {color_format} image and needs {option} (CONFIG_{option}).\"\n"
+                 "#endif\n\n")
+    elif COLOR_FORMATS[color_format]["kind"] == "true_color":
+        # LVGL copies the pixels as they are, so they only work with the settings they were made for
+        condition = f"LV_COLOR_DEPTH != {color['depth']}"
+        if color["depth"] == 16:
+            condition += f" || LV_COLOR_16_SWAP != {int(color['swap'])}"
+        check = (f"#if {condition}\n"
+                 f"#error \"{name} was converted for LV_COLOR_DEPTH {color['depth']}"
+                 + (f" with LV_COLOR_16_SWAP {int(color['swap'])}" if color["depth"] == 16 else "")
+                 + ". Convert the images again.\"\n"
+                 "#endif\n\n")
+    return (
+        f"{IMAGE_MARKER}\n"
+        f"// Source: {image['source']} (hash {image_hash})\n"
+        "#include \"lvgl.h\"\n\n"
+        f"{check}"
+        "#ifndef LV_ATTRIBUTE_MEM_ALIGN\n"
+        "#define LV_ATTRIBUTE_MEM_ALIGN\n"
+        "#endif\n\n"
+        f"#ifndef {attribute}\n"
+        f"#define {attribute}\n"
+        "#endif\n\n"
+        f"const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_LARGE_CONST {attribute} uint8_t {name}_map[] = {{\n"
+        f"{c_array(data)}"
+        "};\n\n"
+        f"const lv_img_dsc_t {name} = {{\n"
+        f"    .header.cf = {COLOR_FORMATS[color_format]['cf']},\n"
+        "    .header.always_zero = 0,\n"
+        "    .header.reserved = 0,\n"
+        f"    .header.w = {width},\n"
+        f"    .header.h = {height},\n"
+        f"    .data_size = {len(data)},\n"
+        f"    .data = {name}_map,\n"
+        "};\n"
+    )
+
+
+def project_images(project_file):
+    """
+    Collects the bitmaps of an .eez-project file.
+
+    Args:
+        project_file: Path to the .eez-project file.
+
+    Returns:
+        list: Image dicts with 'name', 'var' (C name of the lv_img_dsc_t),
+            'source' (description), 'data' (content of the image file),
+            'format' (key of COLOR_FORMATS or None for automatic) and 'opaque'
+            (the alpha channel is dropped).
+    """
+    project = load_project(project_file)
+    images = []
+    for bitmap in project.get("bitmaps", []):
+        image = bitmap.get("image") or ""
+        if not DATA_URL_RE.match(image):
+            print(f"WARNING: Bitmap '{bitmap.get('name')}' has no embedded image and is skipped.")
+            continue
+        bpp = bitmap.get("bpp")
+        images.append({
+            "name": bitmap["name"],
+            "var": f"img_{c_name(bitmap['name'])}",
+            "source": f"bitmap '{bitmap['name']}' of {os.path.basename(project_file)}",
+            "data": base64.b64decode(DATA_URL_RE.sub("", image)),
+            "format": color_format_name(bpp) if isinstance(bpp, str) else None,
+            "opaque": bpp in OPAQUE_BITMAP_BPP,
+        })
+    return images
+
+
+def file_images(paths):
+    """
+    Collects PNG and JPEG files.
+
+    Args:
+        paths: Image files and directories containing image files.
+
+    Returns:
+        list: Image dicts (see project_images()), named after the files.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            files.append(path)
+    images = []
+    for file in files:
+        with open(file, "rb") as f:
+            data = f.read()
+        name = os.path.splitext(os.path.basename(file))[0]
+        images.append({"name": name, "var": f"img_{c_name(name)}", "source": os.path.basename(file),
+                       "data": data, "format": None, "opaque": False})
+    return images
+
+
+def image_file_name(image):
+    """
+    Returns the name of the C file of an image, as EEZ-Studio names it.
+    """
+    return f"ui_image_{image['var'][len('img_'):]}.c"
+
+
+def converted_hash(file_path):
+    """
+    Reads the hash a converted image was made from.
+
+    Args:
+        file_path: Path to the C file of the image.
+
+    Returns:
+        str: The hash, or None if the file doesn't exist or wasn't made by
+            this converter.
+    """
+    if not os.path.isfile(file_path):
+        return None
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        if f.readline().rstrip("\r\n") != IMAGE_MARKER:
+            return None
+        match = IMAGE_HASH_RE.match(f.readline().rstrip("\r\n"))
+    return match.group(2) if match else None
+
+
+def load_manifest(manifest_file):
+    """
+    Loads the formats advise_ui_images.py picked for the images.
+
+    Args:
+        manifest_file: Path to the JSON manifest.
+
+    Returns:
+        dict: Image name -> {'format': key of COLOR_FORMATS, 'max_error':
+            error the image may be quantized with, or None}.
+
+    Raises:
+        ValueError: If the manifest can't be used.
+    """
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        try:
+            manifest = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"'{manifest_file}' is not valid JSON: {e}") from e
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"'{manifest_file}' has version {manifest.get('version')}, expected {MANIFEST_VERSION}")
+    formats = {}
+    for name, entry in manifest.get("images", {}).items():
+        color_format = color_format_name(entry.get("format"))
+        if color_format is None:
+            raise ValueError(f"'{manifest_file}' has the unknown format '{entry.get('format')}' for '{name}'")
+        formats[name] = {"format": color_format, "max_error": entry.get("max_error")}
+    return formats
+
+
+def convert_images(images, output_dir, color=DEFAULT_COLOR, color_format=None, prune=False, writer=write_if_changed,
+                   max_error=None, target=DEFAULT_DRAW_TARGET, manifest=None, rotation=0):
+    """
+    Converts images into lv_img_dsc_t C files. An image whose content and
+    conversion settings have the same hash as its existing C file is skipped
+    without being decoded.
+
+    Args:
+        images: Image dicts (see project_images()).
+        output_dir: Directory the ui_image_<name>.c files are written to.
+        color: Color settings (see lvgl_color_config()).
+        color_format: Key of COLOR_FORMATS used for all images, or None to
+            use the format of the manifest or of every image, or the format analyze_image()
+            picks: TRUE_COLOR_ALPHA for images with transparent pixels and
+            TRUE_COLOR for the others, or the smallest format within
+            max_error.
+        prune: Delete the converted images that are not in images.
+        writer: Function called with the path and content of every file, e.g.
+            write_if_changed() of the running importer so its report counts them.
+        max_error: Largest difference of a channel (0-255) quantizing an
+            image to an indexed format may cause, or None to never quantize.
+        target: CPU and flash speed the draw times are estimated for (see
+            draw_target()).
+        manifest: Result of load_manifest(), its format and max error
+            replace those of the images it names.
+        rotation: Rotation of the screens in degrees, the images are rotated
+            with them (see rotate_pixels()).
+
+    Returns:
+        dict: 'converted', 'cached' and 'removed' counts, 'failed' list of
+            (name, error) and 'images' list of (name, color format, width,
+            height, data size, draw time in microseconds) of the converted
+            images.
+    """
+    result = {"converted": 0, "cached": 0, "removed": 0, "failed": [], "images": []}
+    wanted = set()
+    for image in images:
+        file_name = image_file_name(image)
+        if file_name in wanted:
+            result["failed"].append((image["name"], f"another image is also converted into {file_name}"))
+            continue
+        wanted.add(file_name)
+        file_path = os.path.join(output_dir, file_name)
+        entry = (manifest or {}).get(image["name"])
+        requested = color_format or (entry["format"] if entry else image["format"])
+        image_max_error = entry["max_error"] if entry else max_error
+        settings = json.dumps({"version": CONVERTER_VERSION, "depth": color["depth"], "swap": color["swap"],
+                               "order": color["order"], "format": requested, "opaque": image.get("opaque", False),
+                               "max_error": image_max_error, "rotation": rotation, "var": image["var"]}, sort_keys=True)
+        image_hash = hashlib.sha256(settings.encode("utf-8") + image["data"]).hexdigest()
+        if converted_hash(file_path) == image_hash:
+            result["cached"] += 1
+            continue
+        try:
+            rgba, _ = decode_image(image["data"], image.get("opaque", False))
+            if rotation:
+                rgba = rotate_pixels(rgba, rotation)
+            analysis = analyze_image(rgba, color, image_max_error, target)
+            fmt = requested or analysis["format"]
+            # A quantized candidate replaces the pixels, otherwise they are packed as they are
+            candidate = next((c for c in analysis["candidates"] if c["format"] == fmt), None)
+            data = pack_image(candidate["pixels"] if candidate else rgba, fmt, color)
+        except (OSError, ValueError) as e:
+            result["failed"].append((image["name"], str(e)))
+            continue
+        height, width = rgba.shape[:2]
+        writer(file_path, image_source(image, width, height, fmt, data, image_hash, color))
+        result["converted"] += 1
+        result["images"].append((image["name"], fmt, width, height, len(data),
+                                 draw_time_us(fmt, width * height, len(data), target)))
+    if prune and os.path.isdir(output_dir):
+        for file in sorted(os.listdir(output_dir)):
+            if re.fullmatch(r"ui_image_\w+\.c", file) and file not in wanted and converted_hash(os.path.join(output_dir, file)):
+                os.remove(os.path.join(output_dir, file))
+                result["removed"] += 1
+    return result
+
+
+def analyze_images(images, color=DEFAULT_COLOR, max_error=None, target=DEFAULT_DRAW_TARGET, decoders=()):
+    """
+    Analyzes images without converting them (see analyze_image()).
+
+    Args:
+        images: Image dicts (see project_images()).
+        color: Color settings (see lvgl_color_config()).
+        max_error: Largest difference of a channel quantizing may cause, or None.
+        target: CPU and flash speed (see draw_target()).
+        decoders: DECODER_FORMATS to add as candidates.
+
+    Returns:
+        list: (name, analysis, (format, size) the image had without
+            analysis) of every image, or (name, error message, None) if it
+            couldn't be decoded. The pixels of the candidates are dropped.
+    """
+    analyses = []
+    for image in images:
+        try:
+            rgba, has_alpha = decode_image(image["data"], image.get("opaque", False))
+        except OSError as e:
+            analyses.append((image["name"], str(e), None))
+            continue
+        analysis = analyze_image(rgba, color, max_error, target, decoders)
+        for candidate in analysis["candidates"]:
+            del candidate["pixels"]
+        before = "TRUE_COLOR_ALPHA" if has_alpha else "TRUE_COLOR"
+        analyses.append((image["name"], analysis,
+                         (before, image_data_size(before, analysis["width"], analysis["height"], color["depth"]))))
+    return analyses
+
+
+def print_analysis(analyses, target=DEFAULT_DRAW_TARGET):
+    """
+    Prints the formats every image can be stored in, with the flash it saves
+    against the format it had without analysis (TRUE_COLOR_ALPHA for every
+    image with an alpha channel) and the estimated draw time.
+
+    Args:
+        analyses: Result of analyze_images().
+        target: CPU and flash speed the draw times were estimated for.
+    """
+    print(f"\nImage analysis (draw times estimated for {target['cpu_mhz']} MHz, flash {target['flash']}, "
+          "* marks the automatic format)")
+    print(f"      {'format':<18} {'size':>11} {'vs. export':>12} {'draw':>11} {'heap':>11}  quality")
+    saved = 0
+    for name, analysis, before in analyses:
+        if before is None:
+            print(f"ERROR: Could not analyze '{name}': {analysis}")
+            continue
+        print(f"  {name} ({analysis['width']} x {analysis['height']}, {analysis['colors']} colors"
+              + (", opaque)" if analysis["opaque"] else ", transparent)"))
+        _, before_size = before
+        for candidate in analysis["candidates"]:
+            chosen = candidate["format"] == analysis["format"]
+            if chosen:
+                saved += before_size - candidate["size"]
+            error = f"error {candidate['error']}" if candidate["error"] else "lossless"
+            print(f"    {'*' if chosen else ' '} {candidate['format']:<18} {candidate['size'] / 1024:>8.1f} KB "
+                  f"{(candidate['size'] - before_size) / 1024:>+9.1f} KB {candidate['draw_us'] / 1000:>8.2f} ms "
+                  f"{candidate['ram'] / 1024:>8.1f} KB  {error}")
+    print(f"The automatic formats save {saved / 1024:.1f} KB of flash.")
+
+
+def print_conversion(result):
+    """
+    Prints the images converted by convert_images().
+
+    Args:
+        result: Result of convert_images().
+    """
+    for name, fmt, width, height, size, draw_us in result["images"]:
+        print(f"  {name:<24} {fmt:<18} {width:>5} x {height:<5} {size / 1024:>8.1f} KB {draw_us / 1000:>8.2f} ms")
+    for name, error in result["failed"]:
+        print(f"ERROR: Could not convert '{name}': {error}")
+    print(f"Converted {result['converted']} images, {result['cached']} unchanged"
+          + (f", {result['removed']} removed." if result["removed"] else "."))
+
+
+def main():
+    """
+    Main function to run the converter with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Convert PNG/JPEG images or the bitmaps of an .eez-project file into LVGL image C files')
+    parser.add_argument('inputs', nargs='+', help='.eez-project file, or PNG/JPEG files and directories')
+    parser.add_argument('-o', '--output', default=DEFAULT_SOURCE_DIR, help=f'Directory the ui_image_<name>.c files are written to (default: {DEFAULT_SOURCE_DIR})')
+    parser.add_argument('-f', '--color-format', choices=sorted(COLOR_FORMATS), default=None, help='Color format of all images (default: the format of the bitmap, or TRUE_COLOR_ALPHA for images with transparent pixels and TRUE_COLOR for the others)')
+    parser.add_argument('-e', '--max-error', type=int, default=None, metavar='N', help='Quantize images to the smallest indexed format that changes no channel by more than N (0-255, 0: only lossless)')
+    parser.add_argument('-m', '--manifest', default=None, help='Format manifest written by advise_ui_images.py')
+    parser.add_argument('-a', '--analyze', action='store_true', help='Only print the formats every image can be stored in, with flash size and estimated draw time')
+    parser.add_argument('--color-order', choices=['auto', 'rgb', 'bgr'], default='auto', help='Channel order of the panel (default: auto, RGB like LVGL)')
+    parser.add_argument('--rotation', type=int, choices=ROTATIONS, default=0, help='Rotate the images counterclockwise by this many degrees, like the screens of generate_eez_ui.py --rotation (default: 0)')
+    parser.add_argument('--project-root', default='.', help='ESP-IDF project with the sdkconfig (default: .)')
+    args = parser.parse_args()
+
+    try:
+        load_image_libraries()
+    except ImportError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    project_file = args.inputs[0] if args.inputs[0].endswith(".eez-project") else None
+    color = lvgl_color_config(args.project_root, project_color_order(project_file, args.color_order))
+    if project_file:
+        images = project_images(args.inputs[0]) + file_images(args.inputs[1:])
+    else:
+        images = file_images(args.inputs)
+    target = draw_target(args.project_root)
+    try:
+        manifest = load_manifest(args.manifest) if args.manifest else None
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if args.analyze:
+        analyses = analyze_images(images, color, args.max_error, target)
+        print_analysis(analyses, target)
+        sys.exit(1 if any(before is None for _, _, before in analyses) else 0)
+    print(f"\nConverting {len(images)} images into '{args.output}' ({describe_color(color)}).")
+    result = convert_images(images, args.output, color, args.color_format, max_error=args.max_error, target=target, manifest=manifest,
+                            rotation=args.rotation)
+    print_conversion(result)
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
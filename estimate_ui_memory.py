@@ -0,0 +1,468 @@
+import os
+import re
+import sys
+import json
+import argparse
+
+from import_eez_ui import SCREEN_FUNCTION_RE, DEFAULT_PROJECT_DIR, screen_source_files
+
+# Allocations of a running animation: lv_anim_t and its linked list node
+ANIM_SIZE = 76
+# LVGL heap used by every widget type of LVGL 8.4 on the ESP32-S3 (32 bit) with
+# the sdkconfig of this project:
+#   size: sizeof() of the widget struct, e.g. lv_label_t
+#   children: sizeof() of the objects the widget creates itself, e.g. the
+#       label of a textarea
+#   styles: style entries lv_theme_default and the widget's constructor add
+#       to the widget and its own children
+#   spec_attrs: objects of the widget that allocate _lv_obj_spec_attr_t
+#   local_props: local style properties the constructor sets on the widget
+#   extra: sizes of the other blocks the constructor allocates
+#   text: bytes of the text the widget copies until it gets its own
+WIDGET_FOOTPRINTS = {
+    "obj": {"size": 36, "children": [], "styles": 3, "spec_attrs": 0},
+    "label": {"size": 76, "children": [], "styles": 0, "spec_attrs": 1, "text": len("Text") + 1},
+    "btn": {"size": 36, "children": [], "styles": 9, "spec_attrs": 1},
+    "img": {"size": 60, "children": [], "styles": 0, "spec_attrs": 0},
+    "bar": {"size": 96, "children": [], "styles": 6, "spec_attrs": 0},
+    "slider": {"size": 120, "children": [], "styles": 10, "spec_attrs": 1},
+    "arc": {"size": 68, "children": [], "styles": 4, "spec_attrs": 1},
+    "spinner": {"size": 68, "children": [], "styles": 3, "spec_attrs": 1, "extra": [ANIM_SIZE, ANIM_SIZE]},
+    "switch": {"size": 40, "children": [], "styles": 14, "spec_attrs": 0},
+    "checkbox": {"size": 44, "children": [], "styles": 10, "spec_attrs": 0, "text": len("Check box") + 1},
+    "textarea": {"size": 100, "children": [76], "styles": 10, "spec_attrs": 2, "extra": [8, 12, ANIM_SIZE], "text": 1},
+    "dropdown": {"size": 64, "children": [], "styles": 8, "spec_attrs": 0},
+    "roller": {"size": 44, "children": [76], "styles": 8, "spec_attrs": 2,
+               "text": len("Option 1\nOption 2\nOption 3\nOption 4\nOption 5") + 1},
+    "led": {"size": 40, "children": [], "styles": 1, "spec_attrs": 1},
+    "tabview": {"size": 48, "children": [56, 36], "styles": 14, "spec_attrs": 3,
+                "local_props": {"flex_flow", "layout", "width", "height"}, "extra": [4, 8, 12, 12, 12, 8, 24]},
+    "tab": {"size": 36, "children": [], "styles": 4, "spec_attrs": 0, "local_props": {"width", "height"},
+            "extra": [8, 8, 4]},
+    "chart": {"size": 140, "children": [], "styles": 9, "spec_attrs": 0},
+    "keyboard": {"size": 64, "children": [], "styles": 13, "spec_attrs": 1},
+    "list": {"size": 36, "children": [], "styles": 5, "spec_attrs": 0},
+    "table": {"size": 56, "children": [], "styles": 13, "spec_attrs": 0},
+    "meter": {"size": 60, "children": [], "styles": 3, "spec_attrs": 0},
+    "btnmatrix": {"size": 56, "children": [], "styles": 9, "spec_attrs": 0},
+    "calendar": {"size": 448, "children": [56], "styles": 12, "spec_attrs": 2},
+    "colorwheel": {"size": 64, "children": [], "styles": 4, "spec_attrs": 1},
+    "imgbtn": {"size": 112, "children": [], "styles": 0, "spec_attrs": 0},
+    "line": {"size": 44, "children": [], "styles": 1, "spec_attrs": 1},
+    "canvas": {"size": 72, "children": [], "styles": 0, "spec_attrs": 0},
+    "spinbox": {"size": 120, "children": [76], "styles": 7, "spec_attrs": 2},
+    "animimg": {"size": 136, "children": [], "styles": 0, "spec_attrs": 0},
+    "spangroup": {"size": 64, "children": [], "styles": 0, "spec_attrs": 0},
+    "menu": {"size": 100, "children": [36, 36, 36, 60, 76, 36], "styles": 24, "spec_attrs": 5},
+    "tileview": {"size": 40, "children": [], "styles": 4, "spec_attrs": 1},
+    "win": {"size": 36, "children": [36, 36], "styles": 10, "spec_attrs": 1},
+    "msgbox": {"size": 56, "children": [76, 36, 76, 36, 76], "styles": 16, "spec_attrs": 6},
+}
+# Sizes of the other LVGL allocations
+SPEC_ATTR_SIZE = 28          # _lv_obj_spec_attr_t
+STYLE_ENTRY_SIZE = 8         # _lv_obj_style_t, one per style of an object
+STYLE_SIZE = 8               # lv_style_t of a local style
+STYLE_PROP_SIZE = 6          # lv_style_value_t + property id of a style with several properties
+EVENT_DSC_SIZE = 12          # lv_event_dsc_t
+POINTER_SIZE = 4
+# Block overhead, alignment and minimum block of the ESP-IDF heap (TLSF)
+HEAP_BLOCK_OVERHEAD = 4
+HEAP_ALIGN = 4
+HEAP_MIN_BLOCK = 12
+# Bytes assumed for a label text that is set from a variable
+DYNAMIC_TEXT_BYTES = 32
+
+# Setters that copy a text into the LVGL heap
+TEXT_SETTERS = {
+    "lv_label_set_text", "lv_textarea_set_text", "lv_textarea_set_placeholder_text", "lv_dropdown_set_options",
+    "lv_roller_set_options", "lv_checkbox_set_text",
+}
+# Object functions that set local style properties of LV_PART_MAIN | LV_STATE_DEFAULT
+LOCAL_STYLE_SETTERS = {
+    "lv_obj_set_pos": ("x", "y"),
+    "lv_obj_set_x": ("x",),
+    "lv_obj_set_y": ("y",),
+    "lv_obj_set_size": ("width", "height"),
+    "lv_obj_set_width": ("width",),
+    "lv_obj_set_height": ("height",),
+    "lv_obj_set_align": ("align",),
+    "lv_obj_align": ("align", "x", "y"),
+    "lv_obj_center": ("align", "x", "y"),
+    "lv_obj_set_flex_flow": ("flex_flow", "layout"),
+    "lv_obj_set_flex_align": ("flex_main_place", "flex_cross_place", "flex_track_place"),
+    "lv_obj_set_flex_grow": ("flex_grow",),
+}
+# Object functions that allocate the special attributes of an object
+SPEC_ATTR_SETTERS = {
+    "lv_obj_add_event_cb", "lv_obj_set_scrollbar_mode", "lv_obj_set_scroll_dir", "lv_obj_set_scroll_snap_x",
+    "lv_obj_set_scroll_snap_y", "lv_obj_set_ext_click_area",
+}
+
+OBJECT_RE = re.compile(r"lv_obj_t \*obj = (\w+)\((\w+)?")
+OBJECT_CALL_RE = re.compile(r"^\s*(\w+)\(obj\b(.*)\);\s*$")
+STYLE_CALL_RE = re.compile(r"^lv_obj_set_style_(\w+)$")
+C_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+C_ESCAPE_RE = re.compile(r"\\(x[0-9a-fA-F]+|[0-7]{1,3}|.)")
+STYLE_FUNCTION_RE = re.compile(r"^(?:void|lv_style_t \*)\s*(\w+)\([^)]*\) \{\r?\n(.*?)^\}", re.M | re.S)
+LV_MEM_SIZE_RE = re.compile(r"^\s*#define\s+LV_MEM_SIZE\s+(.+?)\s*(?://.*|/\*.*)?$", re.M)
+LV_MEM_CUSTOM_RE = re.compile(r"^\s*#define\s+LV_MEM_CUSTOM\s+(\d+)", re.M)
+
+
+def heap_block(size):
+    """
+    Returns the heap one allocation uses, including the block overhead.
+
+    Args:
+        size: Requested bytes.
+
+    Returns:
+        int: Bytes taken from the heap.
+    """
+    size = (size + HEAP_ALIGN - 1) // HEAP_ALIGN * HEAP_ALIGN
+    return max(size, HEAP_MIN_BLOCK) + HEAP_BLOCK_OVERHEAD
+
+
+def c_string_size(arguments):
+    """
+    Returns the size of the first C string literal in the arguments of a call,
+    including the terminating zero. Adjacent literals are joined like the
+    compiler does.
+
+    Args:
+        arguments: Source of the arguments.
+
+    Returns:
+        int: Bytes of the string, or None if the argument is not a literal.
+    """
+    literal = re.match(r'\s*,\s*((?:"(?:[^"\\]|\\.)*"\s*)+)', arguments)
+    if not literal:
+        return None
+    size = 1
+    for text in C_STRING_RE.findall(literal.group(1)):
+        escapes = C_ESCAPE_RE.findall(text)
+        size += len(C_ESCAPE_RE.sub("", text).encode("utf-8")) + len(escapes)
+    return size
+
+
+def selector_key(selector):
+    """
+    Returns a key that is equal for equal style selectors, e.g. for '0' and
+    'LV_PART_MAIN | LV_STATE_DEFAULT'.
+
+    Args:
+        selector: Source of the selector argument.
+
+    Returns:
+        tuple: Sorted parts and states that are not 0.
+    """
+    parts = (part.strip() for part in selector.split("|"))
+    return tuple(sorted(part for part in parts if part not in ("0", "LV_PART_MAIN", "LV_STATE_DEFAULT")))
+
+
+def parse_styles(content):
+    """
+    Collects the styles of styles.c.
+
+    Args:
+        content: Content of styles.c.
+
+    Returns:
+        tuple: (add_style_<name>() function -> number of styles it adds,
+            heap used by the shared styles once they are initialized).
+    """
+    add_styles = {}
+    heap = 0
+    for name, body in STYLE_FUNCTION_RE.findall(content):
+        if name.startswith("add_style_"):
+            add_styles[name] = body.count("lv_obj_add_style(")
+        props = body.count("lv_style_set_")
+        if props > 1:
+            heap += heap_block(props * STYLE_PROP_SIZE)
+        heap += body.count("lv_mem_alloc(sizeof(lv_style_t))") * heap_block(STYLE_SIZE)
+    return add_styles, heap
+
+
+def parse_screen(body, add_styles):
+    """
+    Collects the objects of a create_screen_<name>() function and the LVGL
+    heap they use.
+
+    Args:
+        body: Source of the function.
+        add_styles: add_style_<name>() function -> number of styles it adds.
+
+    Returns:
+        list: One dict per object with its type, parent index, local style
+            properties per selector, added styles, events, text bytes and
+            whether it needs special attributes.
+    """
+    objects = []
+    # (brace depth of the block, index of the object declared in it)
+    scope = []
+    depth = 0
+    for line in body.splitlines():
+        declaration = OBJECT_RE.search(line)
+        if declaration:
+            function, first_argument = declaration.groups()
+            if function == "lv_tabview_add_tab":
+                widget = "tab"
+            else:
+                widget = re.sub(r"^lv_(\w+)_create$", r"\1", function)
+            footprint = WIDGET_FOOTPRINTS.get(widget, WIDGET_FOOTPRINTS["obj"])
+            obj = {"type": widget, "parent": scope[-1][1] if scope and first_argument != "NULL" else None,
+                   "styles": {}, "added_styles": 0, "events": 0, "text": footprint.get("text"), "spec_attr": False}
+            if widget == "tab":
+                obj["text"] = c_string_size(line[declaration.end():]) or 0
+            objects.append(obj)
+            scope.append((depth, len(objects) - 1))
+        else:
+            call = OBJECT_CALL_RE.match(line)
+            if call and scope:
+                function, arguments = call.groups()
+                obj = objects[scope[-1][1]]
+                style = STYLE_CALL_RE.match(function)
+                if style:
+                    selector = selector_key(arguments.rsplit(",", 1)[1])
+                    obj["styles"].setdefault(selector, set()).add(style.group(1))
+                elif function in LOCAL_STYLE_SETTERS:
+                    obj["styles"].setdefault((), set()).update(LOCAL_STYLE_SETTERS[function])
+                elif function == "lv_obj_add_style":
+                    obj["added_styles"] += 1
+                elif function in add_styles:
+                    obj["added_styles"] += add_styles[function]
+                elif function in TEXT_SETTERS:
+                    size = c_string_size(arguments)
+                    obj["text"] = DYNAMIC_TEXT_BYTES if size is None else size
+                elif function == "lv_label_set_text_static":
+                    obj["text"] = None
+                if function == "lv_obj_add_event_cb":
+                    obj["events"] += 1
+                if function in SPEC_ATTR_SETTERS:
+                    obj["spec_attr"] = True
+        depth += line.count("{") - line.count("}")
+        while scope and scope[-1][0] > depth:
+            scope.pop()
+    return objects
+
+
+def object_heap(obj, child_count):
+    """
+    Returns the LVGL heap one object uses.
+
+    Args:
+        obj: Object returned by parse_screen().
+        child_count: Number of children created by the screen code.
+
+    Returns:
+        int: Bytes of heap.
+    """
+    footprint = WIDGET_FOOTPRINTS.get(obj["type"], WIDGET_FOOTPRINTS["obj"])
+    heap = heap_block(footprint["size"]) + sum(heap_block(size) for size in footprint["children"] + footprint.get("extra", []))
+    spec_attrs = footprint["spec_attrs"]
+    if not spec_attrs and (obj["spec_attr"] or obj["events"] or child_count):
+        spec_attrs = 1
+    heap += spec_attrs * heap_block(SPEC_ATTR_SIZE)
+    children = child_count + len(footprint["children"])
+    if children:
+        heap += heap_block(children * POINTER_SIZE)
+    if obj["events"]:
+        heap += heap_block(obj["events"] * EVENT_DSC_SIZE)
+    styles = dict(obj["styles"])
+    style_entries = footprint["styles"] + obj["added_styles"] + len(styles)
+    if footprint.get("local_props"):
+        # The constructor's local style is already one of the widget's styles
+        style_entries -= () in styles
+        styles[()] = styles.get((), set()) | footprint["local_props"]
+    if style_entries:
+        heap += heap_block(style_entries * STYLE_ENTRY_SIZE)
+    for props in styles.values():
+        heap += heap_block(STYLE_SIZE)
+        if len(props) > 1:
+            heap += heap_block(len(props) * STYLE_PROP_SIZE)
+    if obj["text"]:
+        heap += heap_block(obj["text"])
+    return heap
+
+
+def lvgl_memory_pool(project_root="."):
+    """
+    Finds the size of LVGL's heap from the lv_conf.h or sdkconfig of the project.
+
+    Args:
+        project_root: Path to the ESP-IDF project.
+
+    Returns:
+        dict: 'custom' -> True if LVGL allocates with malloc (LV_MEM_CUSTOM),
+            'size' -> LV_MEM_SIZE in bytes or None, 'source' -> file it was read
+            from, 'internal_below' -> malloc() size up to which PSRAM builds
+            prefer internal RAM, or None.
+    """
+    pool = {"custom": False, "size": None, "source": None, "internal_below": None}
+    sdkconfig = {}
+    sdkconfig_path = os.path.join(project_root, "sdkconfig")
+    if os.path.isfile(sdkconfig_path):
+        with open(sdkconfig_path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                if key.startswith("CONFIG_"):
+                    sdkconfig[key] = value.strip('"')
+    if sdkconfig.get("CONFIG_SPIRAM_USE_MALLOC") == "y":
+        pool["internal_below"] = int(sdkconfig.get("CONFIG_SPIRAM_MALLOC_ALWAYSINTERNAL", "0")) or None
+    if sdkconfig and sdkconfig.get("CONFIG_LV_CONF_SKIP") == "y":
+        pool["source"] = sdkconfig_path
+        pool["custom"] = sdkconfig.get("CONFIG_LV_MEM_CUSTOM") == "y"
+        if not pool["custom"] and sdkconfig.get("CONFIG_LV_MEM_SIZE_KILOBYTES"):
+            pool["size"] = int(sdkconfig["CONFIG_LV_MEM_SIZE_KILOBYTES"]) * 1024
+        return pool
+    for candidate in ("lv_conf.h", os.path.join("main", "lv_conf.h"), os.path.join("components", "lv_conf.h"),
+                      os.path.join("include", "lv_conf.h")):
+        conf_path = os.path.join(project_root, candidate)
+        if not os.path.isfile(conf_path):
+            continue
+        with open(conf_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        pool["source"] = conf_path
+        custom = LV_MEM_CUSTOM_RE.search(content)
+        pool["custom"] = bool(custom and custom.group(1) != "0")
+        size = LV_MEM_SIZE_RE.search(content)
+        if not pool["custom"] and size:
+            expression = re.sub(r"(\d+)[uUlL]+", r"\1", size.group(1))
+            if re.fullmatch(r"[\d\s()*+\-/]+", expression):
+                pool["size"] = int(eval(expression))
+        break
+    return pool
+
+
+def estimate_memory(project_dir=DEFAULT_PROJECT_DIR, resident=0, project_root="."):
+    """
+    Estimates the LVGL heap every screen of an imported UI uses once it is
+    created.
+
+    Counts the widgets by type, local styles, texts and event callbacks of
+    every create_screen_<name>() function and adds up the heap LVGL 8.4
+    allocates for them. LVGL's own objects (display, theme, fonts, image
+    cache) are not included.
+
+    Args:
+        project_dir: Path to the UI project directory.
+        resident: Number of resident screens of lazy screens, 0 if every
+            screen is created at ui_init().
+        project_root: Path to the ESP-IDF project with the sdkconfig.
+
+    Returns:
+        dict: 'screens' -> per-screen estimates, 'shared_styles' -> heap of
+            the shared styles, 'peak' -> heap with the most screens created at
+            once, 'pool' -> result of lvgl_memory_pool().
+    """
+    add_styles, shared_styles = {}, 0
+    styles_path = os.path.join(project_dir, "styles.c")
+    if os.path.isfile(styles_path):
+        with open(styles_path, "r", encoding="utf-8") as f:
+            add_styles, shared_styles = parse_styles(f.read())
+    screens = []
+    for file in screen_source_files(project_dir):
+        with open(os.path.join(project_dir, file), "r", encoding="utf-8") as f:
+            content = f.read()
+        for match in SCREEN_FUNCTION_RE.finditer(content):
+            if match.group(1) != "create":
+                continue
+            objects = parse_screen(match.group(0), add_styles)
+            child_counts = [0] * len(objects)
+            for obj in objects:
+                if obj["parent"] is not None:
+                    child_counts[obj["parent"]] += 1
+            widgets = {}
+            for obj in objects:
+                widgets[obj["type"]] = widgets.get(obj["type"], 0) + 1
+            screens.append({
+                "screen": match.group(2),
+                "objects": len(objects),
+                "widgets": widgets,
+                "local_styles": sum(len(obj["styles"]) for obj in objects),
+                "style_props": sum(len(props) for obj in objects for props in obj["styles"].values()),
+                "text_bytes": sum(obj["text"] or 0 for obj in objects),
+                "events": sum(obj["events"] for obj in objects),
+                "heap_bytes": sum(object_heap(obj, count) for obj, count in zip(objects, child_counts)),
+            })
+    # The screen list of the display, and with lazy screens the screen that is
+    # created before ui_tick() deletes the least recently used one
+    created = len(screens) if not resident else min(resident + 1, len(screens))
+    largest = sorted((screen["heap_bytes"] for screen in screens), reverse=True)[:created]
+    peak = shared_styles + sum(largest) + (heap_block(len(screens) * POINTER_SIZE) if screens else 0)
+    return {"screens": screens, "shared_styles": shared_styles, "peak": peak, "resident": resident,
+            "pool": lvgl_memory_pool(project_root)}
+
+
+def print_estimate(estimate, budget=None):
+    """
+    Prints the per-screen estimates and compares the peak with LV_MEM_SIZE,
+    or with the given budget.
+
+    Args:
+        estimate: Result of estimate_memory().
+        budget: Heap in bytes the UI may use, or None to use LV_MEM_SIZE.
+
+    Returns:
+        bool: False if the peak is larger than the budget, True otherwise.
+    """
+    screens = sorted(estimate["screens"], key=lambda screen: screen["heap_bytes"], reverse=True)
+    if not screens:
+        print("No create_screen_*() functions found.")
+        return True
+    print(f"  {'screen':<24} {'objects':>8} {'styles':>7} {'props':>6} {'text (B)':>9} {'events':>7} {'heap (KB)':>10}")
+    for screen in screens:
+        print(f"  {screen['screen']:<24} {screen['objects']:>8} {screen['local_styles']:>7} {screen['style_props']:>6} "
+              f"{screen['text_bytes']:>9} {screen['events']:>7} {screen['heap_bytes'] / 1024:>10.1f}")
+    for screen in screens:
+        widgets = ", ".join(f"{count} {widget}" for widget, count in sorted(screen["widgets"].items(), key=lambda item: -item[1]))
+        print(f"  {screen['screen']}: {widgets}")
+    print(f"Shared styles: {estimate['shared_styles'] / 1024:.1f} KB")
+    if estimate["resident"]:
+        print(f"Peak with {min(estimate['resident'] + 1, len(screens))} of {len(screens)} lazy screens created: {estimate['peak'] / 1024:.1f} KB")
+    else:
+        print(f"Peak with all {len(screens)} screens created: {estimate['peak'] / 1024:.1f} KB")
+
+    pool = estimate["pool"]
+    if pool["internal_below"]:
+        print(f"Note: malloc() serves blocks of up to {pool['internal_below']} bytes from internal RAM first, "
+              "so the widgets use internal RAM, not PSRAM.")
+    source = "--memory-budget"
+    if budget is None:
+        budget = pool["size"]
+        source = f"LV_MEM_SIZE ({pool['source']})"
+    if budget is None:
+        if pool["custom"]:
+            print("LVGL allocates with malloc() (LV_MEM_CUSTOM), so there is no LV_MEM_SIZE to compare with. "
+                  "Set a budget with --memory-budget.")
+        return True
+    if estimate["peak"] > budget:
+        print(f"ERROR: The screens need about {estimate['peak'] / 1024:.1f} KB, more than the {budget / 1024:.1f} KB of {source}.")
+        return False
+    print(f"{estimate['peak'] / 1024:.1f} KB of {budget / 1024:.1f} KB ({estimate['peak'] * 100 / budget:.0f}%) of {source} used.")
+    return True
+
+
+def main():
+    """
+    Main function to run the estimator with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Estimate the LVGL heap used by the screens of an imported EEZ UI')
+    parser.add_argument('project_dir', nargs='?', default=DEFAULT_PROJECT_DIR, help=f'UI project directory (default: {DEFAULT_PROJECT_DIR})')
+    parser.add_argument('--resident', type=int, default=0, help='Resident screens of lazy screens (default: all screens are created)')
+    parser.add_argument('--memory-budget', type=int, default=None, metavar='KB', help='Heap the screens may use, instead of LV_MEM_SIZE')
+    parser.add_argument('--project-root', default='.', help='ESP-IDF project with the sdkconfig (default: .)')
+    parser.add_argument('--json', default=None, help='Also save the estimate as JSON to this file')
+    args = parser.parse_args()
+
+    estimate = estimate_memory(args.project_dir, args.resident, args.project_root)
+    print(f"\nEstimated LVGL heap of the screens in '{args.project_dir}':")
+    fits = print_estimate(estimate, args.memory_budget * 1024 if args.memory_budget is not None else None)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(estimate, f, indent=2)
+        print(f"\nEstimate saved to {args.json}")
+    sys.exit(0 if fits else 1)
+
+
+if __name__ == "__main__":
+    main()
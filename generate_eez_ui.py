@@ -0,0 +1,1325 @@
+import os
+import re
+import argparse
+import json
+import sys
+import copy
+import hashlib
+
+from import_eez_ui import write_if_changed, PROJECT_INDEX_FILE, SCREEN_FUNCTION_RE
+
+# Placeholder used by the EEZ-Studio templates in settings.build.files
+PLACEHOLDER_RE = re.compile(r"//\$\{eez-studio (\w+)\}")
+
+# LVGL 8.3 create function of every supported EEZ widget type
+WIDGET_CREATE_FUNCTIONS = {
+    "LVGLPanelWidget": "lv_obj_create",
+    "LVGLContainerWidget": "lv_obj_create",
+    "LVGLUserWidgetWidget": "lv_obj_create",
+    "LVGLLabelWidget": "lv_label_create",
+    "LVGLButtonWidget": "lv_btn_create",
+    "LVGLImageWidget": "lv_img_create",
+    "LVGLBarWidget": "lv_bar_create",
+    "LVGLSliderWidget": "lv_slider_create",
+    "LVGLSwitchWidget": "lv_switch_create",
+    "LVGLCheckboxWidget": "lv_checkbox_create",
+    "LVGLArcWidget": "lv_arc_create",
+    "LVGLSpinnerWidget": "lv_spinner_create",
+    "LVGLTextareaWidget": "lv_textarea_create",
+    "LVGLDropdownWidget": "lv_dropdown_create",
+    "LVGLRollerWidget": "lv_roller_create",
+    "LVGLLedWidget": "lv_led_create",
+}
+
+# Flags EEZ-Studio sets on a new widget. Only differences are emitted.
+DEFAULT_WIDGET_FLAGS = {
+    "CLICK_FOCUSABLE", "GESTURE_BUBBLE", "PRESS_LOCK", "SCROLLABLE", "SCROLL_CHAIN_HOR",
+    "SCROLL_CHAIN_VER", "SCROLL_ELASTIC", "SCROLL_MOMENTUM", "SCROLL_WITH_ARROW", "SNAPPABLE",
+}
+DEFAULT_SCREEN_FLAGS = {
+    "CLICKABLE", "PRESS_LOCK", "CLICK_FOCUSABLE", "GESTURE_BUBBLE", "SNAPPABLE", "SCROLLABLE",
+    "SCROLL_ELASTIC", "SCROLL_MOMENTUM", "SCROLL_CHAIN_HOR", "SCROLL_CHAIN_VER",
+}
+# Widgets that are not clickable unless clickableFlag is set
+NOT_CLICKABLE_WIDGETS = {"LVGLLabelWidget", "LVGLImageWidget", "LVGLLedWidget", "LVGLSpinnerWidget"}
+
+# Prefix of the LVGL constant for style properties with enum values
+STYLE_ENUM_PREFIXES = {
+    "layout": "LV_LAYOUT_",
+    "flex_flow": "LV_FLEX_FLOW_",
+    "flex_main_place": "LV_FLEX_ALIGN_",
+    "flex_cross_place": "LV_FLEX_ALIGN_",
+    "flex_track_place": "LV_FLEX_ALIGN_",
+    "text_align": "LV_TEXT_ALIGN_",
+    "text_decor": "LV_TEXT_DECOR_",
+    "base_dir": "LV_BASE_DIR_",
+    "border_side": "LV_BORDER_SIDE_",
+    "bg_grad_dir": "LV_GRAD_DIR_",
+    "blend_mode": "LV_BLEND_MODE_",
+    "align": "LV_ALIGN_",
+}
+# Style properties with colour values
+STYLE_COLOR_PROPERTIES = {
+    "bg_color", "bg_grad_color", "bg_img_recolor", "border_color", "outline_color", "shadow_color",
+    "img_recolor", "line_color", "arc_color", "text_color",
+}
+
+PROJECT_INDEX_VERSION = 1
+# Parts of the project the generated files depend on
+PROJECT_INDEX_PARTS = ("screens", "styles", "bitmaps", "fonts", "variables", "enums", "actions")
+
+# LVGL getters of widgets whose value only the UI code sets, so a binding can
+# skip reading the widget while its variable is unchanged
+CACHEABLE_GETTERS = {"lv_bar_get_value"}
+# Object flag that marks a widget whose cached binding value is valid. New
+# widgets (e.g. of a lazy screen that was created again) don't have it.
+BINDING_CACHE_FLAG = "LV_OBJ_FLAG_USER_1"
+
+# Rotations the screens can be generated in. A rotated UI is turned
+# counterclockwise like rotate_copy_pixel() of main/lvgl_port.c turns the
+# frame, so LVGL draws it in the orientation of the panel and the flush
+# doesn't rotate.
+ROTATIONS = (0, 90, 180, 270)
+# Widgets that draw the same when they are rotated. LVGL 8 can't draw rotated
+# text, and bars, sliders, switches and the theme's button shadow depend on
+# the orientation.
+ROTATABLE_WIDGETS = {"LVGLScreenWidget", "LVGLPanelWidget", "LVGLContainerWidget", "LVGLImageWidget"}
+# Style properties that draw the same in every orientation
+ROTATION_INVARIANT_STYLES = {
+    "bg_color", "bg_opa", "bg_img_opa", "bg_img_recolor", "bg_img_recolor_opa", "border_color", "border_opa",
+    "border_width", "border_post", "outline_width", "outline_color", "outline_opa", "outline_pad", "shadow_color",
+    "shadow_opa", "img_opa", "img_recolor", "img_recolor_opa", "radius", "clip_corner", "opa", "blend_mode",
+    "text_color", "text_opa", "text_font", "anim_time",
+}
+# Style properties that only draw the same turned by 180 degrees. LVGL blurs
+# the corners of a shadow horizontally first, so a shadow turned by 90 degrees
+# differs in a few pixels.
+HALF_TURN_STYLES = {"shadow_width", "shadow_spread"}
+# Style property of the upright UI -> (property it becomes in a UI rotated by
+# 90 degrees, sign of its value). Offsets turn like vectors.
+ROTATED_STYLES = {
+    "pad_left": ("pad_bottom", 1), "pad_bottom": ("pad_right", 1), "pad_right": ("pad_top", 1),
+    "pad_top": ("pad_left", 1), "pad_row": ("pad_column", 1), "pad_column": ("pad_row", 1),
+    "width": ("height", 1), "height": ("width", 1), "min_width": ("min_height", 1), "min_height": ("min_width", 1),
+    "max_width": ("max_height", 1), "max_height": ("max_width", 1),
+    "transform_width": ("transform_height", 1), "transform_height": ("transform_width", 1),
+    "shadow_ofs_x": ("shadow_ofs_y", -1), "shadow_ofs_y": ("shadow_ofs_x", 1),
+    "translate_x": ("translate_y", -1), "translate_y": ("translate_x", 1),
+}
+# Border side of the upright UI -> side it becomes in a UI rotated by 90 degrees
+ROTATED_BORDER_SIDES = {"LEFT": "BOTTOM", "BOTTOM": "RIGHT", "RIGHT": "TOP", "TOP": "LEFT"}
+# Alignment of a rotated widget in the content area of its parent, and the
+# (sign, coordinate of the upright widget) of its x and y offsets
+ROTATED_ALIGNS = {
+    90: ("BOTTOM_LEFT", (1, "top"), (-1, "left")),
+    180: ("BOTTOM_RIGHT", (-1, "left"), (-1, "top")),
+    270: ("TOP_RIGHT", (-1, "top"), (1, "left")),
+}
+
+# C types of the EEZ variable types
+VARIABLE_TYPES = {
+    "integer": "int32_t",
+    "float": "float",
+    "double": "double",
+    "boolean": "bool",
+    "string": "const char *",
+}
+
+
+def c_name(name):
+    """
+    Converts an EEZ-Studio name to the C identifier EEZ-Studio generates for it.
+
+    Example: 'SettingPageTopLabel' -> 'setting_page_top_label'
+
+    Args:
+        name: Name of a page, widget, variable, action, style, bitmap or font.
+
+    Returns:
+        str: The snake_case identifier.
+    """
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name)
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).lower()
+
+
+def c_string(text):
+    """
+    Converts text to a C string literal.
+
+    Args:
+        text: Text to convert.
+
+    Returns:
+        str: The quoted and escaped literal.
+    """
+    escaped = text.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n").replace("\r", "")
+    return f"\"{escaped}\""
+
+
+def load_project(project_file):
+    """
+    Loads an .eez-project file.
+
+    Args:
+        project_file: Path to the .eez-project file.
+
+    Returns:
+        dict: The parsed project.
+    """
+    with open(project_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def object_hash(obj):
+    """
+    Returns a hash of a project object, independent of the JSON formatting.
+
+    Args:
+        obj: The object from the project.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def index_project(project, options=None):
+    """
+    Builds the model of the parts of a project the generated files depend on.
+
+    Objects are indexed by their objID, which EEZ-Studio keeps when an object
+    is renamed, so renames are told apart from removed and added objects.
+
+    Args:
+        project: The parsed project.
+        options: Generator options the files were generated with.
+
+    Returns:
+        dict: 'settings' -> hash, 'options', and part -> objID -> {'name',
+            'hash'} for every part in PROJECT_INDEX_PARTS.
+    """
+    variables = project.get("variables", {})
+    parts = {
+        "screens": screen_pages(project),
+        "styles": project.get("lvglStyles", {}).get("styles", []),
+        "bitmaps": project.get("bitmaps", []),
+        "fonts": project.get("fonts", []),
+        "variables": variables.get("globalVariables", []),
+        "enums": variables.get("enums", []),
+        "actions": project.get("actions", []),
+    }
+    model = {"settings": object_hash(project.get("settings", {})), "options": {key: value for key, value in (options or {}).items() if value}}
+    for part, objects in parts.items():
+        model[part] = {obj.get("objID") or obj.get("name"): {"name": obj.get("name"), "hash": object_hash(obj)}
+                       for obj in objects}
+    return model
+
+
+def load_project_index(output_dir):
+    """
+    Loads the model of the project the output directory was last generated from.
+
+    Args:
+        output_dir: The output directory.
+
+    Returns:
+        dict: The model, or None if there is no (valid) index.
+    """
+    try:
+        with open(os.path.join(output_dir, PROJECT_INDEX_FILE), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != PROJECT_INDEX_VERSION:
+        return None
+    return index.get("model")
+
+
+def save_project_index(output_dir, model):
+    """
+    Saves the model of the project the output directory was generated from.
+
+    Args:
+        output_dir: The output directory.
+        model: The model from index_project().
+    """
+    content = json.dumps({"version": PROJECT_INDEX_VERSION, "model": model}, indent=1, sort_keys=True)
+    write_if_changed(os.path.join(output_dir, PROJECT_INDEX_FILE), content)
+
+
+def diff_models(old_model, new_model):
+    """
+    Compares two project models.
+
+    Args:
+        old_model: Model of the older revision, or None if unknown.
+        new_model: Model of the newer revision.
+
+    Returns:
+        dict: 'settings' -> True if the settings, the generator options (or
+            the whole old model) changed, and part -> {'added', 'removed', 'renamed', 'changed'}
+            name lists for every part in PROJECT_INDEX_PARTS.
+    """
+    changes = {"settings": old_model is None or old_model.get("settings") != new_model["settings"]
+               or old_model.get("options", {}) != new_model.get("options", {})}
+    for part in PROJECT_INDEX_PARTS:
+        old_objects = (old_model or {}).get(part, {})
+        new_objects = new_model[part]
+        changes[part] = {
+            "added": [new_objects[key]["name"] for key in new_objects if key not in old_objects],
+            "removed": [old_objects[key]["name"] for key in old_objects if key not in new_objects],
+            "renamed": [f"{old_objects[key]['name']} -> {new_objects[key]['name']}" for key in new_objects
+                        if key in old_objects and old_objects[key]["name"] != new_objects[key]["name"]],
+            "changed": [new_objects[key]["name"] for key in new_objects
+                        if key in old_objects and old_objects[key]["name"] == new_objects[key]["name"]
+                        and old_objects[key]["hash"] != new_objects[key]["hash"]],
+        }
+    return changes
+
+
+def screen_units(content):
+    """
+    Splits the code of screens.c into the code of each screen and the code the
+    screens share.
+
+    Args:
+        content: Content of screens.c.
+
+    Returns:
+        tuple: (dict of screen name -> its create_screen_<name>() and
+            tick_screen_<name>() functions, the remaining code)
+    """
+    units = {}
+    for match in SCREEN_FUNCTION_RE.finditer(content):
+        units[match.group(2)] = units.get(match.group(2), "") + match.group(0)
+    return units, SCREEN_FUNCTION_RE.sub("", content)
+
+
+def affected_outputs(old_files, new_files):
+    """
+    Compares generated files with the files of an earlier generation.
+
+    screens.c is compared per screen, so a screen whose code changed is
+    reported on its own. split_screens() of import_eez_ui.py keeps each screen
+    in its own screen_<name>.c, so only those files are recompiled.
+
+    Args:
+        old_files: Dict of file name -> content of the earlier generation.
+            Files it doesn't contain count as new.
+        new_files: Dict of file name -> generated content.
+
+    Returns:
+        tuple: (sorted names of the changed files, where screens.c is only
+            listed if the code the screens share changed, sorted names of the
+            added, removed or changed screens)
+    """
+    files = [name for name, content in new_files.items() if name != "screens.c" and old_files.get(name) != content]
+    screens = []
+    if "screens.c" in new_files and old_files.get("screens.c") != new_files["screens.c"]:
+        old_units, old_shared = screen_units(old_files.get("screens.c", ""))
+        new_units, new_shared = screen_units(new_files["screens.c"])
+        screens = [name for name in old_units.keys() | new_units.keys() if old_units.get(name) != new_units.get(name)]
+        if old_shared != new_shared:
+            files.append("screens.c")
+    return sorted(files), sorted(screens)
+
+
+def describe_affected(files, screens):
+    """
+    Describes the output of affected_outputs().
+
+    Args:
+        files: Names of the changed files.
+        screens: Names of the changed screens.
+
+    Returns:
+        list: The lines.
+    """
+    lines = [f"Affected files: {', '.join(files) or 'none'}"]
+    if screens:
+        lines.append(f"Affected screens: {', '.join(screens)} (create_screen_<name>() and tick_screen_<name>(), "
+                     f"screen_<name>.c with --split-screens)")
+    return lines
+
+
+def read_generated_files(output_dir, file_names):
+    """
+    Reads the files of the last generation from the output directory.
+
+    Args:
+        output_dir: The output directory.
+        file_names: Names of the files to read.
+
+    Returns:
+        dict: File name -> content, for the files that exist.
+    """
+    files = {}
+    for file_name in file_names:
+        try:
+            with open(os.path.join(output_dir, file_name), "r", encoding="utf-8", newline="") as f:
+                files[file_name] = f.read()
+        except (OSError, UnicodeDecodeError):
+            pass
+    return files
+
+
+def describe_changes(changes):
+    """
+    Describes the changes of a project, one line per changed part.
+
+    Args:
+        changes: Result of diff_models().
+
+    Returns:
+        list: The lines. Empty if nothing changed.
+    """
+    lines = []
+    if changes["settings"]:
+        lines.append("settings: templates, settings or generator options changed (or no earlier revision)")
+    for part in PROJECT_INDEX_PARTS:
+        kinds = [f"{kind} {', '.join(names)}" for kind, names in changes[part].items() if names]
+        if kinds:
+            lines.append(f"{part}: {'; '.join(kinds)}")
+    return lines
+
+
+def plan_generation(project, output_dir, files, options=None):
+    """
+    Compares a project and its generated files with the revision the output
+    directory was generated from and prints which parts, files and screens
+    changed.
+
+    Args:
+        project: The parsed project.
+        output_dir: The output directory.
+        files: Dict of file name -> content from generate_ui().
+        options: Generator options passed to generate_ui().
+
+    Returns:
+        dict: Model of the project, to save with save_project_index() once the
+            files are written.
+    """
+    model = index_project(project, options)
+    lines = describe_changes(diff_models(load_project_index(output_dir), model))
+    for line in lines:
+        print(f"Changed {line}")
+    if not lines:
+        print("No screens or assets changed since the last generation.")
+    for line in describe_affected(*affected_outputs(read_generated_files(output_dir, files), files)):
+        print(line)
+    return model
+
+
+def coordinate(value, unit):
+    """
+    Converts an EEZ position or size to its LVGL expression.
+
+    Args:
+        value: The number from the project.
+        unit: The unit from the project ('px', '%' or 'content').
+
+    Returns:
+        str: The C expression.
+    """
+    if unit == "%":
+        return f"LV_PCT({value})"
+    if unit == "content":
+        return "LV_SIZE_CONTENT"
+    return str(value)
+
+
+def rotate_style(definition, rotation, owner):
+    """
+    Rotates a style definition for screens generated in a rotation.
+
+    Args:
+        definition: Mapping of part -> state -> property -> value.
+        rotation: Rotation of the screens in degrees (see ROTATIONS).
+        owner: Description of the widget or style, for the error message.
+
+    Returns:
+        dict: The rotated definition.
+
+    Raises:
+        ValueError: If a property draws differently in another orientation.
+    """
+    rotated = {}
+    for part, states in definition.items():
+        rotated[part] = {}
+        for state, props in states.items():
+            for _ in range(rotation // 90):
+                turned = {}
+                for prop, value in props.items():
+                    if prop in ROTATED_STYLES and (ROTATED_STYLES[prop][1] > 0 or isinstance(value, (int, float))):
+                        target, sign = ROTATED_STYLES[prop]
+                        turned[target] = value if sign > 0 else -value
+                    elif prop == "border_side":
+                        turned[prop] = "|".join(ROTATED_BORDER_SIDES.get(side, side) for side in value.split("|"))
+                    elif prop in ROTATION_INVARIANT_STYLES or (prop == "bg_grad_dir" and value == "NONE") or \
+                            (prop in HALF_TURN_STYLES and rotation == 180):
+                        turned[prop] = value
+                    else:
+                        raise ValueError(f"{owner} can't be rotated: its style property '{prop}' "
+                                         f"({part} {state}) depends on the orientation")
+                props = turned
+            rotated[part][state] = props
+    return rotated
+
+
+def rotate_widget(widget, rotation, is_screen=False):
+    """
+    Rotates the geometry and the local styles of a widget and its children in
+    place (see rotate_project()).
+
+    A rotated widget is aligned to the corner of its parent the upright
+    top-left corner turns into, e.g. the bottom-left for 90 degrees, so its
+    position doesn't depend on the size of the parent's content area.
+
+    Args:
+        widget: The widget from the project.
+        rotation: Rotation of the screens in degrees (see ROTATIONS).
+        is_screen: True for the LVGLScreenWidget of a page.
+
+    Raises:
+        ValueError: If the widget draws differently in another orientation.
+    """
+    owner = f"Widget '{widget.get('identifier') or widget['type']}'"
+    if widget["type"] not in ROTATABLE_WIDGETS:
+        raise ValueError(f"{owner} can't be rotated: only {', '.join(sorted(ROTATABLE_WIDGETS))} "
+                         "draw the same in every orientation")
+    if widget["type"] == "LVGLImageWidget" and (widget.get("pivotX") or widget.get("pivotY") or widget.get("angle")
+                                                or widget.get("zoom", 256) != 256):
+        raise ValueError(f"{owner} can't be rotated: its pivot, zoom and angle depend on the orientation")
+    if widget.get("leftUnit", "px") != "px" or widget.get("topUnit", "px") != "px":
+        raise ValueError(f"{owner} can't be rotated: only positions in px can be rotated")
+    if not is_screen:
+        align, (x_sign, x_source), (y_sign, y_source) = ROTATED_ALIGNS[rotation]
+        left, top = x_sign * widget.get(x_source, 0), y_sign * widget.get(y_source, 0)
+        widget.update(align=align, left=left, top=top)
+    if rotation != 180:
+        widget["width"], widget["height"] = widget.get("height", 0), widget.get("width", 0)
+        widget["widthUnit"], widget["heightUnit"] = widget.get("heightUnit", "px"), widget.get("widthUnit", "px")
+    local_styles = widget.get("localStyles", {})
+    if local_styles.get("definition"):
+        local_styles["definition"] = rotate_style(local_styles["definition"], rotation, owner)
+    for child in widget.get("children", []):
+        rotate_widget(child, rotation)
+
+
+def rotate_project(project, rotation):
+    """
+    Returns a copy of a project with its screens rotated counterclockwise, the
+    way rotate_copy_pixel() of main/lvgl_port.c rotates the frame. LVGL then
+    draws the screens in the orientation of the panel, the rotation can be
+    set to 0 in menuconfig and the flush copies the frame without rotating it.
+
+    Only screens made of the ROTATABLE_WIDGETS with the style properties of
+    ROTATION_INVARIANT_STYLES and ROTATED_STYLES (and HALF_TURN_STYLES for
+    180 degrees) can be rotated. The bitmaps
+    are rotated by convert_ui_images.py.
+
+    Args:
+        project: The parsed project.
+        rotation: Rotation in degrees (see ROTATIONS).
+
+    Returns:
+        dict: The rotated project.
+
+    Raises:
+        ValueError: If a screen or style draws differently in another orientation.
+    """
+    if rotation not in ROTATIONS:
+        raise ValueError(f"Unsupported rotation {rotation}, use one of {', '.join(map(str, ROTATIONS))}.")
+    project = copy.deepcopy(project)
+    if rotation == 0:
+        return project
+    general = project["settings"]["general"]
+    for page in screen_pages(project):
+        if rotation != 180:
+            page["width"], page["height"] = page.get("height"), page.get("width")
+        for widget in page.get("components", []):
+            if widget["type"] == "LVGLScreenWidget":
+                rotate_widget(widget, rotation, is_screen=True)
+    for style in project.get("lvglStyles", {}).get("styles", []):
+        style["definition"] = rotate_style(style.get("definition", {}), rotation, f"Style '{style['name']}'")
+    if rotation != 180:
+        general["displayWidth"], general["displayHeight"] = general.get("displayHeight"), general.get("displayWidth")
+    return project
+
+
+def style_value(prop, value, project, color_order="RGB"):
+    """
+    Converts the value of a style property to its C expression.
+
+    Args:
+        prop: Name of the style property, e.g. 'bg_color'.
+        value: Value from the project.
+        project: The parsed project, used to resolve fonts.
+        color_order: Channel order of the panel. With 'BGR' red and blue of
+            the colors are swapped, like the images of convert_ui_images.
+
+    Returns:
+        str: The C expression.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if prop in STYLE_COLOR_PROPERTIES and value.startswith("#"):
+        rgb = value[1:].lower()
+        if color_order == "BGR":
+            rgb = rgb[4:6] + rgb[2:4] + rgb[0:2]
+        return f"lv_color_hex(0xff{rgb})"
+    if prop in STYLE_ENUM_PREFIXES:
+        return STYLE_ENUM_PREFIXES[prop] + value
+    if prop == "text_font":
+        if any(font.get("name") == value for font in project.get("fonts", [])):
+            return f"&ui_font_{c_name(value)}"
+        return f"&lv_font_{value}"
+    return str(value)
+
+
+def style_lines(definition, project, setter, color_order="RGB"):
+    """
+    Generates the style calls of a style definition.
+
+    Args:
+        definition: Mapping of part -> state -> property -> value.
+        project: The parsed project.
+        setter: Function taking (property, C value, selector) and returning a line.
+        color_order: Channel order of the panel (see style_value()).
+
+    Returns:
+        list: The generated lines.
+    """
+    lines = []
+    for part, states in definition.items():
+        for state, props in states.items():
+            selector = f"LV_PART_{part} | LV_STATE_{state}"
+            for prop, value in props.items():
+                lines.append(setter(prop, style_value(prop, value, project, color_order), selector))
+    return lines
+
+
+def widget_object_name(widget, context, needed):
+    """
+    Returns the objects_t member name of a widget, adding it if required.
+
+    Widgets with an identifier are always stored in objects_t. Widgets without
+    one get an 'objN' member when the tick function has to reference them.
+
+    Args:
+        widget: The widget from the project.
+        context: Generation context.
+        needed: True if the tick function references the widget.
+
+    Returns:
+        str: The member name, or None if the widget isn't stored.
+    """
+    if widget.get("identifier"):
+        name = c_name(widget["identifier"])
+    elif needed:
+        name = f"obj{context['auto_objects']}"
+        context["auto_objects"] += 1
+    else:
+        return None
+    context["objects"].append(name)
+    return name
+
+
+def variable_getter(expression, context):
+    """
+    Returns the native getter of a variable used as widget expression.
+
+    Only plain variable names are supported, as only native (non flow)
+    projects can be generated.
+
+    Args:
+        expression: The expression from the project.
+        context: Generation context.
+
+    Returns:
+        tuple: (C getter call, C type), or None if unsupported.
+    """
+    name = expression.strip().strip("{}").strip()
+    for variable in context["project"]["variables"].get("globalVariables", []):
+        if variable["name"] == name:
+            return f"get_var_{c_name(name)}()", VARIABLE_TYPES.get(variable["type"], "int32_t")
+    context["warnings"].append(f"Unsupported expression '{expression}', only global variable names can be bound")
+    return None
+
+
+def widget_property_lines(widget, context):
+    """
+    Generates the type specific properties of a widget and its tick bindings.
+
+    Args:
+        widget: The widget from the project.
+        context: Generation context.
+
+    Returns:
+        tuple: (lines for the create function, bindings for the tick function).
+            Every binding is (getter, C type, getter function, setter template).
+    """
+    widget_type = widget["type"]
+    lines = []
+    bindings = []
+
+    if widget_type in ("LVGLLabelWidget", "LVGLCheckboxWidget"):
+        setter = "lv_label_set_text" if widget_type == "LVGLLabelWidget" else "lv_checkbox_set_text"
+        getter = "lv_label_get_text" if widget_type == "LVGLLabelWidget" else "lv_checkbox_get_text"
+        long_mode = widget.get("longMode", "WRAP")
+        if widget_type == "LVGLLabelWidget" and long_mode != "WRAP":
+            lines.append(f"lv_label_set_long_mode(obj, LV_LABEL_LONG_{long_mode});")
+        if widget.get("recolor"):
+            lines.append("lv_label_set_recolor(obj, true);")
+        if widget.get("textType", "literal") == "literal":
+            lines.append(f"{setter}(obj, {c_string(widget.get('text', ''))});")
+        else:
+            lines.append(f"{setter}(obj, \"\");")
+            bindings.append((widget.get("text", ""), getter, f"{setter}({{obj}}, new_val);"))
+
+    elif widget_type in ("LVGLBarWidget", "LVGLSliderWidget", "LVGLArcWidget"):
+        prefix = {"LVGLBarWidget": "lv_bar", "LVGLSliderWidget": "lv_slider", "LVGLArcWidget": "lv_arc"}[widget_type]
+        animated = "" if widget_type == "LVGLArcWidget" else ", LV_ANIM_OFF"
+        minimum = widget.get("rangeMin", widget.get("min", 0))
+        maximum = widget.get("rangeMax", widget.get("max", 100))
+        if (minimum, maximum) != (0, 100):
+            lines.append(f"{prefix}_set_range(obj, {minimum}, {maximum});")
+        if widget_type == "LVGLArcWidget":
+            if "bgStartAngle" in widget and "bgEndAngle" in widget:
+                lines.append(f"lv_arc_set_bg_angles(obj, {widget['bgStartAngle']}, {widget['bgEndAngle']});")
+            if widget.get("rotation"):
+                lines.append(f"lv_arc_set_rotation(obj, {widget['rotation']});")
+        value_type = widget.get("valueType", "literal")
+        if value_type == "literal":
+            if widget.get("value"):
+                lines.append(f"{prefix}_set_value(obj, {widget['value']}{animated});")
+        else:
+            bindings.append((str(widget.get("value", "")), f"{prefix}_get_value",
+                             f"{prefix}_set_value({{obj}}, new_val{animated});"))
+
+    elif widget_type == "LVGLImageWidget":
+        if widget.get("image"):
+            lines.append(f"lv_img_set_src(obj, &img_{c_name(widget['image'])});")
+        if widget.get("pivotX") or widget.get("pivotY"):
+            lines.append(f"lv_img_set_pivot(obj, {widget.get('pivotX', 0)}, {widget.get('pivotY', 0)});")
+        if widget.get("zoom", 256) != 256:
+            lines.append(f"lv_img_set_zoom(obj, {widget['zoom']});")
+        if widget.get("angle"):
+            lines.append(f"lv_img_set_angle(obj, {widget['angle']});")
+
+    elif widget_type == "LVGLTextareaWidget":
+        if widget.get("placeholder"):
+            lines.append(f"lv_textarea_set_placeholder_text(obj, {c_string(widget['placeholder'])});")
+        if widget.get("oneLineMode"):
+            lines.append("lv_textarea_set_one_line(obj, true);")
+        if widget.get("passwordMode"):
+            lines.append("lv_textarea_set_password_mode(obj, true);")
+        if widget.get("textType", "literal") == "literal" and widget.get("text"):
+            lines.append(f"lv_textarea_set_text(obj, {c_string(widget['text'])});")
+
+    elif widget_type in ("LVGLDropdownWidget", "LVGLRollerWidget"):
+        options = widget.get("options", "")
+        if widget_type == "LVGLDropdownWidget":
+            lines.append(f"lv_dropdown_set_options(obj, {c_string(options)});")
+        else:
+            mode = widget.get("mode", "NORMAL")
+            lines.append(f"lv_roller_set_options(obj, {c_string(options)}, LV_ROLLER_MODE_{mode});")
+
+    return lines, bindings
+
+
+def generate_widget(widget, context, depth, is_screen=False):
+    """
+    Generates the code that creates a widget and its children.
+
+    Args:
+        widget: The widget from the project.
+        context: Generation context.
+        depth: Nesting depth, used for indentation.
+        is_screen: True for the LVGLScreenWidget of a page.
+
+    Returns:
+        list: The generated lines, indented.
+    """
+    indent = "    " * depth
+    widget_type = widget["type"]
+    lines = []
+    prop_lines, bindings = ([], []) if is_screen else widget_property_lines(widget, context)
+
+    # Creation
+    if is_screen:
+        lines.append("lv_obj_t *obj = lv_obj_create(0);")
+        lines.append(f"objects.{context['screen']} = obj;")
+        name = context["screen"]
+    else:
+        if widget.get("identifier"):
+            lines.append(f"// {widget['identifier']}")
+        if widget_type == "LVGLTabviewWidget":
+            position = widget.get("tabviewPosition", "TOP")
+            lines.append(f"lv_obj_t *obj = lv_tabview_create(parent_obj, LV_DIR_{position}, {widget.get('tabviewSize', 32)});")
+        elif widget_type == "LVGLTabWidget":
+            lines.append(f"lv_obj_t *obj = lv_tabview_add_tab(parent_obj, {c_string(widget.get('tabName', ''))});")
+        elif widget_type == "LVGLSpinnerWidget":
+            lines.append("lv_obj_t *obj = lv_spinner_create(parent_obj, 1000, 60);")
+        elif widget_type in WIDGET_CREATE_FUNCTIONS:
+            lines.append(f"lv_obj_t *obj = {WIDGET_CREATE_FUNCTIONS[widget_type]}(parent_obj);")
+        else:
+            context["warnings"].append(f"Unsupported widget type '{widget_type}', generated as a plain lv_obj")
+            lines.append("lv_obj_t *obj = lv_obj_create(parent_obj);")
+        name = widget_object_name(widget, context, bool(bindings))
+        if name is not None:
+            lines.append(f"objects.{name} = obj;")
+
+    # Position and size (tabs are laid out by their tabview)
+    if widget_type != "LVGLTabWidget":
+        left = coordinate(widget.get("left", 0), widget.get("leftUnit", "px"))
+        top = coordinate(widget.get("top", 0), widget.get("topUnit", "px"))
+        width = coordinate(widget.get("width", 0), widget.get("widthUnit", "px"))
+        height = coordinate(widget.get("height", 0), widget.get("heightUnit", "px"))
+        if widget.get("align"):
+            # Set by rotate_widget(): the position is relative to a corner of the parent
+            lines.append(f"lv_obj_align(obj, LV_ALIGN_{widget['align']}, {left}, {top});")
+        else:
+            lines.append(f"lv_obj_set_pos(obj, {left}, {top});")
+        lines.append(f"lv_obj_set_size(obj, {width}, {height});")
+
+    # Event handlers calling native actions
+    for handler in widget.get("eventHandlers", []):
+        if handler.get("handlerType", "action") == "action" and handler.get("action"):
+            lines.append(f"lv_obj_add_event_cb(obj, action_{c_name(handler['action'])}, "
+                         f"LV_EVENT_{handler.get('eventName', 'CLICKED')}, (void *)0);")
+        else:
+            context["warnings"].append(f"Event handler {handler} needs EEZ-Flow and is skipped")
+
+    lines += prop_lines
+
+    # Flags that differ from the EEZ-Studio defaults
+    if widget.get("widgetFlags") is not None:
+        flags = set(filter(None, widget["widgetFlags"].split("|")))
+        defaults = DEFAULT_SCREEN_FLAGS if is_screen else DEFAULT_WIDGET_FLAGS
+        flags.discard("CLICKABLE")
+        defaults = defaults - {"CLICKABLE"}
+        added = sorted(flags - defaults)
+        cleared = sorted(defaults - flags)
+        if added:
+            lines.append(f"lv_obj_add_flag(obj, {'|'.join('LV_OBJ_FLAG_' + f for f in added)});")
+        if cleared:
+            lines.append(f"lv_obj_clear_flag(obj, {'|'.join('LV_OBJ_FLAG_' + f for f in cleared)});")
+    clickable_default = widget_type not in NOT_CLICKABLE_WIDGETS
+    if "clickableFlag" in widget and widget["clickableFlag"] != clickable_default and not is_screen:
+        action = "add" if widget["clickableFlag"] else "clear"
+        lines.append(f"lv_obj_{action}_flag(obj, LV_OBJ_FLAG_CLICKABLE);")
+    if widget.get("hiddenFlag"):
+        lines.append("lv_obj_add_flag(obj, LV_OBJ_FLAG_HIDDEN);")
+    for state in filter(None, widget.get("states", "").split("|")):
+        lines.append(f"lv_obj_add_state(obj, LV_STATE_{state});")
+
+    # Named style, then local styles
+    use_style = widget.get("style", {}).get("useStyle", "default")
+    if use_style and use_style != "default":
+        lines.append(f"add_style_{c_name(use_style)}(obj);")
+    definition = widget.get("localStyles", {}).get("definition", {})
+    lines += style_lines(definition, context["project"],
+                         lambda prop, value, selector: f"lv_obj_set_style_{prop}(obj, {value}, {selector});",
+                         context["color_order"])
+
+    # Children
+    children = widget.get("children", [])
+    if children:
+        lines.append("{")
+        lines.append("    lv_obj_t *parent_obj = obj;")
+        for child in children:
+            lines += ["    {"] + generate_widget(child, context, 2) + ["    }"]
+        lines.append("}")
+
+    # Tick bindings reference the widget through objects_t
+    for expression, getter, setter in bindings:
+        variable = variable_getter(expression, context)
+        if variable is not None:
+            context["ticks"].append((name, variable, getter, setter))
+
+    return [indent + line if line else line for line in lines]
+
+
+def generate_tick_binding(name, variable, getter, setter, cached=False):
+    """
+    Generates the code of one variable binding in a tick_screen_* function.
+
+    The widget is only updated when the variable value differs from its
+    current value, like the EEZ-Studio output.
+
+    Args:
+        name: objects_t member of the widget.
+        variable: (C getter call, C type) of the bound variable.
+        getter: LVGL function returning the current widget value.
+        setter: LVGL call setting the value, with '{obj}' as widget placeholder.
+        cached: Compare with the value of the last tick first and only read the
+            widget when the variable changed. Only for CACHEABLE_GETTERS.
+
+    Returns:
+        list: The generated lines.
+    """
+    call, c_type = variable
+    is_string = c_type == "const char *"
+    separator = "" if is_string else " "
+    changed = "strcmp(new_val, cur_val) != 0" if is_string else "new_val != cur_val"
+    update = [
+        f"{c_type}{separator}cur_val = {getter}(objects.{name});",
+        f"if ({changed}) {{",
+        f"    tick_value_change_obj = objects.{name};",
+        f"    {setter.format(obj='objects.' + name)}",
+        "    tick_value_change_obj = NULL;",
+        "}",
+    ]
+    if not cached:
+        return ["    {", f"        {c_type}{separator}new_val = {call};"] + ["        " + line for line in update] + ["    }"]
+    return [
+        "    {",
+        f"        static {c_type}{separator}last_val;",
+        f"        {c_type}{separator}new_val = {call};",
+        f"        if (new_val != last_val || !lv_obj_has_flag(objects.{name}, {BINDING_CACHE_FLAG})) {{",
+        "            last_val = new_val;",
+        f"            lv_obj_add_flag(objects.{name}, {BINDING_CACHE_FLAG});",
+    ] + ["            " + line for line in update] + [
+        "        }",
+        "    }",
+    ]
+
+
+def generate_tick_function(screen, bindings, cache_bindings=False):
+    """
+    Generates the tick_screen_* function of a screen.
+
+    Args:
+        screen: C name of the screen.
+        bindings: (objects_t member, variable, getter, setter) of every binding.
+        cache_bindings: Read every variable once per tick, and skip reading
+            widgets whose value only the UI code sets while their variable is
+            unchanged.
+
+    Returns:
+        str: The function.
+    """
+    lines = []
+    if cache_bindings:
+        # One local per variable, however many widgets show it
+        reads = {}
+        for _, (call, c_type), _, _ in bindings:
+            if call not in reads:
+                local = "var_" + call[len("get_var_"):-len("()")]
+                reads[call] = local
+                lines.append(f"    {c_type}{'' if c_type.endswith('*') else ' '}{local} = {call};")
+        for name, (call, c_type), getter, setter in bindings:
+            lines += generate_tick_binding(name, (reads[call], c_type), getter, setter,
+                                           cached=getter in CACHEABLE_GETTERS)
+    else:
+        for binding in bindings:
+            lines += generate_tick_binding(*binding)
+    return f"void tick_screen_{screen}() {{\n" + "".join(line + "\n" for line in lines) + "}\n"
+
+
+def screen_pages(project):
+    """
+    Returns the pages of the project that are screens (not user widgets).
+
+    Args:
+        project: The parsed project.
+
+    Returns:
+        list: The pages.
+    """
+    return [page for page in project.get("userPages", []) if not page.get("isUsedAsUserWidget")]
+
+
+def generate_screens(project, context):
+    """
+    Generates the LVGL_SCREENS_* placeholders.
+
+    Args:
+        project: The parsed project.
+        context: Generation context.
+
+    Returns:
+        dict: Placeholder name -> generated code.
+    """
+    pages = screen_pages(project)
+    screens = [c_name(page["name"]) for page in pages]
+    context["objects"] = list(screens)
+
+    screen_functions = []
+    for page, screen in zip(pages, screens):
+        context["screen"] = screen
+        context["ticks"] = []
+        body = []
+        for widget in page.get("components", []):
+            if widget["type"] == "LVGLScreenWidget":
+                body += generate_widget(widget, context, 1, is_screen=True)
+        screen_functions.append(
+            f"void create_screen_{screen}() {{\n" + "\n".join(body) + "\n}\n\n"
+            + generate_tick_function(screen, context["ticks"], context["cache_bindings"])
+        )
+
+    dark = "true" if project["settings"]["general"].get("darkTheme", True) else "false"
+    rotation = context["rotation"]
+    theme_init = (
+        "    lv_theme_t *theme = lv_theme_default_init(dispp, lv_palette_main(LV_PALETTE_BLUE), "
+        f"lv_palette_main(LV_PALETTE_RED), {dark}, LV_FONT_DEFAULT);\n"
+    )
+    rotation_check = ""
+    if rotation:
+        rotation_check = (
+            "#if defined(CONFIG_EXAMPLE_LVGL_PORT_ROTATION_DEGREE) && CONFIG_EXAMPLE_LVGL_PORT_ROTATION_DEGREE != 0\n"
+            f"#error \"The screens are generated rotated by {rotation} degrees for the panel. "
+            "Select 'Rotation 0' in menuconfig so the flush doesn't rotate them again.\"\n"
+            "#endif\n\n"
+        )
+    if rotation in (90, 270):
+        # The theme sizes its paddings and radii by the horizontal resolution,
+        # so it is made for the upright display the screens were designed on
+        theme_init = (
+            "    lv_coord_t hor_res = dispp->driver->hor_res;\n"
+            "    dispp->driver->hor_res = dispp->driver->ver_res;\n"
+            + theme_init
+            + "    dispp->driver->hor_res = hor_res;\n"
+        )
+    screens_def = (
+        "#include <string.h>\n\n"
+        + rotation_check +
+        "objects_t objects;\n"
+        "lv_obj_t *tick_value_change_obj;\n\n"
+        + "\n".join(screen_functions)
+    )
+    screens_def_ext = (
+        "\nvoid create_screens() {\n"
+        "    lv_disp_t *dispp = lv_disp_get_default();\n"
+        + theme_init +
+        "    lv_disp_set_theme(dispp, theme);\n"
+        "    \n"
+        + "".join(f"    create_screen_{screen}();\n" for screen in screens)
+        + "}\n\n"
+        "typedef void (*tick_screen_func_t)();\n\n"
+        "tick_screen_func_t tick_screen_funcs[] = {\n"
+        + "".join(f"    tick_screen_{screen},\n" for screen in screens)
+        + "};\n\n"
+        "void tick_screen(int screen_index) {\n"
+        "    tick_screen_funcs[screen_index]();\n"
+        "}\n"
+    )
+    screens_decl = (
+        "typedef struct _objects_t {\n"
+        + "".join(f"    lv_obj_t *{name};\n" for name in context["objects"])
+        + "} objects_t;\n\n"
+        "extern objects_t objects;\n\n"
+        "enum ScreensEnum {\n"
+        + "".join(f"    SCREEN_ID_{screen.upper()} = {i},\n" for i, screen in enumerate(screens, 1))
+        + "};\n\n"
+        + "\n".join(f"void create_screen_{screen}();\nvoid tick_screen_{screen}();\n" for screen in screens)
+    )
+    screens_decl_ext = "void create_screens();\nvoid tick_screen(int screen_index);\n"
+    if rotation:
+        screens_decl_ext += ("\n// The screens are rotated for the panel (generate_eez_ui.py --rotation)\n"
+                             f"#define UI_ROTATION_DEGREE {rotation}\n")
+    return {
+        "LVGL_SCREENS_DECL": screens_decl,
+        "LVGL_SCREENS_DECL_EXT": screens_decl_ext,
+        "LVGL_SCREENS_DEF": screens_def,
+        "LVGL_SCREENS_DEF_EXT": screens_def_ext,
+    }
+
+
+def generate_styles(project, color_order="RGB"):
+    """
+    Generates the LVGL_STYLES_* placeholders from the lvglStyles section.
+
+    Every style gets a lazily initialized lv_style_t per part and state, and
+    add_style_<name>()/remove_style_<name>() helpers.
+
+    Args:
+        project: The parsed project.
+        color_order: Channel order of the panel (see style_value()).
+
+    Returns:
+        dict: Placeholder name -> generated code.
+    """
+    decl = []
+    definitions = []
+    for style in project.get("lvglStyles", {}).get("styles", []):
+        name = c_name(style["name"])
+        selectors = []
+        for part, states in style.get("definition", {}).items():
+            for state, props in states.items():
+                selectors.append((part, state, props))
+        decl.append(f"// Style: {style['name']}")
+        decl += [f"lv_style_t *get_style_{name}_{part}_{state}();" for part, state, props in selectors]
+        decl.append(f"void add_style_{name}(lv_obj_t *obj);")
+        decl.append(f"void remove_style_{name}(lv_obj_t *obj);")
+        decl.append("")
+
+        definitions.append(f"//\n// Style: {style['name']}\n//\n")
+        for part, state, props in selectors:
+            setters = style_lines({part: {state: props}}, project,
+                                  lambda prop, value, selector: f"    lv_style_set_{prop}(style, {value});", color_order)
+            definitions.append(
+                f"void init_style_{name}_{part}_{state}(lv_style_t *style) {{\n" + "\n".join(setters) + "\n};\n\n"
+                f"lv_style_t *get_style_{name}_{part}_{state}() {{\n"
+                "    static lv_style_t *style;\n"
+                "    if (!style) {\n"
+                "        style = lv_mem_alloc(sizeof(lv_style_t));\n"
+                "        lv_style_init(style);\n"
+                f"        init_style_{name}_{part}_{state}(style);\n"
+                "    }\n"
+                "    return style;\n"
+                "};\n"
+            )
+        add = "".join(f"    lv_obj_add_style(obj, get_style_{name}_{part}_{state}(), LV_PART_{part} | LV_STATE_{state});\n"
+                      for part, state, props in selectors)
+        remove = "".join(f"    lv_obj_remove_style(obj, get_style_{name}_{part}_{state}(), LV_PART_{part} | LV_STATE_{state});\n"
+                         for part, state, props in selectors)
+        definitions.append(f"void add_style_{name}(lv_obj_t *obj) {{\n{add}}};\n")
+        definitions.append(f"void remove_style_{name}(lv_obj_t *obj) {{\n{remove}}};\n")
+    return {
+        "LVGL_STYLES_DECL": "\n".join(decl),
+        "LVGL_STYLES_DEF": '#include "screens.h"\n\n' + "\n".join(definitions),
+    }
+
+
+def generate_images(project):
+    """
+    Generates the LVGL_IMAGES_* placeholders from the bitmaps section.
+
+    Args:
+        project: The parsed project.
+
+    Returns:
+        dict: Placeholder name -> generated code.
+    """
+    bitmaps = project.get("bitmaps", [])
+    count = max(len(bitmaps), 1)
+    images_decl = (
+        "".join(f"extern const lv_img_dsc_t img_{c_name(bitmap['name'])};\n" for bitmap in bitmaps)
+        + "\n#ifndef EXT_IMG_DESC_T\n"
+        "#define EXT_IMG_DESC_T\n"
+        "typedef struct _ext_img_desc_t {\n"
+        "    const char *name;\n"
+        "    const lv_img_dsc_t *img_dsc;\n"
+        "} ext_img_desc_t;\n"
+        "#endif\n\n"
+        f"extern const ext_img_desc_t images[{count}];\n"
+    )
+    entries = "".join(f"    {{ {c_string(bitmap['name'])}, &img_{c_name(bitmap['name'])} }},\n" for bitmap in bitmaps)
+    images_def = f"const ext_img_desc_t images[{count}] = {{\n" + (entries or "    0\n") + "};\n"
+    return {"LVGL_IMAGES_DECL": images_decl, "LVGL_IMAGES_DEF": images_def}
+
+
+def generate_vars_and_actions(project):
+    """
+    Generates the variable, enum, font and action placeholders.
+
+    Args:
+        project: The parsed project.
+
+    Returns:
+        dict: Placeholder name -> generated code.
+    """
+    variables = project.get("variables", {})
+    enums = []
+    for enum in variables.get("enums", []):
+        members = "".join(f"    {enum['name']}_{member['name']} = {member.get('value', i)},\n"
+                          for i, member in enumerate(enum.get("members", [])))
+        enums.append(f"typedef enum {{\n{members}}} {enum['name']};\n")
+
+    vars_decl = []
+    for variable in variables.get("globalVariables", []):
+        variable_type = variable.get("type", "integer")
+        if variable_type.startswith("enum:"):
+            c_type = variable_type[len("enum:"):]
+        else:
+            c_type = VARIABLE_TYPES.get(variable_type, "int32_t")
+        separator = "" if c_type.endswith("*") else " "
+        name = c_name(variable["name"])
+        vars_decl.append(f"extern {c_type}{separator}get_var_{name}();\nextern void set_var_{name}({c_type}{separator}value);\n")
+
+    actions = "".join(f"extern void action_{c_name(action['name'])}(lv_event_t * e);\n"
+                      for action in project.get("actions", []))
+    fonts = "".join(f"extern const lv_font_t ui_font_{c_name(font['name'])};\n"
+                    for font in project.get("fonts", []))
+    return {
+        "FLOW_ENUMS": "\n".join(enums),
+        "FLOW_GLOBAL_VARIABLES_ENUM": "enum FlowGlobalVariables {\n    FLOW_GLOBAL_VARIABLE_NONE\n};",
+        "LVGL_VARS_DECL": "\n".join(vars_decl),
+        "LVGL_ACTIONS_DECL": actions,
+        "LVGL_FONTS_DECL": fonts,
+    }
+
+
+def generate_ui(project, cache_bindings=False, color_order="RGB", rotation=0):
+    """
+    Generates the UI source files of an EEZ-Studio LVGL project.
+
+    The templates of settings.build.files are filled in the same way as the
+    EEZ-Studio build does. Only native (non flow) projects are supported: flow
+    projects need the compiled flow assets that only EEZ-Studio can build.
+
+    Args:
+        project: The parsed project.
+        cache_bindings: Generate tick_screen_* functions that read every
+            variable once and cache the last value of display-only bindings.
+        color_order: Channel order of the panel, 'RGB' or 'BGR' (see style_value()).
+        rotation: Rotation of the screens in degrees, so LVGL draws them in
+            the orientation of the panel (see rotate_project()).
+
+    Returns:
+        tuple: (dict of file name -> content, list of warnings)
+    """
+    general = project["settings"]["general"]
+    if general.get("flowSupport"):
+        raise ValueError("Projects with flowSupport enabled can only be built by EEZ-Studio.")
+    if general.get("projectType") != "lvgl":
+        raise ValueError(f"Unsupported project type '{general.get('projectType')}', expected 'lvgl'.")
+    if rotation:
+        project = rotate_project(project, rotation)
+
+    context = {"project": project, "objects": [], "auto_objects": 0, "warnings": [], "ticks": [], "screen": None,
+               "cache_bindings": cache_bindings, "color_order": color_order, "rotation": rotation}
+    placeholders = {
+        "LVGL_INCLUDE": f"#include <{project['settings']['build'].get('lvglInclude', 'lvgl/lvgl.h')}>",
+        "EEZ_FOR_LVGL_CHECK": "",
+        "GUI_ASSETS_DECL": "",
+        "GUI_ASSETS_DEF": "",
+        "LVGL_NATIVE_VARS_TABLE_DEF": "",
+        "LVGL_ACTIONS_ARRAY_DEF": "",
+        "FLOW_STRUCTS": "",
+        "FLOW_STRUCT_VALUES": "",
+    }
+    placeholders.update(generate_screens(project, context))
+    placeholders.update(generate_styles(project, color_order))
+    placeholders.update(generate_images(project))
+    placeholders.update(generate_vars_and_actions(project))
+
+    for font in project.get("fonts", []):
+        context["warnings"].append(f"Font '{font['name']}' is declared, its source must be generated by EEZ-Studio or lv_font_conv")
+
+    def replace(match):
+        if match.group(1) not in placeholders:
+            context["warnings"].append(f"Unknown template placeholder '{match.group(1)}' left empty")
+        return placeholders.get(match.group(1), "")
+
+    files = {}
+    for build_file in project["settings"]["build"].get("files", []):
+        files[build_file["fileName"]] = PLACEHOLDER_RE.sub(replace, build_file["template"])
+    return files, context["warnings"]
+
+
+def generated_rotation(output_dir):
+    """
+    Reads the rotation the screens of a directory were generated in.
+
+    Args:
+        output_dir: Directory with screens.h.
+
+    Returns:
+        int: UI_ROTATION_DEGREE of screens.h, 0 if it isn't defined, or None
+            if there is no screens.h.
+    """
+    try:
+        with open(os.path.join(output_dir, "screens.h"), "r", encoding="utf-8") as f:
+            match = re.search(r"^#define UI_ROTATION_DEGREE (\d+)$", f.read(), re.M)
+    except OSError:
+        return None
+    return int(match.group(1)) if match else 0
+
+
+def default_output_dir(project_file, project):
+    """
+    Returns the destination folder configured in the project.
+
+    Args:
+        project_file: Path to the .eez-project file.
+        project: The parsed project.
+
+    Returns:
+        str: The output directory, relative to the project file.
+    """
+    destination = project["settings"]["build"].get("destinationFolder") or "src/ui"
+    return os.path.join(os.path.dirname(project_file), *re.split(r"[\\/]", destination))
+
+
+def generate_project(project_file, output_dir=None, cache_bindings=False, color_order="RGB", rotation=0):
+    """
+    Generates the UI sources of an .eez-project file into a directory.
+
+    Only files whose content changed are written, so the build recompiles
+    only the files affected by the screens and assets that were edited.
+
+    Args:
+        project_file: Path to the .eez-project file.
+        output_dir: Directory to write to. Defaults to the project's destinationFolder.
+        cache_bindings: Passed to generate_ui().
+        color_order: Passed to generate_ui().
+        rotation: Passed to generate_ui().
+
+    Returns:
+        list: Paths of the files that were written, or None if generation failed.
+    """
+    project = load_project(project_file)
+    if output_dir is None:
+        output_dir = default_output_dir(project_file, project)
+    print(f"\nGenerating UI sources from '{project_file}' into '{output_dir}'.")
+    try:
+        files, warnings = generate_ui(project, cache_bindings, color_order, rotation)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return None
+    for warning in warnings:
+        print(f"WARNING: {warning}")
+    model = plan_generation(project, output_dir, files, {"cache_bindings": cache_bindings, "bgr_colors": color_order == "BGR",
+                                                         "rotation": rotation})
+    written_files = []
+    for file_name, content in files.items():
+        file_path = os.path.join(output_dir, file_name)
+        if write_if_changed(file_path, content):
+            print(f"Generated '{file_path}'")
+            written_files.append(file_path)
+    save_project_index(output_dir, model)
+    print(f"Total files generated: {len(files)}, updated: {len(written_files)}")
+    return written_files
+
+
+def main():
+    """
+    Main function to run the generator with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Generate EEZ-Studio LVGL UI sources from an .eez-project file')
+    parser.add_argument('project', help='Path to the .eez-project file')
+    parser.add_argument('-o', '--output', default=None, help='Output directory (default: destinationFolder of the project)')
+    parser.add_argument('--cache-bindings', action='store_true', help='Read every bound variable once per tick and skip reading display-only widgets whose variable is unchanged')
+    parser.add_argument('--color-order', choices=['rgb', 'bgr'], default='rgb', help='Channel order of the panel. bgr swaps red and blue of every color (default: rgb)')
+    parser.add_argument('--rotation', type=int, choices=ROTATIONS, default=0, help='Rotate the screens counterclockwise by this many degrees, so LVGL draws them in the orientation of the panel and the flush doesn\'t rotate. Only panels, containers and images can be rotated (default: 0)')
+    parser.add_argument('--diff', default=None, metavar='OLD_PROJECT', help='Only list the screens and assets that changed since an older revision of the project')
+    args = parser.parse_args()
+
+    if args.diff:
+        old_project = load_project(args.diff)
+        new_project = load_project(args.project)
+        lines = describe_changes(diff_models(index_project(old_project), index_project(new_project)))
+        for line in lines or ["Nothing changed."]:
+            print(line)
+        try:
+            old_files, _ = generate_ui(old_project, args.cache_bindings, args.color_order.upper(), args.rotation)
+            new_files, _ = generate_ui(new_project, args.cache_bindings, args.color_order.upper(), args.rotation)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        for line in describe_affected(*affected_outputs(old_files, new_files)):
+            print(line)
+        sys.exit(0)
+
+    if generate_project(args.project, args.output, args.cache_bindings, args.color_order.upper(), args.rotation) is None:
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,16 @@ import re
 import argparse
 import configparser
 import sys
+import hashlib
+import json
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import concurrent.futures
+import functools
+import threading
 
 # Default source directory
 DEFAULT_SOURCE_DIR = "./example/eez-project/project_name/src/ui"
@@ -11,12 +21,288 @@ DEFAULT_PROJECT_DIR = "./components/ui"
 DEFAULT_BACKUP_DIR = "./backup/ui"
 DEFAULT_USER_SELECTED_MODES = "all"
 
-# CMakeLists.txt file path
-cmake_file = "./components/ui/CMakeLists.txt"
+# Default CMakeLists.txt for the ui component
+CMAKE_TEMPLATE = "./backup/templates/CMakeLists.txt"
+
+# EEZ Flow: the empty eez-flow.h used when the UI doesn't use flow, the flow
+# API the UI code calls when it does, and the CMakeLists.txt lines fix_flow()
+# adds to leave eez-flow.cpp out of the build
+FLOW_HEADER_TEMPLATE = "./backup/templates/eez-flow.h"
+FLOW_API_RE = re.compile(r"\b(?:eez_flow_\w+|getFlowState|flowPropagateValue\w*|eval\w+Property|assign\w+Property|"
+                         r"FlowValue|eez::flow)\b")
+FLOW_CONDITIONAL_RE = re.compile(r"^\s*#\s*(?:if\s+defined\s*\(?\s*EEZ_FOR_LVGL\b|ifdef\s+EEZ_FOR_LVGL\b)")
+NO_FLOW_CONDITIONAL_RE = re.compile(r"^\s*#\s*(?:if\s+!\s*defined\s*\(?\s*EEZ_FOR_LVGL\b|ifndef\s+EEZ_FOR_LVGL\b)")
+FLOW_EXCLUDE_MARKER = "# EEZ Flow is not used. Added by import_eez_ui.py"
+FLOW_EXCLUDE_RE = re.compile(r"^# EEZ Flow is not used\. Added by import_eez_ui\.py\r?\nlist\(FILTER .*\)\r?\n", re.M)
+FLOW_SOURCE_FILES = {"eez-flow.cpp", "eez-flow.h"}
 
 # Configuration file path
 CONFIG_FILE = ".ui_import_config"
 
+# Sync manifest file name, kept inside every directory written by sync_tree()
+MANIFEST_FILE = ".ui_import_manifest.json"
+MANIFEST_VERSION = 1
+# Model of the .eez-project the UI files were last generated from
+PROJECT_INDEX_FILE = ".eez_project_index.json"
+# Bookkeeping files that are never synced
+SYNC_IGNORED_FILES = {MANIFEST_FILE, PROJECT_INDEX_FILE}
+
+# Parallel sync: worker threads, bytes per copy_file_range() call, and
+# progress output for trees with at least PROGRESS_MIN_FILES files
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+PROGRESS_MIN_FILES = 1000
+PROGRESS_STEP = 1000
+
+# Files in the project directory that mirror mode never deletes
+PROTECTED_FILES = {"actions.c", "CMakeLists.txt", "eez-flow.h", "eez-flow.cpp"}
+
+# Split screens: first line of every screen_<name>.c file split_screens() writes,
+# the screen functions it moves out of screens.c, and the other top level
+# functions of screens.c the screen files may need prototypes of
+SPLIT_SCREEN_MARKER = "// Split from screens.c by import_eez_ui.py. Changes are overwritten by the next import."
+SCREEN_FUNCTION_RE = re.compile(r"^void (create|tick)_screen_(\w+)\(\) \{\r?\n.*?^\}\r?\n(?:\r?\n)?", re.M | re.S)
+SHARED_FUNCTION_RE = re.compile(r"^([A-Za-z_][\w \*]*?\b(\w+)\([^;{}()]*\))\s*\{\r?$", re.M)
+
+# Lazy screens: default number of screens kept in LVGL's heap, and the code
+# added to screens.c by lazy_screens()
+DEFAULT_RESIDENT_SCREENS = 2
+LAZY_SCREENS_MARKER = "// Lazy screens, added by import_eez_ui.py"
+LAZY_SCREENS_CODE = """
+{marker}
+
+typedef void (*create_screen_func_t)();
+
+create_screen_func_t create_screen_funcs[] = {{
+{create_funcs}}};
+
+{clear_funcs}typedef void (*clear_screen_objects_func_t)();
+
+clear_screen_objects_func_t clear_screen_objects_funcs[] = {{
+{clear_table}}};
+
+#define UI_SCREEN_COUNT ((int)(sizeof(create_screen_funcs) / sizeof(create_screen_funcs[0])))
+
+uint32_t screen_last_used[UI_SCREEN_COUNT];
+uint32_t screen_use_counter;
+
+void screen_deleted_cb(lv_event_t *e) {{
+    int screen_index = (int)(intptr_t)lv_event_get_user_data(e);
+    clear_screen_objects_funcs[screen_index]();
+}}
+
+lv_obj_t *get_screen(int screen_index) {{
+    lv_obj_t *screen = ((lv_obj_t **)&objects)[screen_index];
+    if (!screen) {{
+        create_screen_funcs[screen_index]();
+        screen = ((lv_obj_t **)&objects)[screen_index];
+        lv_obj_add_event_cb(screen, screen_deleted_cb, LV_EVENT_DELETE, (void *)(intptr_t)screen_index);
+    }}
+    screen_last_used[screen_index] = ++screen_use_counter;
+    return screen;
+}}
+
+void evict_screens(int current_screen_index) {{
+    lv_disp_t *disp = lv_disp_get_default();
+    for (;;) {{
+        int resident = 0;
+        int lru_index = -1;
+        for (int i = 0; i < UI_SCREEN_COUNT; i++) {{
+            lv_obj_t *screen = ((lv_obj_t **)&objects)[i];
+            if (!screen) {{
+                continue;
+            }}
+            resident++;
+            // Never delete the shown screen or the one a screen animation still draws
+            if (i == current_screen_index || screen == lv_disp_get_scr_act(disp) || screen == lv_disp_get_scr_prev(disp)) {{
+                continue;
+            }}
+            if (lru_index == -1 || screen_last_used[i] < screen_last_used[lru_index]) {{
+                lru_index = i;
+            }}
+        }}
+        if (resident <= UI_RESIDENT_SCREENS || lru_index == -1) {{
+            return;
+        }}
+        lv_obj_del(((lv_obj_t **)&objects)[lru_index]);
+    }}
+}}
+"""
+
+# Style hoisting: identical groups of local style calls used by at least
+# HOIST_MIN_USES objects become one shared style in styles.c
+HOIST_MIN_USES = 2
+HOISTED_STYLES_MARKER = "// Hoisted local styles, added by import_eez_ui.py"
+LOCAL_STYLE_RE = re.compile(r"^([ \t]*)lv_obj_set_style_(\w+)\(obj, (.+), (LV_PART_\w+ \| LV_STATE_\w+)\);\r?$")
+# Style properties that are set through several LVGL properties and have no
+# LV_STYLE_CONST_* initializer, and value prefixes that are only known at run
+# time (the flex and grid layouts register them in lv_init())
+COMPOSITE_STYLE_PROPERTIES = {"pad_all", "pad_hor", "pad_ver", "pad_gap", "size"}
+RUNTIME_STYLE_PREFIXES = ("flex_", "grid_")
+RUNTIME_STYLE_VALUES = ("LV_LAYOUT_", "LV_FLEX_", "LV_GRID_")
+# Sizes in bytes used to estimate the savings, for LVGL 8.3 on a 32-bit MCU: a
+# local style is an lv_style_t allocated per object and part/state, with its
+# properties in a second allocation if it has more than one. A shared style
+# only costs its obj->styles entry per object, which local styles need as well.
+STYLE_SIZE = 8
+STYLE_PROP_SIZE = 6
+STYLE_CONST_PROP_SIZE = 8
+HEAP_ALLOC_OVERHEAD = 8
+STYLE_CALL_SIZE = 12
+
+# Timing probes: header written by profile_screens(), which wraps the screen
+# functions and ui_init() in its macros. parse_ui_probes.py reads the log.
+PROBE_HEADER_FILE = "ui_probe.h"
+PROBE_INCLUDE = f'#include "{PROBE_HEADER_FILE}"'
+PROBE_HEADER = """#ifndef EEZ_LVGL_UI_PROBE_H
+#define EEZ_LVGL_UI_PROBE_H
+
+// Timing probes, added by import_eez_ui.py. They print one line per screen
+// creation and per UI_PROBE_TICK_REPORT ticks, read them with parse_ui_probes.py:
+//   UIPROBE create <screen> <microseconds> <heap bytes used>
+//   UIPROBE init ui_init <microseconds> <heap bytes used>
+//   UIPROBE tick <screen> <ticks> <total microseconds> <max microseconds>
+// Build with UI_PROBE_ENABLED=0 to compile them out.
+
+#include <lvgl.h>
+#include <stdint.h>
+#include <stdio.h>
+
+#ifndef UI_PROBE_ENABLED
+#define UI_PROBE_ENABLED 1
+#endif
+
+#ifndef UI_PROBE_TICK_REPORT
+#define UI_PROBE_TICK_REPORT 100
+#endif
+
+#if UI_PROBE_ENABLED
+
+#ifdef ESP_PLATFORM
+#include "esp_timer.h"
+#include "esp_heap_caps.h"
+#else
+#include <time.h>
+#endif
+
+typedef struct {
+    int64_t start;
+    int64_t free_heap;
+} ui_probe_t;
+
+typedef struct {
+    uint32_t count;
+    int64_t total;
+    int64_t max;
+} ui_probe_ticks_t;
+
+static inline int64_t ui_probe_now_us(void) {
+#ifdef ESP_PLATFORM
+    return esp_timer_get_time();
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (int64_t)ts.tv_sec * 1000000 + ts.tv_nsec / 1000;
+#endif
+}
+
+// Free bytes of the heap LVGL allocates the widgets from
+static inline int64_t ui_probe_free_heap(void) {
+#if LV_MEM_CUSTOM == 0
+    lv_mem_monitor_t monitor;
+    lv_mem_monitor(&monitor);
+    return (int64_t)monitor.free_size;
+#elif defined(ESP_PLATFORM)
+    return (int64_t)heap_caps_get_free_size(MALLOC_CAP_8BIT);
+#else
+    return 0;
+#endif
+}
+
+static inline ui_probe_t ui_probe_begin(void) {
+    ui_probe_t probe;
+    probe.free_heap = ui_probe_free_heap();
+    probe.start = ui_probe_now_us();
+    return probe;
+}
+
+static inline void ui_probe_end(const ui_probe_t *probe, const char *event, const char *name) {
+    int64_t elapsed = ui_probe_now_us() - probe->start;
+    int64_t used = probe->free_heap - ui_probe_free_heap();
+    printf("UIPROBE %s %s %lld %lld\\n", event, name, (long long)elapsed, (long long)used);
+}
+
+static inline void ui_probe_tick_end(ui_probe_ticks_t *ticks, int64_t start, const char *name) {
+    int64_t elapsed = ui_probe_now_us() - start;
+    ticks->count++;
+    ticks->total += elapsed;
+    if (elapsed > ticks->max) {
+        ticks->max = elapsed;
+    }
+    if (ticks->count == UI_PROBE_TICK_REPORT) {
+        printf("UIPROBE tick %s %lu %lld %lld\\n", name, (unsigned long)ticks->count, (long long)ticks->total, (long long)ticks->max);
+        ticks->count = 0;
+        ticks->total = 0;
+        ticks->max = 0;
+    }
+}
+
+#define UI_PROBE_BEGIN(probe) ui_probe_t probe = ui_probe_begin()
+#define UI_PROBE_END(probe, event, name) ui_probe_end(&probe, event, name)
+#define UI_PROBE_TICK_BEGIN(probe) int64_t probe = ui_probe_now_us()
+#define UI_PROBE_TICK_END(probe, name) do { static ui_probe_ticks_t ticks; ui_probe_tick_end(&ticks, probe, name); } while (0)
+
+#else
+
+#define UI_PROBE_BEGIN(probe)
+#define UI_PROBE_END(probe, event, name)
+#define UI_PROBE_TICK_BEGIN(probe)
+#define UI_PROBE_TICK_END(probe, name)
+
+#endif
+
+#endif /*EEZ_LVGL_UI_PROBE_H*/
+"""
+UI_INIT_RE = re.compile(r"^void ui_init\(\) \{\r?\n.*?^\}", re.M | re.S)
+
+# Fixup passes run by every import, and the literal label texts the opt-in
+# static_text pass changes
+DEFAULT_FIXUP_PASSES = ["headers", "actions", "screens"]
+STATIC_TEXT_RE = re.compile(r'^([ \t]*)lv_(label|checkbox)_set_text\(obj, ("(?:[^"\\]|\\.)*")\);')
+OBJECT_MEMBER_RE = re.compile(r"\bobjects\.(\w+)\b")
+# Uses of an objects_t member, except setting it to the new widget or clearing it
+OBJECT_MEMBER_USE_RE = re.compile(r"\bobjects\.(\w+)\b(?! = (?:obj|0|NULL);)")
+# Application code outside the ui component that can change widgets through
+# objects_t, searched by the static_text pass besides the UI sources
+APP_SOURCE_DIRS = ["./main"]
+# Include of the header that declares objects_t, directly or through ui.h,
+# and the lines that can come before it in a source file
+OBJECTS_HEADER_INCLUDE_RE = re.compile(r'^\s*#\s*include\s*[<"](?:[\w./-]*/)?(?:screens|ui)\.h[>"]')
+PREAMBLE_LINE_RE = re.compile(r'^\s*(?:$|#|//|extern "C"\s*\{\s*$|\}\s*$)')
+
+# Backup snapshots: subdirectory and index file inside the backup directory,
+# and default retention (number of snapshots, age in days, 0 = unlimited)
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_INDEX_FILE = "snapshots.json"
+DEFAULT_BACKUP_KEEP = 10
+DEFAULT_BACKUP_KEEP_DAYS = 0
+
+# Watch mode: seconds without new changes before a batch is imported, and
+# seconds between two scans when inotify is not available
+DEFAULT_WATCH_DEBOUNCE = 0.5
+WATCH_POLL_INTERVAL = 0.5
+
+# inotify event flags (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
 def load_config():
     """
     Loads the configuration from the config file. If the file does not exist,
@@ -190,255 +476,2507 @@ def config_mode(config):
     save_config(config)
 
 
-def backup_ui(source_dir, destination_dir):
+# Statistics of the import stages run so far, reported by print_stage_report()
+STAGE_STATS = []
+current_stage = None
+stats_lock = threading.Lock()
+
+def import_stage(name):
     """
-    Copies UI files from the source directory to the backup directory.
+    Decorator that records a function as an import stage.
+
+    The wall time of every call is recorded in STAGE_STATS, together with the
+    bytes read and written and the files touched and skipped that the call
+    reports through record_io(). A stage called from inside another stage is
+    counted as part of the outer one.
 
     Args:
-        source_dir (str): Path to the UI source directory.
-        destination_dir (str): Path to the backup directory.
+        name: Name of the stage in the report.
     """
-    # Print a message to indicate that the backup process is starting
-    print(f"\nBacking up UI files from '{source_dir}' to '{destination_dir}'.")
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            global current_stage
+            if current_stage is not None:
+                return func(*args, **kwargs)
+            current_stage = {"stage": name, "seconds": 0.0, "bytes_read": 0, "bytes_written": 0,
+                             "files_touched": 0, "files_skipped": 0}
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current_stage["seconds"] = time.perf_counter() - start
+                STAGE_STATS.append(current_stage)
+                current_stage = None
+        return run
+    return decorate
 
-    # Create the backup directory if it doesn't exist
-    if not os.path.exists(destination_dir):
-        os.makedirs(destination_dir)
 
-    # Initialize a counter to keep track of the number of files copied
-    copied_files_count = 0
+def record_io(bytes_read=0, bytes_written=0, touched=0, skipped=0):
+    """
+    Adds I/O counts to the statistics of the running import stage.
 
-    # Walk through the source directory and its subdirectories
-    for root, dirs, files in os.walk(source_dir):
-        # Iterate over the files in the current directory
-        for file in files:
-            # Construct the full path of the source file
-            src_file = os.path.join(root, file)
-            # Construct the full path of the destination file
-            dest_file = os.path.join(destination_dir, os.path.relpath(src_file, source_dir))
-            # Copy the source file to the destination file
-            shutil.copy2(src_file, dest_file)
-            # Increment the counter
-            copied_files_count += 1
+    Thread safe, so it can be called from the sync worker threads. Does
+    nothing outside of a stage.
+
+    Args:
+        bytes_read: Number of bytes read.
+        bytes_written: Number of bytes written.
+        touched: Number of files written or deleted.
+        skipped: Number of files left untouched because they were up to date.
+    """
+    stage = current_stage
+    if stage is None:
+        return
+    with stats_lock:
+        stage["bytes_read"] += bytes_read
+        stage["bytes_written"] += bytes_written
+        stage["files_touched"] += touched
+        stage["files_skipped"] += skipped
 
-    # Print a message to indicate how many files were copied
-    print(f"Total files copied: {copied_files_count}")
 
-def restore_ui(source_dir, destination_dir):
+def print_stage_report(report_file=None):
     """
-    This function restores the UI files from the backup directory
-    to the source directory. If the backup directory does not exist,
-    it will not restore anything.
+    Prints a table of the import stages that ran, and optionally saves it as JSON.
 
     Args:
-        source_dir: Path to the current UI source directory.
-        destination_dir: Path to the backup directory.
+        report_file: Path of the JSON report to write, or None.
     """
-    print(f"\nRestoring UI files from '{destination_dir}' to '{source_dir}'.")
-    restored_files_count = 0
-    # Check if the backup directory exists
-    if os.path.exists(destination_dir):
-        # Copy UI files from backup directory to source directory
-        for root, dirs, files in os.walk(destination_dir):
-            for file in files:
-                # Construct the full path of the source file in the backup directory
-                src_file = os.path.join(root, file)
-                # Construct the full path of the destination file in the source directory
-                dest_file = os.path.join(source_dir, os.path.relpath(src_file, destination_dir))
-                # Copy the source file to the destination file
-                shutil.copy2(src_file, dest_file)
-                # Increment the counter
-                restored_files_count += 1
-        # Print a message to indicate how many files were restored
-        print(f"Total files restored: {restored_files_count}")
-    # If the backup directory does not exist
-    else:
-        print(f"Backup directory '{destination_dir}' does not exist.")
-        
+    if not STAGE_STATS:
+        return
+    print("\nImport stages:")
+    print(f"  {'stage':<14} {'time (ms)':>10} {'read (KB)':>10} {'written (KB)':>13} {'touched':>8} {'skipped':>8}")
+    for stage in STAGE_STATS:
+        print(f"  {stage['stage']:<14} {stage['seconds'] * 1000:>10.1f} {stage['bytes_read'] / 1024:>10.1f} "
+              f"{stage['bytes_written'] / 1024:>13.1f} {stage['files_touched']:>8} {stage['files_skipped']:>8}")
+        for name, seconds in stage.get("passes", {}).items():
+            print(f"    {'fix_' + name:<12} {seconds * 1000:>10.1f}")
+    total = sum(stage["seconds"] for stage in STAGE_STATS)
+    print(f"  {'total':<14} {total * 1000:>10.1f}")
 
-def copy_ui(source_dir):
+    if report_file:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_seconds": total,
+            "stages": STAGE_STATS,
+        }
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"\nImport report saved to {report_file}")
+
+
+def file_sha256(file_path):
     """
-    Copies UI files from the source directory to the destination directory.
+    Computes the sha256 digest of a file, reading it in 1 MiB chunks.
 
     Args:
-        source_dir: Path to the UI source directory.
+        file_path: Path to the file to hash.
+
+    Returns:
+        str: The hex encoded sha256 digest.
     """
-    
-    # Use the config file to get the project_dir
-    # If the config file does not exist, use the default project directory
-    import configparser
-    config = configparser.ConfigParser()
-    config.read('.ui_import_config')
-    dest_dir = config.get('ImportSettings', 'project_dir', fallback=DEFAULT_PROJECT_DIR)
-    print(f"\nCopying UI files from '{source_dir}' to '{dest_dir}'.")
-    
-    # Ensure the destination directory exists
-    if not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
-    
-    copied_files = 0  # Counter for the number of copied files
-    
-    # Walk through the source directory to copy files
-    for root, dirs, files in os.walk(source_dir):
-        for file in files:
-            src_file = os.path.join(root, file)  # Get the full path of the source file
-            dest_file = os.path.join(dest_dir, os.path.relpath(src_file, source_dir))  # Determine destination path
-            shutil.copy2(src_file, dest_file)  # Copy the file to the destination
-            copied_files += 1  # Increment the copied files counter
-    
-    print(f"Copied {copied_files} files.")  # Output the number of copied files
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    record_io(bytes_read=size)
+    return digest.hexdigest()
 
 
-def fix_flow():
+def read_manifest(directory):
     """
-    Copies the eez-flow.h template from the backup directory to the destination directory if it doesn't already exist.
-    This is necessary to ensure that the project compiles if you don't use eez-flow.
+    Reads the sync manifest of a directory.
+
+    A missing, unreadable or outdated manifest is treated as empty, which
+    simply makes the next sync fall back to hashing.
+
+    Args:
+        directory: Directory containing the manifest.
+
+    Returns:
+        dict: The manifest, or an empty dict.
     """
-    # Check if the file already exists in the destination directory
-    if not os.path.exists(os.path.join(DEFAULT_PROJECT_DIR, "eez-flow.h")):
-        # If the file doesn't exist, copy it from the backup directory
-        print(f"\nCopying eez-flow.h template from backup to {DEFAULT_PROJECT_DIR}.")
-        shutil.copy2(os.path.join("backup/templates/eez-flow.h"), os.path.join(DEFAULT_PROJECT_DIR, "eez-flow.h"))
-        
-        
-import configparser
-import os
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.isfile(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print(f"WARNING: Could not read '{manifest_path}'. Rebuilding it.")
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
 
-def fix_headers():
+def load_manifest(directory):
     """
-    Replaces "lvgl/lvgl.h" with "lvgl.h" in all UI files.
+    Loads the file entries of the sync manifest of a directory.
+
+    The manifest maps every file (relative path) that sync_tree() wrote into the
+    directory to its size and mtime, plus the size, mtime and sha256 of the
+    source file it was produced from. Entries of files a transform changed in
+    place after the copy are marked 'modified'.
+
+    Args:
+        directory: Directory containing the manifest.
+
+    Returns:
+        dict: Mapping of relative file path to its manifest entry.
     """
-    # Load destination directory from config
-    config = configparser.ConfigParser()
-    config.read('.ui_import_config')
-    dest_dir = config.get('ImportSettings', 'project_dir', fallback='components/ui')
-    count = 0
-    print(f"\nReplacing occurrences of 'lvgl/lvgl.h' with 'lvgl.h' in all UI files under '{dest_dir}'.")
-    for root, dirs, files in os.walk(dest_dir):
-        for file in files:
-            if file.endswith((".h", ".c", ".cpp", ".hpp")):
-                file_path = os.path.join(root, file)
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                updated_content = content.replace("lvgl/lvgl.h", "lvgl.h")
-                if content != updated_content:
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.write(updated_content)
-                    print(f"Updated '{file_path}'")
-                    count += 1
-    print(f"Total files updated: {count}")
-    
-def fix_screens():
+    return read_manifest(directory).get("files", {})
+
+
+def load_manifest_transforms(directory):
     """
-    Replaces all occurrences of 'lv_obj_create(0)' with 'lv_obj_create(NULL)' in screens.c.
+    Loads the in-place transforms recorded in the sync manifest of a directory.
+
+    Args:
+        directory: Directory containing the manifest.
+
+    Returns:
+        dict: Transform name -> option of every transform applied to the
+            files since they were copied, or None if the manifest doesn't
+            record them.
     """
-    # Load destination directory from config
-    config = configparser.ConfigParser()
-    config.read('.ui_import_config')
-    dest_dir = config.get('ImportSettings', 'project_dir', fallback='components/ui')
+    return read_manifest(directory).get("transforms")
 
-    file_path = os.path.join(dest_dir, "screens.c")
-    if not os.path.isfile(file_path):
-        print(f"'screens.c' not found in '{dest_dir}'.")
+
+def save_manifest(directory, files, transforms=None):
+    """
+    Saves the sync manifest of a directory.
+
+    Args:
+        directory: Directory the manifest belongs to.
+        files: Mapping of relative file path to its manifest entry.
+        transforms: Transform name -> option of the applied in-place
+            transforms, or None to not record them.
+    """
+    manifest = {"version": MANIFEST_VERSION, "files": files}
+    if transforms is not None:
+        manifest["transforms"] = transforms
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def record_transform(directory, name, option=True):
+    """
+    Records in the sync manifest of a directory that an in-place transform
+    was applied to its files.
+
+    sync_tree() compares the recorded transforms with the ones the next
+    import applies, and copies the changed files again when a transform was
+    turned off or its option changed. Directories without a manifest are
+    ignored.
+
+    Args:
+        directory: Directory containing the manifest.
+        name: Name of the transform (its import stage).
+        option: Option the transform was applied with.
+    """
+    manifest = read_manifest(directory)
+    if not manifest:
+        return
+    transforms = manifest.get("transforms") or {}
+    if transforms.get(name) == option:
         return
+    transforms[name] = option
+    save_manifest(directory, manifest["files"], transforms)
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
 
-    # Replace occurrences and count them
-    updated_content, count = re.subn(r'\blv_obj_create\s*\(\s*0\s*\)', 'lv_obj_create(NULL)', content)
+def list_tree(directory):
+    """
+    Lists every file under a directory, except sync manifests and project indexes.
 
-    if count > 0:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(updated_content)
-        print(f"Updated {count} occurrence(s) in '{file_path}'.")
+    Args:
+        directory: Directory to list.
+
+    Returns:
+        list: File paths relative to directory, using '/' as separator.
+    """
+    rel_paths = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file not in SYNC_IGNORED_FILES:
+                rel_paths.append(os.path.relpath(os.path.join(root, file), directory).replace(os.sep, "/"))
+    return rel_paths
+
+
+def copy_file_data(src_file, dest_file):
+    """
+    Copies the content of a file, without its metadata.
+
+    Uses os.copy_file_range() when available, so the kernel copies the data
+    directly (or reflinks it on btrfs/XFS) without passing it through Python.
+    Otherwise falls back to shutil.copyfile(), which uses sendfile() on Linux
+    and fcopyfile() on macOS.
+
+    Args:
+        src_file: Path of the file to copy.
+        dest_file: Path of the copy. Overwritten if it exists.
+    """
+    size = os.path.getsize(src_file)
+    record_io(bytes_read=size, bytes_written=size)
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(src_file, dest_file)
+        return
+    with open(src_file, "rb") as fsrc, open(dest_file, "wb") as fdst:
+        try:
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), COPY_CHUNK_SIZE):
+                pass
+        except OSError:
+            # e.g. cross-filesystem copies on older kernels
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+
+
+def copy_and_hash_file(src_file, dest_file):
+    """
+    Copies the content of a file and computes its sha256 in the same pass, so
+    a file that has to be copied anyway is only read once.
+
+    Args:
+        src_file: Path of the file to copy.
+        dest_file: Path of the copy. Overwritten if it exists.
+
+    Returns:
+        str: The hex encoded sha256 digest of the content.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(src_file, "rb") as fsrc, open(dest_file, "wb") as fdst:
+        for chunk in iter(lambda: fsrc.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            fdst.write(chunk)
+            size += len(chunk)
+    record_io(bytes_read=size, bytes_written=size)
+    return digest.hexdigest()
+
+
+def sync_file(source_dir, destination_dir, rel_path, entry):
+    """
+    Copies a single file for sync_tree() if its content changed.
+
+    Args:
+        source_dir: Directory to copy from.
+        destination_dir: Directory to copy to.
+        rel_path: Path of the file relative to both directories.
+        entry: Manifest entry of the file from the last sync, or None.
+
+    Returns:
+        tuple: (new manifest entry, True if the file was copied).
+    """
+    src_file = os.path.join(source_dir, rel_path)
+    dest_file = os.path.join(destination_dir, rel_path)
+    src_stat = os.stat(src_file)
+    dest_stat = os.stat(dest_file) if os.path.isfile(dest_file) else None
+
+    # The destination still is exactly what the manifest recorded
+    dest_known = (
+        entry is not None and dest_stat is not None
+        and entry["size"] == dest_stat.st_size
+        and entry["mtime_ns"] == dest_stat.st_mtime_ns
+    )
+    # Fast-path: neither side changed since the last sync
+    if (dest_known
+            and entry["source_size"] == src_stat.st_size
+            and entry["source_mtime_ns"] == src_stat.st_mtime_ns):
+        return entry, False
+
+    # A destination that is missing or has another size is copied without
+    # comparing, hashing the source while it is copied
+    if dest_known:
+        differs = entry["source_size"] != src_stat.st_size
     else:
-        print("No occurrences found to update.")
+        differs = dest_stat is None or dest_stat.st_size != src_stat.st_size
+    if differs:
+        src_hash = None
+        copied = True
+    else:
+        src_hash = file_sha256(src_file)
+        dest_hash = entry["sha256"] if dest_known else file_sha256(dest_file)
+        copied = dest_hash != src_hash
+
+    if copied:
+        # Copy the file content, giving it a fresh mtime
+        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+        if src_hash is None:
+            src_hash = copy_and_hash_file(src_file, dest_file)
+        else:
+            copy_file_data(src_file, dest_file)
+        shutil.copymode(src_file, dest_file)
+        dest_stat = os.stat(dest_file)
+
+    return {
+        "size": dest_stat.st_size,
+        "mtime_ns": dest_stat.st_mtime_ns,
+        "sha256": src_hash,
+        "source_size": src_stat.st_size,
+        "source_mtime_ns": src_stat.st_mtime_ns,
+    }, copied
 
-def fix_cmake():
+
+def map_files(func, rel_paths, workers):
     """
-    Verifies the existence of CMakeLists.txt and replaces it with a default if missing.
+    Runs func on every file path with a bounded pool of worker threads.
 
-    This function checks if the CMakeLists.txt file exists in the specified directory.
-    If the file is absent, it copies a default version from the backup directory to ensure
-    that the project can be successfully built. This step is necessary as the CMakeLists.txt
-    file is not generated automatically during project creation.
+    Results are yielded in the order of rel_paths. Progress is printed for
+    trees of at least PROGRESS_MIN_FILES files.
+
+    Args:
+        func: Function taking a relative file path.
+        rel_paths: List of relative file paths.
+        workers: Number of worker threads. 1 runs func serially.
+
+    Yields:
+        tuple: (rel_path, result of func).
     """
-    # Check if CMakeLists.txt exists at the specified path
-    if os.path.exists(cmake_file):
-        # Print a message indicating the file exists and will be used
-        print(f"\nCMakeLists.txt found.\nUsing existing {cmake_file}")
+    if workers > 1 and len(rel_paths) > 1:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        results = executor.map(func, rel_paths)
     else:
-        # Print a message indicating the file is missing and will be replaced
-        print(f"\n{cmake_file} missing. Replacing it with the default")
-        # Copy the default CMakeLists.txt from the backup directory to the specified path
-        shutil.copy2("./backup/templates/CMakeLists.txt", cmake_file)
+        executor = None
+        results = map(func, rel_paths)
+
+    show_progress = len(rel_paths) >= PROGRESS_MIN_FILES
+    try:
+        for done, (rel_path, result) in enumerate(zip(rel_paths, results), 1):
+            yield rel_path, result
+            if show_progress and (done % PROGRESS_STEP == 0 or done == len(rel_paths)):
+                print(f"  {done}/{len(rel_paths)} files processed", flush=True)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
 
-def fix_actions():
+def sync_tree(source_dir, destination_dir, rel_paths=None, workers=DEFAULT_WORKERS, mirror=False, transforms=None):
     """
-    This function searches for extern functions in actions.h and if the function is not
-    implemented in actions.c, it adds the function to actions.c with a TODO comment to
-    implement the function.
+    Copies every file from source_dir to destination_dir whose content changed.
+
+    Unchanged files are never rewritten, so their mtime is kept and ESP-IDF does
+    not recompile them. For every file the check is done in two steps:
+
+    1. Stat fast-path: if the source size/mtime and the destination size/mtime
+       both match the manifest entry, the file is skipped without reading it.
+    2. Content check: otherwise the source is hashed and compared with the
+       source hash recorded in the manifest (if the destination stat still
+       matches), or with the hash of the destination file. Only differing
+       files are copied. A file whose size shows that it changed (or that
+       is missing) is copied right away and hashed while it is copied, so
+       it is read only once.
+
+    Files that are modified in place after the copy (e.g. by fix_headers) keep
+    their entry valid through refresh_manifest(), so they are not recopied.
+    When `transforms` differs from the transforms recorded by
+    record_transform(), e.g. because split or lazy screens were turned off,
+    every modified file is compared with its source again and copied, so
+    the import starts from the pristine files.
+
+    Changed files are copied with a fresh mtime (not copy2) so the build system
+    always sees them as newer than their object files.
+
+    Files are hashed and copied by a bounded pool of worker threads, so the disk
+    stays busy on exports with many large image files. Progress is printed for
+    large trees.
+
+    In mirror mode, files that an earlier sync copied into destination_dir but
+    that no longer exist in source_dir are deleted, except PROTECTED_FILES.
+    Files that never came from source_dir are not in the manifest and are
+    never deleted.
+
+    Args:
+        source_dir: Directory to copy from.
+        destination_dir: Directory to copy to. Created if it doesn't exist.
+        rel_paths: Only sync these paths (relative to source_dir). Syncs the
+            whole tree if None.
+        workers: Number of worker threads. 1 syncs the files serially.
+        mirror: Delete files that were removed from source_dir.
+        transforms: Transform name -> option of the in-place transforms the
+            import applies after the copy, or None to not check them.
+
+    Returns:
+        tuple: (copied_files, unchanged_files, removed_files) counts.
     """
+    # Create the destination directory if it doesn't exist
+    if not os.path.exists(destination_dir):
+        os.makedirs(destination_dir)
 
-    actions_h = "components/ui/actions.h"
-    actions_c = "components/ui/actions.c"
-    actions_template = "./backup/templates/actions.c"
-    
-    if os.path.exists(actions_h):
-        with open(actions_h, "r") as f:
-            content = f.read()
-            # Find all extern functions in actions.h
-            extern_functions = re.findall(r"extern\s+void\s+(\w+)\s*\((.*?)\)\s*;", content)
-        
-        # Check if actions.c exists
-        if os.path.exists(actions_c):
-            print(f"\n{actions_c} found. Using existing actions.c.")
-            with open(actions_c, "r") as f:
-                content = f.read()
-                # Find all existing functions in actions.c
-                existing_functions = re.findall(r"void\s+(\w+)\s*\((.*?)\)\s*\{", content)
-        else: 
-            print(f"\n{actions_c} not found. Creating new actions.c")
-            # If actions.c does not exist, copy the template from the backup directory
-            if os.path.exists(actions_template):
-                shutil.copy2(actions_template, actions_c)
-            else:
-                print(f"\n{actions_template} not found. Skipping template copy.")
-        
-        print(f"Found {len(extern_functions)} extern functions in {actions_h}")    
-        # Write extern functions to actions.c
-        with open(actions_c, "a") as f:
-            print(f"Writing extern functions to {actions_c}")
-            for func in extern_functions:
-                print(f"Found extern function: {func}")
-                # Check if the function is not implemented in actions.c
-                if func not in existing_functions:
-                    print(f"Function {func} not found in {actions_c}.")
-                    print(f"Adding extern function: {func}")
-                    f.write(f"\nvoid {func}() {{\n\t// TODO: implement {func}\n}}\n")
-                else:
-                    print(f"Function {func} found in {actions_c} already. Skipping.")
+    old_manifest = load_manifest(destination_dir)
+    old_transforms = load_manifest_transforms(destination_dir)
+    copied_files = 0
+    unchanged_files = 0
+
+    # Files changed in place by transforms that are turned off or changed
+    stale_paths = set()
+    new_transforms = old_transforms
+    if transforms is not None and transforms != old_transforms:
+        stale_paths = {r for r, entry in old_manifest.items() if entry.get("modified")
+                       and os.path.isfile(os.path.join(source_dir, r))}
+        new_transforms = {}
+        if stale_paths:
+            print(f"The transforms changed, comparing {len(stale_paths)} modified file(s) with their source again.")
+
+    # Only look at the requested files, or at the whole source tree
+    if rel_paths is None:
+        rel_paths = list_tree(source_dir)
+        removed_paths = set(old_manifest) - set(rel_paths)
+        new_manifest = {}
     else:
-        print(f"{actions_h} not found. Skipping.")
+        removed_paths = {r for r in rel_paths if not os.path.isfile(os.path.join(source_dir, r))}
+        rel_paths = [r for r in rel_paths if r not in removed_paths]
+        new_manifest = dict(old_manifest)
+    rel_paths = sorted(set(rel_paths) | stale_paths)
 
-def main():
+    def sync(rel_path):
+        entry = None if rel_path in stale_paths else old_manifest.get(rel_path)
+        return sync_file(source_dir, destination_dir, rel_path, entry)
+
+    for rel_path, (entry, copied) in map_files(sync, rel_paths, workers):
+        new_manifest[rel_path] = entry
+        if copied:
+            copied_files += 1
+        else:
+            unchanged_files += 1
+    record_io(touched=copied_files, skipped=unchanged_files)
+
+    removed_files = 0
+    for rel_path in sorted(removed_paths & set(old_manifest)):
+        if not mirror:
+            # Keep tracking the stale file so a later mirror sync can remove it
+            new_manifest[rel_path] = old_manifest[rel_path]
+            continue
+        new_manifest.pop(rel_path, None)
+        if os.path.basename(rel_path) in PROTECTED_FILES:
+            print(f"Keeping protected file '{rel_path}'")
+            continue
+        if remove_file(destination_dir, rel_path):
+            print(f"Removed stale file '{rel_path}'")
+            removed_files += 1
+
+    # Only rewrite the manifest when something in it changed
+    if new_manifest != old_manifest or new_transforms != old_transforms:
+        save_manifest(destination_dir, new_manifest, new_transforms)
+
+    return copied_files, unchanged_files, removed_files
+
+
+def remove_file(directory, rel_path):
     """
-    Main function to run the script with the given arguments.
+    Deletes a file and the directories it leaves empty inside directory.
+
+    Args:
+        directory: Base directory, never deleted itself.
+        rel_path: Path of the file relative to directory.
+
+    Returns:
+        bool: True if the file existed and was deleted.
     """
-    parser = argparse.ArgumentParser(description='Running EEZ UI Importer')
-    parser.add_argument('-d', '--directory',nargs='?', const='', help='Source directory for UI files')
-    parser.add_argument('-b', '--backup-directory',nargs='?', const='', help='Backup directory for UI files')
-    parser.add_argument('-m', '--mode', choices=['config', 'backup-ui', 'restore-ui', 'delete-backup', 'copy-ui', 'fix-headers', 'fix-cmake', 'fix-actions', 'fix-screens', 'all'], default=None) 
-    help_parser = argparse.ArgumentParser(description='Import EEZ UI', formatter_class=argparse.RawDescriptionHelpFormatter, epilog='''
-                                     
-  -d, --directory         -Set the source directory for UI files exported from EEZ-Studio. Must be in folder called ui
-                            Default: ./example/eez-project/project_name/src/ui
-                            Example: python import_eez_ui.py -d ./example/eez-project/project_name/src/ui
-    
-  -b, --backup-directory  -Set the backup directory for .components/ui files. 
-                            Default: ./backup/ui
-                            Example: python import_eez_ui.py -b ./backup/ui
+    file_path = os.path.join(directory, rel_path)
+    if not os.path.isfile(file_path):
+        return False
+    os.remove(file_path)
+    record_io(touched=1)
+    parent = os.path.dirname(rel_path)
+    while parent:
+        try:
+            os.rmdir(os.path.join(directory, parent))
+        except OSError:
+            # Not empty
+            break
+        parent = os.path.dirname(parent)
+    return True
+
+
+def refresh_manifest(directory, file_path):
+    """
+    Records the current size and mtime of a file after it was modified in place.
+
+    The sha256 of the source it was produced from is kept, so the next sync_tree()
+    still recognizes the file as up to date, and the entry is marked
+    'modified'. Files without a manifest entry are ignored.
+
+    Args:
+        directory: Directory containing the manifest.
+        file_path: Path of the modified file inside directory.
+    """
+    manifest = read_manifest(directory)
+    files = manifest.get("files", {})
+    rel_path = os.path.relpath(file_path, directory).replace(os.sep, "/")
+    if rel_path not in files:
+        return
+    file_stat = os.stat(file_path)
+    files[rel_path]["size"] = file_stat.st_size
+    files[rel_path]["mtime_ns"] = file_stat.st_mtime_ns
+    files[rel_path]["modified"] = True
+    save_manifest(directory, files, manifest.get("transforms"))
+
+
+def write_if_changed(file_path, content, manifest_dir=None):
+    """
+    Writes a file only if its content differs from what is on disk.
+
+    Every transform goes through this writer, so an import that produces the
+    same bytes leaves the file (and its mtime) untouched and ESP-IDF has
+    nothing to recompile.
+
+    Args:
+        file_path: Path of the file to write. Parent directories are created.
+        content: New content, as str (written as utf-8) or bytes.
+        manifest_dir: Directory whose sync manifest tracks the file. Its entry
+            is refreshed after a write so sync_tree() doesn't recopy the file.
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    # Compare with the current content, checking the size first
+    if os.path.isfile(file_path) and os.path.getsize(file_path) == len(content):
+        with open(file_path, "rb") as f:
+            unchanged = f.read() == content
+        record_io(bytes_read=len(content))
+        if unchanged:
+            record_io(skipped=1)
+            return False
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write(content)
+    record_io(bytes_written=len(content), touched=1)
+    if manifest_dir is not None:
+        refresh_manifest(manifest_dir, file_path)
+    return True
+
+
+def load_snapshot_index(backup_dir):
+    """
+    Loads the index of the backup snapshots.
+
+    Args:
+        backup_dir: Path to the backup directory.
+
+    Returns:
+        list: Snapshot records, oldest first. Empty if there are no snapshots.
+    """
+    index_path = os.path.join(backup_dir, SNAPSHOT_INDEX_FILE)
+    if not os.path.isfile(index_path):
+        return []
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("snapshots", [])
+    except (OSError, ValueError):
+        print(f"WARNING: Could not read '{index_path}'.")
+        return []
+
+
+def save_snapshot_index(backup_dir, snapshots):
+    """
+    Saves the index of the backup snapshots.
+
+    Args:
+        backup_dir: Path to the backup directory.
+        snapshots: Snapshot records, oldest first.
+    """
+    with open(os.path.join(backup_dir, SNAPSHOT_INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "snapshots": snapshots}, f, indent=1)
+
+
+def snapshot_file(source_dir, snapshot_dir, previous_dir, rel_path, entry):
+    """
+    Stores a single file in a new snapshot for backup_ui().
+
+    Files that are unchanged since the previous snapshot are hard linked from
+    it and take no extra space. Changed files are copied (reflinked where the
+    filesystem supports it).
+
+    Args:
+        source_dir: Directory being backed up.
+        snapshot_dir: Directory of the new snapshot.
+        previous_dir: Directory of the previous snapshot, or None.
+        rel_path: Path of the file relative to source_dir.
+        entry: Manifest entry of the file in the previous snapshot, or None.
+
+    Returns:
+        tuple: (manifest entry, True if the file was linked from previous_dir).
+    """
+    src_file = os.path.join(source_dir, rel_path)
+    dest_file = os.path.join(snapshot_dir, rel_path)
+    src_stat = os.stat(src_file)
+    os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+
+    # Same stat as the previous backup, or same content after hashing
+    unchanged = entry is not None and (
+        (entry["source_size"] == src_stat.st_size and entry["source_mtime_ns"] == src_stat.st_mtime_ns)
+        or (entry["source_size"] == src_stat.st_size and entry["sha256"] == file_sha256(src_file))
+    )
+    if unchanged:
+        try:
+            os.link(os.path.join(previous_dir, rel_path), dest_file)
+            linked_entry = dict(entry)
+            linked_entry["source_size"] = src_stat.st_size
+            linked_entry["source_mtime_ns"] = src_stat.st_mtime_ns
+            return linked_entry, True
+        except OSError:
+            # Filesystem without hard links, fall back to a copy
+            pass
+
+    copy_file_data(src_file, dest_file)
+    shutil.copymode(src_file, dest_file)
+    dest_stat = os.stat(dest_file)
+    return {
+        "size": dest_stat.st_size,
+        "mtime_ns": dest_stat.st_mtime_ns,
+        "sha256": entry["sha256"] if unchanged else file_sha256(src_file),
+        "source_size": src_stat.st_size,
+        "source_mtime_ns": src_stat.st_mtime_ns,
+    }, False
+
+
+def prune_snapshots(backup_dir, snapshots, keep, keep_days):
+    """
+    Deletes the snapshots that fall outside the retention policy.
+
+    The newest snapshot is always kept.
+
+    Args:
+        backup_dir: Path to the backup directory.
+        snapshots: Snapshot records, oldest first.
+        keep: Number of snapshots to keep. 0 keeps all of them.
+        keep_days: Delete snapshots older than this many days. 0 disables it.
+
+    Returns:
+        list: The remaining snapshot records.
+    """
+    now = time.time()
+    remaining = []
+    for i, snapshot in enumerate(snapshots):
+        newer_count = len(snapshots) - 1 - i
+        too_many = keep > 0 and newer_count >= keep
+        too_old = keep_days > 0 and now - snapshot["created"] > keep_days * 86400
+        if newer_count > 0 and (too_many or too_old):
+            shutil.rmtree(os.path.join(backup_dir, SNAPSHOT_DIR, snapshot["name"]), ignore_errors=True)
+            print(f"Deleted snapshot {snapshot['name']}")
+        else:
+            remaining.append(snapshot)
+    return remaining
+
+
+@import_stage("backup_ui")
+def backup_ui(source_dir, destination_dir, workers=DEFAULT_WORKERS,
+              keep=DEFAULT_BACKUP_KEEP, keep_days=DEFAULT_BACKUP_KEEP_DAYS):
+    """
+    Stores a timestamped snapshot of the UI files in the backup directory.
+
+    Like rsync --link-dest, files that did not change since the previous
+    snapshot are hard linked from it, so a snapshot only takes disk space (and
+    time) for the files that changed. No snapshot is created if nothing
+    changed. Snapshots outside the retention policy are deleted afterwards and
+    all snapshots are listed in an index for restore_ui().
+
+    Args:
+        source_dir (str): Path to the UI source directory.
+        destination_dir (str): Path to the backup directory.
+        workers (int): Number of worker threads used to hash and copy files.
+        keep (int): Number of snapshots to keep. 0 keeps all of them.
+        keep_days (float): Delete snapshots older than this many days. 0 disables it.
+    """
+    # Print a message to indicate that the backup process is starting
+    print(f"\nBacking up UI files from '{source_dir}' to '{destination_dir}'.")
+
+    snapshots = load_snapshot_index(destination_dir)
+    previous_dir = None
+    previous_manifest = {}
+    if snapshots:
+        previous_dir = os.path.join(destination_dir, SNAPSHOT_DIR, snapshots[-1]["name"])
+        previous_manifest = load_manifest(previous_dir)
+
+    # Snapshot names are timestamps, with a suffix if one already exists
+    name = time.strftime("%Y%m%d-%H%M%S")
+    existing_names = {snapshot["name"] for snapshot in snapshots}
+    suffix = 1
+    while name in existing_names or os.path.exists(os.path.join(destination_dir, SNAPSHOT_DIR, name)):
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+        suffix += 1
+    snapshot_dir = os.path.join(destination_dir, SNAPSHOT_DIR, name)
+    os.makedirs(snapshot_dir)
+
+    def snapshot(rel_path):
+        return snapshot_file(source_dir, snapshot_dir, previous_dir, rel_path, previous_manifest.get(rel_path))
+
+    manifest = {}
+    copied_files_count = 0
+    linked_files_count = 0
+    copied_bytes = 0
+    for rel_path, (entry, linked) in map_files(snapshot, sorted(list_tree(source_dir)), workers):
+        manifest[rel_path] = entry
+        if linked:
+            linked_files_count += 1
+        else:
+            copied_files_count += 1
+            copied_bytes += entry["size"]
+    record_io(touched=copied_files_count, skipped=linked_files_count)
+    save_manifest(snapshot_dir, manifest)
+
+    # Nothing changed since the previous snapshot, don't keep a duplicate
+    if previous_dir is not None and copied_files_count == 0 and set(manifest) == set(previous_manifest):
+        shutil.rmtree(snapshot_dir)
+        print(f"No changes since snapshot {snapshots[-1]['name']}. Skipping.")
+        return
+
+    snapshots.append({
+        "name": name,
+        "created": time.time(),
+        "source": source_dir,
+        "files": len(manifest),
+        "copied": copied_files_count,
+        "linked": linked_files_count,
+        "copied_bytes": copied_bytes,
+    })
+    snapshots = prune_snapshots(destination_dir, snapshots, keep, keep_days)
+    save_snapshot_index(destination_dir, snapshots)
+
+    # Print a message to indicate how many files were copied
+    print(f"Created snapshot {name}: {copied_files_count} files copied ({copied_bytes} bytes), {linked_files_count} linked")
+
+
+def list_backups(destination_dir):
+    """
+    Prints the snapshots stored in the backup directory.
+
+    Args:
+        destination_dir: Path to the backup directory.
+    """
+    snapshots = load_snapshot_index(destination_dir)
+    if not snapshots:
+        print(f"\nNo snapshots found in '{destination_dir}'.")
+        return
+    print(f"\nSnapshots in '{destination_dir}' (newest last):")
+    for snapshot in snapshots:
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["created"]))
+        print(f"  {snapshot['name']:<20} {created}  {snapshot['files']:>6} files, "
+              f"{snapshot['copied']} copied ({snapshot['copied_bytes']} bytes), {snapshot['linked']} linked")
+
+
+@import_stage("restore_ui")
+def restore_ui(source_dir, destination_dir, workers=DEFAULT_WORKERS, snapshot=None):
+    """
+    This function restores the UI files from the backup directory
+    to the source directory. If the backup directory does not exist,
+    it will not restore anything. Files that are identical in both
+    directories are left untouched.
+
+    The newest snapshot is restored unless another one is selected. Backup
+    directories without snapshots (made by older versions of this script) are
+    restored as they are.
+
+    Args:
+        source_dir: Path to the current UI source directory.
+        destination_dir: Path to the backup directory.
+        workers: Number of worker threads used to hash and copy files.
+        snapshot: Name of the snapshot to restore. The newest one if None.
+    """
+    # Check if the backup directory exists
+    if not os.path.exists(destination_dir):
+        print(f"\nBackup directory '{destination_dir}' does not exist.")
+        return
+
+    snapshots = load_snapshot_index(destination_dir)
+    restore_dir = destination_dir
+    if snapshots:
+        names = [s["name"] for s in snapshots]
+        name = snapshot or names[-1]
+        if name not in names:
+            print(f"\nSnapshot '{name}' not found in '{destination_dir}'. Available: {', '.join(names)}")
+            return
+        restore_dir = os.path.join(destination_dir, SNAPSHOT_DIR, name)
+    elif snapshot is not None:
+        print(f"\nNo snapshots found in '{destination_dir}'.")
+        return
+
+    print(f"\nRestoring UI files from '{restore_dir}' to '{source_dir}'.")
+    # Copy changed UI files from backup directory to source directory.
+    # Snapshot files are hard linked, so they are always copied, never linked.
+    restored_files_count, unchanged_files_count, removed_files_count = sync_tree(restore_dir, source_dir, workers=workers)
+    # Print a message to indicate how many files were restored
+    print(f"Total files restored: {restored_files_count} ({unchanged_files_count} unchanged)")
+        
+
+@import_stage("copy_ui")
+def copy_ui(source_dir, dest_dir=None, workers=DEFAULT_WORKERS, mirror=False, transforms=None):
+    """
+    Copies changed UI files from the source directory to the destination directory.
+
+    Args:
+        source_dir: Path to the UI source directory.
+        dest_dir: Path to the UI project directory. Read from the config file if None.
+        workers: Number of worker threads used to hash and copy files.
+        mirror: Delete files of earlier imports that were removed from the source
+            directory (e.g. screens or images deleted in EEZ-Studio).
+        transforms: Transform name -> option of the in-place transforms the
+            import applies after the copy, see sync_tree(). None to not
+            check them.
+    """
+    
+    # Use the config file to get the project_dir
+    # If the config file does not exist, use the default project directory
+    if dest_dir is None:
+        config = configparser.ConfigParser()
+        config.read(CONFIG_FILE)
+        dest_dir = config.get('ImportSettings', 'project_dir', fallback=DEFAULT_PROJECT_DIR)
+    print(f"\nCopying UI files from '{source_dir}' to '{dest_dir}'.")
+    
+    # Copy only the files whose content changed
+    copied_files, unchanged_files, removed_files = sync_tree(source_dir, dest_dir, workers=workers, mirror=mirror, transforms=transforms)
+    
+    print(f"Copied {copied_files} files, {unchanged_files} unchanged.")  # Output the number of copied files
+    if removed_files:
+        print(f"Removed {removed_files} stale files. Run a Full Clean so CMake forgets them.")
+
+
+def find_project_file(source_dir):
+    """
+    Finds the .eez-project file that exports to the source directory.
+
+    EEZ-Studio exports to <project>/src/ui, so the project file is searched two
+    levels above the source directory.
+
+    Args:
+        source_dir: Path to the UI source directory.
+
+    Returns:
+        str: Path to the .eez-project file, or None if there isn't exactly one.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.normpath(source_dir)))
+    if not os.path.isdir(project_root):
+        return None
+    project_files = [f for f in os.listdir(project_root) if f.endswith(".eez-project")]
+    if len(project_files) != 1:
+        return None
+    return os.path.join(project_root, project_files[0])
+
+
+@import_stage("generate_ui")
+def generate_ui_sources(project_file, source_dir, cache_bindings=False, color_order="auto", rotation=0):
+    """
+    Generates the UI source files from the .eez-project file into the source
+    directory, without opening EEZ-Studio. The project is compared with the
+    revision the source directory was last generated from, and only the files
+    affected by the changed screens and assets are written, so the following
+    copy-ui and build stay incremental.
+
+    Args:
+        project_file: Path to the .eez-project file. Searched next to the source directory if None.
+        source_dir: Path to the UI source directory.
+        cache_bindings: Read every bound variable once per tick and cache the
+            last value of display-only bindings (see generate_eez_ui).
+        color_order: Channel order of the panel the color constants are
+            written for, 'auto', 'rgb' or 'bgr' (see convert_ui_images).
+        rotation: Rotate the screens by this many degrees for the panel, so
+            the flush doesn't rotate them (see generate_eez_ui.rotate_project()).
+
+    Returns:
+        bool: True if the sources were generated, False otherwise.
+    """
+    import generate_eez_ui
+    import convert_ui_images
+
+    if project_file is None:
+        project_file = find_project_file(source_dir)
+    if project_file is None or not os.path.isfile(project_file):
+        print(f"\nERROR: No .eez-project file found for '{source_dir}'. Set 'project_file' in the config file or use --project.")
+        return False
+    print(f"\nGenerating UI files from '{project_file}' into '{source_dir}'.")
+    project = generate_eez_ui.load_project(project_file)
+    color_order = convert_ui_images.project_color_order(project_file, color_order)
+    port_rotation = convert_ui_images.read_sdkconfig(".").get("CONFIG_EXAMPLE_LVGL_PORT_ROTATION_DEGREE", "0")
+    if rotation and port_rotation != "0":
+        print(f"ERROR: The screens are rotated by {rotation} degrees, but the LVGL port rotates the frame by "
+              f"{port_rotation} degrees as well. Select 'Rotation 0' in menuconfig.")
+        return False
+    try:
+        files, warnings = generate_eez_ui.generate_ui(project, cache_bindings, color_order, rotation)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return False
+    for warning in warnings:
+        print(f"WARNING: {warning}")
+    # Only touch the files whose content changed, so the build only recompiles
+    # the screens and assets that were edited
+    model = generate_eez_ui.plan_generation(project, source_dir, files, {"cache_bindings": cache_bindings,
+                                                                         "bgr_colors": color_order == "BGR",
+                                                                         "rotation": rotation})
+    updated_files = 0
+    for file_name, content in files.items():
+        if write_if_changed(os.path.join(source_dir, file_name), content):
+            updated_files += 1
+    generate_eez_ui.save_project_index(source_dir, model)
+    print(f"Generated {len(files)} files, {updated_files} updated.")
+    return True
+
+
+@import_stage("convert_images")
+def convert_images(source_dir, project_file=None, image_dir=None, color_format=None, color_order="auto",
+                   max_error=None, analyze=False, manifest_file=None, rotation=0):
+    """
+    Converts the bitmaps of the .eez-project file and the PNG and JPEG files
+    of image_dir into ui_image_<name>.c files (lv_img_dsc_t img_<name>) in the
+    source directory. The pixels are stored in the color depth, byte order
+    (LV_COLOR_16_SWAP) and channel order LVGL draws with, so LVGL copies them
+    into the frame buffer without converting them. Images whose content and
+    settings didn't change are skipped without being decoded.
+
+    Fully opaque images are stored without alpha channel, and with max_error
+    an image is quantized to the smallest indexed format that stays within it.
+
+    Uses convert_ui_images, which needs NumPy and Pillow.
+
+    Args:
+        source_dir: Path to the UI source directory.
+        project_file: Path to the .eez-project file. Searched next to the source directory if None.
+        image_dir: Directory with PNG and JPEG files to convert as well, or None.
+        color_format: Color format of all images (see convert_ui_images.COLOR_FORMATS),
+            or None to use the format of every bitmap.
+        color_order: Channel order of the panel, 'auto', 'rgb' or 'bgr'.
+        max_error: Largest difference of a channel (0-255) quantizing an image
+            may cause, or None to never quantize.
+        analyze: Print the formats every image can be stored in, with flash
+            size and estimated draw time, before converting.
+        manifest_file: Format manifest written by advise_ui_images.py, or
+            None. Its formats replace those of the images it names.
+        rotation: Rotation of the screens in degrees. It must be the one
+            the screens in the source directory were generated with.
+
+    Returns:
+        bool: True if all images were converted, False otherwise.
+    """
+    import convert_ui_images
+    import generate_eez_ui
+
+    try:
+        convert_ui_images.load_image_libraries()
+    except ImportError as e:
+        print(f"\nERROR: {e}")
+        return False
+    if color_format is not None and convert_ui_images.color_format_name(color_format) is None:
+        print(f"\nERROR: Unknown image format '{color_format}'. Use one of {', '.join(convert_ui_images.COLOR_FORMATS)}.")
+        return False
+    if color_format is not None:
+        color_format = convert_ui_images.color_format_name(color_format)
+    screens_rotation = generate_eez_ui.generated_rotation(source_dir)
+    if screens_rotation is not None and screens_rotation != rotation:
+        print(f"\nERROR: The screens in '{source_dir}' are rotated by {screens_rotation} degrees and the images "
+              f"would be rotated by {rotation}. Generate the screens with the same ui_rotation.")
+        return False
+    if project_file is None:
+        project_file = find_project_file(source_dir)
+    images = []
+    if project_file is not None and os.path.isfile(project_file):
+        images += convert_ui_images.project_images(project_file)
+    if image_dir:
+        images += convert_ui_images.file_images([image_dir])
+    if not images and (project_file is None or not os.path.isfile(project_file)) and not image_dir:
+        print(f"\nERROR: No .eez-project file found for '{source_dir}' and no image directory set. Use --project or --image-dir.")
+        return False
+    color = convert_ui_images.lvgl_color_config(".", convert_ui_images.project_color_order(project_file, color_order))
+    target = convert_ui_images.draw_target(".")
+    manifest = None
+    if manifest_file:
+        try:
+            manifest = convert_ui_images.load_manifest(manifest_file)
+        except (OSError, ValueError) as e:
+            print(f"\nERROR: Could not load the image manifest: {e}")
+            return False
+        record_io(bytes_read=os.path.getsize(manifest_file))
+    if analyze:
+        convert_ui_images.print_analysis(convert_ui_images.analyze_images(images, color, max_error, target), target)
+    print(f"\nConverting {len(images)} images into '{source_dir}' ({convert_ui_images.describe_color(color)}).")
+    result = convert_ui_images.convert_images(images, source_dir, color, color_format, prune=True, writer=write_if_changed,
+                                              max_error=max_error, target=target, manifest=manifest, rotation=rotation)
+    record_io(touched=result["removed"])
+    convert_ui_images.print_conversion(result)
+    return not result["failed"]
+
+
+def strip_flow_sections(content):
+    """
+    Removes the code that is only compiled with EEZ Flow, i.e. the
+    #if defined(EEZ_FOR_LVGL) branches (and the #else branches of
+    #if !defined(EEZ_FOR_LVGL)) EEZ-Studio puts into every export.
+
+    Args:
+        content: Content of a C file.
+
+    Returns:
+        str: The content without the flow branches.
+    """
+    lines = []
+    # One entry per open #if: (kind of the condition, True while in a flow branch)
+    stack = []
+    for line in content.splitlines(keepends=True):
+        directive = re.match(r"\s*#\s*(if|ifdef|ifndef|elif|else|endif)\b", line)
+        if directive and directive.group(1).startswith("if"):
+            kind = "flow" if FLOW_CONDITIONAL_RE.match(line) else "no_flow" if NO_FLOW_CONDITIONAL_RE.match(line) else None
+            stack.append([kind, kind == "flow"])
+        elif directive and directive.group(1) in ("elif", "else") and stack:
+            stack[-1][1] = stack[-1][0] == "no_flow"
+        elif directive and directive.group(1) == "endif" and stack:
+            stack.pop()
+        elif not any(in_flow for _, in_flow in stack):
+            lines.append(line)
+    return "".join(lines)
+
+
+def detect_flow(project_dir=DEFAULT_PROJECT_DIR, project_file=None):
+    """
+    Finds out whether the UI uses EEZ Flow.
+
+    The UI uses flow if settings.general.flowSupport is set in the
+    .eez-project file, or if a UI source calls the flow API outside of the
+    #if defined(EEZ_FOR_LVGL) branches every export has.
+
+    Args:
+        project_dir: Path to the UI project directory.
+        project_file: Path to the .eez-project file, or None if unknown.
+
+    Returns:
+        tuple: (True if flow is used, reason for the decision)
+    """
+    flow_support = None
+    if project_file and os.path.isfile(project_file):
+        try:
+            with open(project_file, "r", encoding="utf-8") as f:
+                flow_support = bool(json.load(f).get("settings", {}).get("general", {}).get("flowSupport"))
+        except (OSError, ValueError):
+            print(f"WARNING: Could not read '{project_file}'.")
+    if flow_support:
+        return True, f"flowSupport is enabled in '{project_file}'"
+    for file in sorted(os.listdir(project_dir)):
+        if file in FLOW_SOURCE_FILES or not file.endswith((".c", ".h", ".cpp", ".hpp")):
+            continue
+        with open(os.path.join(project_dir, file), "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        record_io(bytes_read=len(content))
+        use = FLOW_API_RE.search(strip_flow_sections(content))
+        if use:
+            return True, f"{file} uses {use.group(0)}"
+    if flow_support is None:
+        return False, "no UI source uses the flow API"
+    return False, f"flowSupport is disabled in '{project_file}' and no UI source uses the flow API"
+
+
+def set_flow_build(cmake_content, enabled):
+    """
+    Adds or removes the CMakeLists.txt lines that leave eez-flow.cpp out of
+    the sources of the ui component.
+
+    Args:
+        cmake_content: Content of CMakeLists.txt.
+        enabled: True to build eez-flow.cpp, False to leave it out.
+
+    Returns:
+        str: The updated content.
+    """
+    cmake_content = FLOW_EXCLUDE_RE.sub("", cmake_content)
+    if enabled:
+        return cmake_content
+    # Sources listed by name, and sources gathered with file(GLOB)
+    cmake_content = re.sub(r'(?<=[\s(])"?eez-flow\.cpp"?(?=[\s)])[ \t]*', "", cmake_content)
+
+    def exclude(match):
+        newline = "\r\n" if match.group(0).endswith("\r\n") else "\n"
+        return (match.group(0).rstrip("\r\n") + newline + FLOW_EXCLUDE_MARKER + newline
+                + f'list(FILTER {match.group(1)} EXCLUDE REGEX "eez-flow\\\\.cpp$")' + newline)
+    return re.sub(r"^file\(GLOB (?:CONFIGURE_DEPENDS )?(\w+)\b.*\)(?:\r?\n|$)", exclude, cmake_content, flags=re.M)
+
+
+@import_stage("fix_flow")
+def fix_flow(project_dir=DEFAULT_PROJECT_DIR, source_dir=None, project_file=None, flow_support="auto"):
+    """
+    Only builds EEZ Flow if the UI uses it.
+
+    Without flow, eez-flow.cpp (about 390 KB of C++) is left out of the ui
+    component in CMakeLists.txt and eez-flow.h is replaced with the empty
+    template, so neither is compiled or linked. With flow, both are restored
+    from the source directory. A missing eez-flow.h is always created from the
+    template, so projects without eez-flow files compile.
+
+    Args:
+        project_dir: Path to the UI project directory.
+        source_dir: Path to the UI source directory, used to restore the flow files.
+        project_file: Path to the .eez-project file, searched next to
+            source_dir if None.
+        flow_support: 'auto' to detect it with detect_flow(), 'on' or 'off'
+            to force it.
+    """
+    flow_header = os.path.join(project_dir, "eez-flow.h")
+    with open(FLOW_HEADER_TEMPLATE, "rb") as f:
+        empty_header = f.read()
+    if project_file is None and source_dir is not None:
+        project_file = find_project_file(source_dir)
+    if flow_support == "auto":
+        enabled, reason = detect_flow(project_dir, project_file)
+    else:
+        enabled, reason = flow_support == "on", f"flow_support is '{flow_support}'"
+    print(f"\nEEZ Flow is {'used' if enabled else 'not used'} ({reason}).")
+
+    if enabled:
+        # Bring back the flow header of the export if an earlier import replaced it
+        source_header = os.path.join(source_dir, "eez-flow.h") if source_dir else None
+        if source_header and os.path.isfile(source_header) and os.path.isfile(flow_header):
+            with open(flow_header, "rb") as f:
+                replaced = f.read() == empty_header
+            if replaced:
+                with open(source_header, "rb") as f:
+                    write_if_changed(flow_header, f.read(), project_dir)
+                print("Restored eez-flow.h from the source directory.")
+    elif os.path.isfile(flow_header) or os.path.isfile(os.path.join(project_dir, "eez-flow.cpp")):
+        if write_if_changed(flow_header, empty_header, project_dir):
+            print("Replaced eez-flow.h with the empty template.")
+    if not os.path.exists(flow_header):
+        # If the file doesn't exist, copy it from the backup directory
+        print(f"Copying eez-flow.h template from backup to {project_dir}.")
+        write_if_changed(flow_header, empty_header, project_dir)
+
+    cmake_file = os.path.join(project_dir, "CMakeLists.txt")
+    if os.path.isfile(cmake_file):
+        with open(cmake_file, "r", encoding="utf-8", newline="") as f:
+            cmake_content = f.read()
+        if write_if_changed(cmake_file, set_flow_build(cmake_content, enabled), project_dir):
+            print(f"{'Added eez-flow.cpp to' if enabled else 'Removed eez-flow.cpp from'} the sources in {cmake_file}.")
+        
+        
+import configparser
+import os
+
+# Registry of fixup passes, run in registration order by run_fixups()
+FIXUP_PASSES = []
+
+def fixup_pass(name, matches, inputs=(), template=None):
+    """
+    Decorator that registers a function as a fixup pass.
+
+    A pass is a transform over the in-memory content of one file. run_fixups()
+    reads every file once, runs all selected passes that match it in sequence
+    and writes the result back at most once.
+
+    Args:
+        name: Name of the pass, used to select it and in the timing report.
+        matches: Function taking a path relative to the project directory and
+            returning True if the pass applies to that file.
+        inputs: Relative paths of files whose fixed content the pass needs.
+            They are processed first and handed to the pass in context["buffers"].
+        template: Optional (relative path, template path) pair. If the file is
+            missing but all inputs exist, it is created from the template.
+    """
+    def register(transform):
+        FIXUP_PASSES.append({
+            "name": name,
+            "matches": matches,
+            "inputs": tuple(inputs),
+            "template": template,
+            "transform": transform,
+        })
+        return transform
+    return register
+
+
+@fixup_pass("headers", lambda rel_path: rel_path.endswith((".h", ".c", ".cpp", ".hpp")))
+def fix_headers_pass(content, context):
+    """
+    Replaces "lvgl/lvgl.h" with "lvgl.h".
+    """
+    return content.replace("lvgl/lvgl.h", "lvgl.h")
+
+
+@fixup_pass("screens", lambda rel_path: rel_path == "screens.c" or re.fullmatch(r"screen_\w+\.c", rel_path))
+def fix_screens_pass(content, context):
+    """
+    Replaces all occurrences of 'lv_obj_create(0)' with 'lv_obj_create(NULL)'.
+    """
+    updated_content, count = re.subn(r'\blv_obj_create\s*\(\s*0\s*\)', 'lv_obj_create(NULL)', content)
+    if count > 0:
+        print(f"Updated {count} occurrence(s) of lv_obj_create(0) in '{context['rel_path']}'.")
+    return updated_content
+
+
+def read_preamble(f):
+    """
+    Reads the comments and preprocessor lines at the start of a source file,
+    up to its first line of code.
+
+    Args:
+        f: The open text file.
+
+    Returns:
+        tuple: (the lines read, True if one of them includes screens.h or ui.h)
+    """
+    lines = []
+    in_comment = False
+    for line in f:
+        lines.append(line)
+        if OBJECTS_HEADER_INCLUDE_RE.match(line):
+            return "".join(lines), True
+        stripped = line.strip()
+        if in_comment or stripped.startswith("/*"):
+            in_comment = "*/" not in (stripped if in_comment else stripped[2:])
+        elif not PREAMBLE_LINE_RE.match(line):
+            break
+    return "".join(lines), False
+
+
+def object_member_references(project_dir):
+    """
+    Finds the files that use each objects_t member.
+
+    Searches the UI sources in project_dir (actions.c, ui.c, the screen
+    files, ...) and the application sources in APP_SOURCE_DIRS that include
+    screens.h or ui.h. Files that include neither can't use objects_t and are
+    only read up to their first line of code. The flow sources
+    (FLOW_SOURCE_FILES) are skipped.
+
+    Args:
+        project_dir: Path to the UI project directory.
+
+    Returns:
+        dict: Member name -> set of paths of the files that use it, other
+            than to set it to the new widget or clear it. Paths of UI
+            sources are relative to project_dir.
+    """
+    sources = [(rel_path, os.path.join(project_dir, rel_path)) for rel_path in list_tree(project_dir)]
+    for app_dir in APP_SOURCE_DIRS:
+        if os.path.isdir(app_dir):
+            app_paths = [os.path.join(app_dir, rel_path) for rel_path in list_tree(app_dir)]
+            sources.extend((path, path) for path in app_paths)
+    references = {}
+    for name, path in sources:
+        if os.path.basename(path) in FLOW_SOURCE_FILES or not path.endswith((".c", ".h", ".cpp", ".hpp")):
+            continue
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            content, includes_objects = read_preamble(f)
+            if includes_objects:
+                content += f.read()
+        record_io(bytes_read=len(content))
+        if not includes_objects:
+            continue
+        for member in set(OBJECT_MEMBER_USE_RE.findall(content)):
+            references.setdefault(member, set()).add(name)
+    return references
+
+
+@fixup_pass("static_text", lambda rel_path: rel_path == "screens.c" or re.fullmatch(r"screen_\w+\.c", rel_path))
+def static_text_pass(content, context):
+    """
+    Replaces lv_label_set_text() and lv_checkbox_set_text() with a string
+    literal by their _static variant, so LVGL uses the literal in flash instead
+    of copying it into its heap.
+
+    Texts of widgets whose objects_t member is used anywhere else in the file,
+    e.g. by a variable binding in tick_screen_<name>(), or in any other UI or
+    application source, e.g. by lv_label_ins_text() in actions.c, are left
+    alone: LVGL ignores lv_label_ins_text() and lv_label_cut_text() on a
+    static text. In flow projects the flow can change the text of every
+    widget in objects_t, so only widgets without an objects_t member are
+    changed there.
+    """
+    if "object_references" not in context:
+        context["object_references"] = object_member_references(context["project_dir"])
+    if "getFlowState" in content:
+        used_members = set(OBJECT_MEMBER_RE.findall(content))
+    else:
+        used_members = set(OBJECT_MEMBER_USE_RE.findall(content))
+        used_members.update(member for member, files in context["object_references"].items()
+                            if files - {context["rel_path"]})
+
+    def make_static(code):
+        lines = code.splitlines(keepends=True)
+        members = {}
+        reclaimed = 0
+        for i, line in enumerate(lines):
+            widget = re.match(r"^([ \t]*)lv_obj_t \*obj = ", line)
+            if widget:
+                members[widget.group(1)] = None
+                continue
+            member = re.match(r"^([ \t]*)objects\.(\w+) = obj;", line)
+            if member:
+                members[member.group(1)] = member.group(2)
+                continue
+            text = STATIC_TEXT_RE.match(line)
+            if text and members.get(text.group(1)) not in used_members:
+                lines[i] = line.replace("_set_text(obj, ", "_set_text_static(obj, ", 1)
+                # The text and the terminating zero, in its own heap allocation
+                inner = re.sub(r"\\.", "x", text.group(3)[1:-1])
+                reclaimed += len(inner.encode("utf-8")) + 1 + HEAP_ALLOC_OVERHEAD
+        return "".join(lines), reclaimed
+
+    reclaimed_per_screen = {}
+    def replace_screen(match):
+        code, reclaimed = make_static(match.group(0))
+        if match.group(1) == "create" and reclaimed:
+            reclaimed_per_screen[match.group(2)] = reclaimed
+        return code
+    content = SCREEN_FUNCTION_RE.sub(replace_screen, content)
+
+    for screen, reclaimed in reclaimed_per_screen.items():
+        print(f"Static texts in create_screen_{screen}(): {reclaimed} bytes of LVGL heap reclaimed.")
+    if current_stage is not None and reclaimed_per_screen:
+        current_stage.setdefault("static_text", {}).update(reclaimed_per_screen)
+    return content
+
+
+@fixup_pass("actions", lambda rel_path: rel_path == "actions.c", inputs=("actions.h",),
+            template=("actions.c", "./backup/templates/actions.c"))
+def fix_actions_pass(content, context):
+    """
+    Appends a stub to actions.c for every extern function of actions.h that is
+    not implemented yet, with a TODO comment to implement the function.
+    """
+    header = context["buffers"].get("actions.h")
+    if header is None:
+        return content
+    # Find all extern functions in actions.h
+    extern_functions = re.findall(r"extern\s+void\s+(\w+)\s*\((.*?)\)\s*;", header)
+    # Find all existing functions in actions.c
+    existing_functions = {name for name, args in re.findall(r"void\s+(\w+)\s*\((.*?)\)\s*\{", content)}
+    print(f"Found {len(extern_functions)} extern functions in actions.h")
+    for name, args in extern_functions:
+        # Check if the function is not implemented in actions.c
+        if name in existing_functions:
+            print(f"Function {name} found in actions.c already. Skipping.")
+        else:
+            print(f"Adding extern function: {name}")
+            content += f"\nvoid {name}({args}) {{\n\t// TODO: implement {name}\n}}\n"
+    return content
+
+
+@import_stage("fixups")
+def run_fixups(project_dir, pass_names=None, only=None):
+    """
+    Runs the selected fixup passes over the UI files in a single pass.
+
+    Every file is read once, all matching passes transform its content in
+    registration order, and it is written back only if the content changed.
+    The time spent in each pass is reported at the end.
+
+    Args:
+        project_dir: Path to the UI project directory (./components/ui).
+        pass_names: Names of the passes to run. Runs all passes if None.
+        only: Only fix these paths (relative to project_dir), plus the files
+            of passes that take one of them as input. Fixes all files if None.
+
+    Returns:
+        list: Paths of the files that were written.
+    """
+    passes = [p for p in FIXUP_PASSES if pass_names is None or p["name"] in pass_names]
+    print(f"\nRunning fixups ({', '.join(p['name'] for p in passes)}) on '{project_dir}'.")
+    if not os.path.isdir(project_dir):
+        print(f"'{project_dir}' does not exist. Skipping.")
+        return []
+    # Passes that run only when enabled are transforms, sync_tree() undoes them when they are turned off
+    for p in passes:
+        if p["name"] not in DEFAULT_FIXUP_PASSES:
+            record_transform(project_dir, p["name"])
+
+    # Collect every file at least one pass applies to
+    rel_paths = set()
+    for rel_path in list_tree(project_dir):
+        matching = [p for p in passes if p["matches"](rel_path)]
+        if only is not None:
+            matching = [p for p in matching if rel_path in only or set(p["inputs"]) & set(only)]
+        if matching:
+            rel_paths.add(rel_path)
+
+    # Inputs of a pass are read even if no selected pass transforms them
+    input_paths = {i for p in passes for i in p["inputs"]}
+    rel_paths.update(i for i in input_paths if os.path.isfile(os.path.join(project_dir, i)))
+
+    # Files that are missing but can be created from a template
+    templates = {}
+    for p in passes:
+        if p["template"] is None:
+            continue
+        rel_path, template_path = p["template"]
+        inputs_exist = all(os.path.isfile(os.path.join(project_dir, i)) for i in p["inputs"])
+        wanted = only is None or rel_path in only or set(p["inputs"]) & set(only)
+        if rel_path not in rel_paths and inputs_exist and wanted:
+            templates[rel_path] = template_path
+            rel_paths.add(rel_path)
+
+    # Files needed as inputs by other passes are processed first
+    ordered_paths = sorted(rel_paths, key=lambda rel_path: (rel_path not in input_paths, rel_path))
+
+    context = {"project_dir": project_dir, "buffers": {}}
+    timings = {p["name"]: 0.0 for p in passes}
+    written_files = []
+    for rel_path in ordered_paths:
+        file_path = os.path.join(project_dir, rel_path)
+        if rel_path in templates:
+            print(f"{rel_path} not found. Creating it from {templates[rel_path]}")
+            original_content = None
+            if os.path.isfile(templates[rel_path]):
+                with open(templates[rel_path], "r", encoding="utf-8", newline="") as f:
+                    content = f.read()
+            else:
+                print(f"{templates[rel_path]} not found. Skipping template copy.")
+                content = ""
+        else:
+            with open(file_path, "r", encoding="utf-8", newline="") as f:
+                original_content = content = f.read()
+            record_io(bytes_read=os.path.getsize(file_path))
+
+        # Run every matching pass over the in-memory buffer
+        context["rel_path"] = rel_path
+        for p in passes:
+            if p["matches"](rel_path):
+                start = time.perf_counter()
+                content = p["transform"](content, context)
+                timings[p["name"]] += time.perf_counter() - start
+
+        if rel_path in input_paths:
+            context["buffers"][rel_path] = content
+
+        # Write the file at most once, and only if it changed
+        if content != original_content:
+            if write_if_changed(file_path, content, project_dir):
+                print(f"Updated '{file_path}'")
+                written_files.append(file_path)
+        else:
+            record_io(skipped=1)
+
+    if current_stage is not None:
+        current_stage["passes"] = timings
+    print(f"Total files read: {len(ordered_paths) - len(templates)}, updated: {len(written_files)}")
+    for name, elapsed in timings.items():
+        print(f"  {name:<10} {elapsed * 1000:8.2f} ms")
+    return written_files
+
+
+@import_stage("fix_headers")
+def fix_headers(project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Replaces "lvgl/lvgl.h" with "lvgl.h" in all UI files.
+
+    Args:
+        project_dir: Path to the UI project directory.
+    """
+    run_fixups(project_dir, ["headers"])
+
+
+@import_stage("fix_screens")
+def fix_screens(project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Replaces all occurrences of 'lv_obj_create(0)' with 'lv_obj_create(NULL)' in screens.c.
+
+    Args:
+        project_dir: Path to the UI project directory.
+    """
+    run_fixups(project_dir, ["screens"])
+
+
+@import_stage("fix_actions")
+def fix_actions(project_dir=DEFAULT_PROJECT_DIR):
+    """
+    This function searches for extern functions in actions.h and if the function is not
+    implemented in actions.c, it adds the function to actions.c with a TODO comment to
+    implement the function.
+
+    Args:
+        project_dir: Path to the UI project directory.
+    """
+    run_fixups(project_dir, ["actions"])
+
+@import_stage("fix_cmake")
+def fix_cmake(project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Verifies the existence of CMakeLists.txt and replaces it with a default if missing.
+
+    This function checks if the CMakeLists.txt file exists in the specified directory.
+    If the file is absent, it copies a default version from the backup directory to ensure
+    that the project can be successfully built. This step is necessary as the CMakeLists.txt
+    file is not generated automatically during project creation.
+
+    Args:
+        project_dir: Path to the UI project directory.
+    """
+    cmake_file = os.path.join(project_dir, "CMakeLists.txt")
+    # Check if CMakeLists.txt exists at the specified path
+    if os.path.exists(cmake_file):
+        # Print a message indicating the file exists and will be used
+        print(f"\nCMakeLists.txt found.\nUsing existing {cmake_file}")
+        record_io(skipped=1)
+    else:
+        # Print a message indicating the file is missing and will be replaced
+        print(f"\n{cmake_file} missing. Replacing it with the default")
+        # Copy the default CMakeLists.txt from the backup directory to the specified path
+        with open(CMAKE_TEMPLATE, "rb") as f:
+            write_if_changed(cmake_file, f.read(), project_dir)
+
+
+def screen_source_files(project_dir):
+    """
+    Lists the files of a UI project directory that contain screen functions.
+
+    Args:
+        project_dir: Path to the UI project directory.
+
+    Returns:
+        list: screens.c and the screen_<name>.c files of split_screens(), as
+            names relative to project_dir.
+    """
+    split_files = sorted(f for f in os.listdir(project_dir) if re.fullmatch(r"screen_\w+\.c", f))
+    return ["screens.c"] + split_files
+
+
+def is_split_screen_file(file_path):
+    """
+    Checks whether a screen_<name>.c file was written by split_screens().
+
+    Args:
+        file_path: Path of the file.
+
+    Returns:
+        bool: True if the file starts with SPLIT_SCREEN_MARKER.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.readline().rstrip("\r\n") == SPLIT_SCREEN_MARKER
+
+
+@import_stage("split_screens")
+def split_screens(project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Moves the create_screen_<name>() and tick_screen_<name>() functions of
+    screens.c into one screen_<name>.c file per screen.
+
+    screens.c keeps objects_t, create_screens() and tick_screen(), so every
+    screen shares the same objects. ninja compiles the screen files in parallel
+    and only recompiles the screens that changed. Screen files of screens that
+    no longer exist are deleted, and the glob of CMakeLists.txt is set to
+    CONFIGURE_DEPENDS so CMake picks up added and removed screen files.
+
+    Args:
+        project_dir: Path to the UI project directory.
+
+    Returns:
+        list: Paths of the files that were written.
+    """
+    screens_file = os.path.join(project_dir, "screens.c")
+    print(f"\nSplitting '{screens_file}' into one file per screen.")
+    record_transform(project_dir, "split_screens")
+    if not os.path.isfile(screens_file):
+        print(f"'{screens_file}' does not exist. Skipping.")
+        return []
+    with open(screens_file, "r", encoding="utf-8", newline="") as f:
+        content = f.read()
+    record_io(bytes_read=len(content))
+
+    functions = list(SCREEN_FUNCTION_RE.finditer(content))
+    if not functions:
+        print("screens.c is already split.")
+        record_io(skipped=1)
+        return []
+    if re.search(r"^static\b", content, re.M):
+        print("screens.c has static definitions the screen files can't share. Skipping.")
+        return []
+
+    # Everything the screen files need from the top of screens.c
+    include_lines = re.findall(r"^#include .*?(?=\r?$)", content[:functions[0].start()], re.M)
+    includes = "".join(line + "\n" for line in dict.fromkeys(include_lines))
+    remaining = SCREEN_FUNCTION_RE.sub("", content)
+    # Other functions of screens.c (e.g. user widgets) the screens may call
+    prototypes = {name: signature + ";" for signature, name in SHARED_FUNCTION_RE.findall(remaining)}
+
+    screens = {}
+    for match in functions:
+        screens.setdefault(match.group(2), []).append(match.group(0).rstrip() + "\n")
+
+    written_files = []
+    split_files = set()
+    for name, bodies in screens.items():
+        code = "\n".join(bodies)
+        used_prototypes = [p for f, p in prototypes.items() if re.search(rf"\b{f}\b", code)]
+        split_file = f"screen_{name}.c"
+        split_files.add(split_file)
+        split_content = (
+            SPLIT_SCREEN_MARKER + "\n" + includes + "\n"
+            + "extern lv_obj_t *tick_value_change_obj;\n"
+            + "".join(p + "\n" for p in used_prototypes)
+            + "\n" + code
+        )
+        if write_if_changed(os.path.join(project_dir, split_file), split_content):
+            written_files.append(os.path.join(project_dir, split_file))
+    if write_if_changed(screens_file, remaining, project_dir):
+        written_files.append(screens_file)
+
+    # Delete the files of screens that were removed
+    for file in sorted(os.listdir(project_dir)):
+        if re.fullmatch(r"screen_\w+\.c", file) and file not in split_files:
+            file_path = os.path.join(project_dir, file)
+            if is_split_screen_file(file_path):
+                os.remove(file_path)
+                print(f"Removed '{file_path}' of a deleted screen.")
+
+    # Make CMake re-glob the sources when screen files are added or removed
+    cmake_file = os.path.join(project_dir, "CMakeLists.txt")
+    if os.path.isfile(cmake_file):
+        with open(cmake_file, "r", encoding="utf-8", newline="") as f:
+            cmake_content = f.read()
+        cmake_content = re.sub(r"file\(GLOB (\w+)\b(?! CONFIGURE_DEPENDS)", r"file(GLOB \1 CONFIGURE_DEPENDS", cmake_content)
+        if write_if_changed(cmake_file, cmake_content, project_dir):
+            written_files.append(cmake_file)
+
+    print(f"Split screens.c into {len(screens)} screen files, {len(written_files)} files updated.")
+    return written_files
+
+
+@import_stage("unsplit_screens")
+def unsplit_screens(source_dir, project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Deletes the screen_<name>.c files of split_screens() when split screens
+    are turned off.
+
+    Otherwise they would define every create_screen_<name>() and
+    tick_screen_<name>() a second time next to the fresh screens.c. screens.c
+    and screens.h are restored from the source directory, in case the copy
+    didn't replace the split screens.c. Run it right after copy_ui().
+
+    Args:
+        source_dir: Path to the UI source directory.
+        project_dir: Path to the UI project directory.
+
+    Returns:
+        list: Paths of the files that were deleted or written.
+    """
+    if not os.path.isdir(project_dir):
+        return []
+    split_files = [os.path.join(project_dir, file) for file in screen_source_files(project_dir)[1:]]
+    split_files = [file_path for file_path in split_files if is_split_screen_file(file_path)]
+    if not split_files:
+        record_io(skipped=1)
+        return []
+    print(f"\nSplit screens are off, removing {len(split_files)} screen file(s) from '{project_dir}'.")
+    changed_files = []
+    for file_path in split_files:
+        os.remove(file_path)
+        record_io(touched=1)
+        changed_files.append(file_path)
+    for name in ("screens.c", "screens.h"):
+        source_file = os.path.join(source_dir, name)
+        if os.path.isfile(source_file):
+            with open(source_file, "rb") as f:
+                content = f.read()
+            record_io(bytes_read=len(content))
+            if write_if_changed(os.path.join(project_dir, name), content, project_dir):
+                changed_files.append(os.path.join(project_dir, name))
+    print(f"Removed the split screen files, {len(changed_files)} files changed. Run a Full Clean so CMake forgets them.")
+    return changed_files
+
+
+@import_stage("lazy_screens")
+def lazy_screens(project_dir=DEFAULT_PROJECT_DIR, resident=DEFAULT_RESIDENT_SCREENS):
+    """
+    Changes the UI so every screen is created the first time it is loaded,
+    instead of all screens at ui_init().
+
+    loadScreen() creates a screen that doesn't exist yet and ui_tick() deletes
+    the least recently used screens when more than 'resident' exist. The shown
+    screen and the screen a load animation still draws are never deleted. When
+    a screen is deleted, the objects_t members of the screen and its widgets
+    are set to NULL. UI_RESIDENT_SCREENS in screens.h can also be overridden with
+    a compile definition.
+
+    Works on split and unsplit screens.c, so run it after split_screens().
+
+    Args:
+        project_dir: Path to the UI project directory.
+        resident: Number of screens kept in LVGL's heap.
+
+    Returns:
+        list: Paths of the files that were written.
+    """
+    print(f"\nMaking the screens in '{project_dir}' lazy, keeping at most {resident} screen(s).")
+    record_transform(project_dir, "lazy_screens", resident)
+    paths = {name: os.path.join(project_dir, name) for name in ("screens.c", "screens.h", "ui.c")}
+    missing = [path for path in paths.values() if not os.path.isfile(path)]
+    if missing:
+        print(f"{', '.join(missing)} not found. Skipping.")
+        return []
+    contents = {}
+    for name, path in paths.items():
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            contents[name] = f.read()
+        record_io(bytes_read=len(contents[name]))
+
+    # Screens in ScreensEnum order, and the objects_t members each one sets
+    screens = re.findall(r"^\s*tick_screen_(\w+),", contents["screens.c"], re.M)
+    if not screens:
+        print("No tick_screen_funcs table found in screens.c. Skipping.")
+        return []
+    screen_objects = {}
+    for file in screen_source_files(project_dir):
+        if file == "screens.c":
+            code = contents[file]
+        else:
+            with open(os.path.join(project_dir, file), "r", encoding="utf-8", newline="") as f:
+                code = f.read()
+        for match in SCREEN_FUNCTION_RE.finditer(code):
+            if match.group(1) == "create":
+                screen_objects[match.group(2)] = re.findall(r"objects\.(\w+) = obj;", match.group(0))
+    missing_screens = [screen for screen in screens if screen not in screen_objects]
+    if missing_screens:
+        print(f"create_screen_{missing_screens[0]}() not found. Skipping.")
+        return []
+
+    updated = dict(contents)
+    if LAZY_SCREENS_MARKER not in contents["screens.c"]:
+        # create_screens() only sets up the theme, loadScreen() creates the screens
+        screens_c = re.sub(r"^    create_screen_\w+\(\);\r?\n", "", contents["screens.c"], flags=re.M)
+        clear_funcs = "".join(
+            f"void clear_screen_objects_{screen}() {{\n"
+            + "".join(f"    objects.{member} = 0;\n" for member in screen_objects[screen])
+            + "}\n\n"
+            for screen in screens
+        )
+        updated["screens.c"] = screens_c + LAZY_SCREENS_CODE.format(
+            marker=LAZY_SCREENS_MARKER,
+            create_funcs="".join(f"    create_screen_{screen},\n" for screen in screens),
+            clear_funcs=clear_funcs,
+            clear_table="".join(f"    clear_screen_objects_{screen},\n" for screen in screens),
+        )
+
+    resident_define = f"#ifndef UI_RESIDENT_SCREENS\n#define UI_RESIDENT_SCREENS {resident}\n#endif\n"
+    if "UI_RESIDENT_SCREENS" in contents["screens.h"]:
+        updated["screens.h"] = re.sub(r"#define UI_RESIDENT_SCREENS \d+", f"#define UI_RESIDENT_SCREENS {resident}", contents["screens.h"])
+    else:
+        updated["screens.h"] = re.sub(
+            r"(void tick_screen\(int screen_index\);\r?\n)",
+            lambda match: match.group(1) + "\n" + resident_define + "\n"
+            + "lv_obj_t *get_screen(int screen_index);\nvoid evict_screens(int current_screen_index);\n",
+            contents["screens.h"], count=1)
+
+    if "evict_screens" not in contents["ui.c"]:
+        ui_c = contents["ui.c"].replace("lv_obj_t *screen = getLvglObjectFromIndex(currentScreen);",
+                                        "lv_obj_t *screen = get_screen(currentScreen);")
+        updated["ui.c"] = re.sub(r"^([ \t]*)tick_screen\(currentScreen\);",
+                                 r"\1evict_screens(currentScreen);\n\1tick_screen(currentScreen);", ui_c, flags=re.M)
+        if "get_screen(currentScreen)" not in updated["ui.c"]:
+            print("loadScreen() not found in ui.c. Skipping.")
+            return []
+
+    written_files = []
+    for name, path in paths.items():
+        if updated[name] != contents[name] and write_if_changed(path, updated[name], project_dir):
+            written_files.append(path)
+        elif updated[name] == contents[name]:
+            record_io(skipped=1)
+    print(f"Lazy screens for {len(screens)} screen(s), {len(written_files)} files updated.")
+    return written_files
+
+
+@import_stage("unlazy_screens")
+def unlazy_screens(source_dir, project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Restores screens.c, screens.h and ui.c from the source directory when
+    lazy screens are turned off but the project still has the code of
+    lazy_screens().
+
+    A ui.c that calls get_screen() and evict_screens() next to a fresh
+    screens.c without them doesn't link. Run it right after copy_ui().
+
+    Args:
+        source_dir: Path to the UI source directory.
+        project_dir: Path to the UI project directory.
+
+    Returns:
+        list: Paths of the files that were written.
+    """
+    markers = {"screens.c": LAZY_SCREENS_MARKER, "screens.h": "UI_RESIDENT_SCREENS", "ui.c": "evict_screens("}
+    lazy = False
+    for name, marker in markers.items():
+        file_path = os.path.join(project_dir, name)
+        if os.path.isfile(file_path):
+            with open(file_path, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+            record_io(bytes_read=len(content))
+            lazy = lazy or marker in content
+    if not lazy:
+        record_io(skipped=1)
+        return []
+    print(f"\nLazy screens are off, restoring {', '.join(markers)} in '{project_dir}' from '{source_dir}'.")
+    written_files = []
+    for name in markers:
+        source_file = os.path.join(source_dir, name)
+        if not os.path.isfile(source_file):
+            print(f"'{source_file}' not found. Skipping.")
+            continue
+        with open(source_file, "rb") as f:
+            content = f.read()
+        record_io(bytes_read=len(content))
+        if write_if_changed(os.path.join(project_dir, name), content, project_dir):
+            written_files.append(os.path.join(project_dir, name))
+    print(f"Removed the lazy screens, {len(written_files)} files updated.")
+    return written_files
+
+
+def const_style_value(value):
+    """
+    Returns the constant initializer of a local style value.
+
+    Args:
+        value: C expression of the value in an lv_obj_set_style_*() call.
+
+    Returns:
+        str: The initializer for an LV_STYLE_CONST_* property, or None if the
+            value is only known at run time.
+    """
+    if value.startswith(RUNTIME_STYLE_VALUES):
+        return None
+    color = re.fullmatch(r"lv_color_hex\(0x(?:[0-9a-fA-F]{2})?([0-9a-fA-F]{2})([0-9a-fA-F]{2})([0-9a-fA-F]{2})\)", value)
+    if color:
+        return f"LV_COLOR_MAKE(0x{color.group(1)}, 0x{color.group(2)}, 0x{color.group(3)})"
+    if re.fullmatch(r"-?\d+|true|false|LV_[A-Z0-9_]+|LV_PCT\(-?\d+\)|&\w+", value):
+        return value
+    return None
+
+
+def hoisted_style_code(name, props):
+    """
+    Generates the definition and declaration of a shared style.
+
+    Styles whose properties and values are all known at compile time become
+    LV_STYLE_CONST_INIT styles in flash. The others are initialized the first
+    time they are used.
+
+    Args:
+        name: Name of the style.
+        props: (property, value) pairs of the style.
+
+    Returns:
+        tuple: (definition, declaration, C expression of the lv_style_t pointer)
+    """
+    const_values = [const_style_value(value) for prop, value in props]
+    is_const = all(const_values) and not any(
+        prop in COMPOSITE_STYLE_PROPERTIES or prop.startswith(RUNTIME_STYLE_PREFIXES) for prop, value in props)
+    if is_const:
+        definition = (
+            f"// {name}\n"
+            f"static const lv_style_const_prop_t {name}_props[] = {{\n"
+            + "".join(f"    LV_STYLE_CONST_{prop.upper()}({value}),\n" for (prop, v), value in zip(props, const_values))
+            + "    { .prop = LV_STYLE_PROP_INV },\n"
+            "};\n"
+            f"LV_STYLE_CONST_INIT({name}, {name}_props);\n"
+        )
+        return definition, f"extern const lv_style_t {name};", f"(lv_style_t *)&{name}"
+    definition = (
+        f"// {name}\n"
+        f"lv_style_t *get_{name}() {{\n"
+        "    static lv_style_t style;\n"
+        "    static bool initialized;\n"
+        "    if (!initialized) {\n"
+        "        lv_style_init(&style);\n"
+        + "".join(f"        lv_style_set_{prop}(&style, {value});\n" for prop, value in props)
+        + "        initialized = true;\n"
+        "    }\n"
+        "    return &style;\n"
+        "}\n"
+    )
+    return definition, f"lv_style_t *get_{name}();", f"get_{name}()"
+
+
+def hoisting_savings(props, uses, is_const):
+    """
+    Estimates the memory saved by replacing the local styles of some objects
+    with one shared style.
+
+    Args:
+        props: (property, value) pairs of the style.
+        uses: Number of objects using the style.
+        is_const: True if the style is an LV_STYLE_CONST_INIT style.
+
+    Returns:
+        tuple: (LVGL heap bytes saved, flash bytes saved). Negative if it costs memory.
+    """
+    prop_storage = STYLE_PROP_SIZE * len(props) + HEAP_ALLOC_OVERHEAD if len(props) > 1 else 0
+    local_heap = STYLE_SIZE + HEAP_ALLOC_OVERHEAD + prop_storage
+    heap_saved = uses * local_heap - (0 if is_const else prop_storage)
+    code_saved = uses * (len(props) - 1) * STYLE_CALL_SIZE
+    if is_const:
+        flash_added = STYLE_SIZE + STYLE_CONST_PROP_SIZE * (len(props) + 1)
+    else:
+        flash_added = STYLE_CALL_SIZE * (len(props) + 2)
+    return heap_saved, code_saved - flash_added
+
+
+@import_stage("hoist_styles")
+def hoist_styles(project_dir=DEFAULT_PROJECT_DIR, min_uses=HOIST_MIN_USES):
+    """
+    Replaces identical groups of local style calls with one shared style.
+
+    EEZ-Studio sets local styles with lv_obj_set_style_*(), and LVGL allocates
+    a local lv_style_t for every object and part/state that has one. A group
+    of calls with the same properties, values and part/state that at least
+    min_uses objects share is moved into styles.c as one style, and the calls
+    are replaced with lv_obj_add_style(). Styles with only compile time
+    constants are LV_STYLE_CONST_INIT styles in flash. The estimated heap and
+    flash savings are printed and added to the import report.
+
+    Run it before split_screens(), so the split screen files stay unchanged when
+    their screen didn't change.
+
+    Args:
+        project_dir: Path to the UI project directory.
+        min_uses: Number of objects that must share a group to hoist it.
+
+    Returns:
+        list: Paths of the files that were written.
+    """
+    print(f"\nHoisting shared local styles in '{project_dir}'.")
+    record_transform(project_dir, "hoist_styles")
+    styles_c = os.path.join(project_dir, "styles.c")
+    styles_h = os.path.join(project_dir, "styles.h")
+    if not os.path.isfile(styles_c) or not os.path.isfile(styles_h):
+        print(f"'{styles_c}' or '{styles_h}' not found. Skipping.")
+        return []
+    contents = {}
+    for file in screen_source_files(project_dir) + ["styles.c", "styles.h"]:
+        file_path = os.path.join(project_dir, file)
+        if os.path.isfile(file_path):
+            with open(file_path, "r", encoding="utf-8", newline="") as f:
+                contents[file] = f.read()
+            record_io(bytes_read=len(contents[file]))
+
+    # Find the runs of local style calls on one object, grouped by part/state
+    runs = {}
+    uses = {}
+    for file in contents:
+        if file in ("styles.c", "styles.h"):
+            continue
+        lines = contents[file].splitlines(keepends=True)
+        file_runs = []
+        i = 0
+        while i < len(lines):
+            match = LOCAL_STYLE_RE.match(lines[i])
+            if match is None:
+                i += 1
+                continue
+            start, indent, groups = i, match.group(1), {}
+            while i < len(lines):
+                match = LOCAL_STYLE_RE.match(lines[i])
+                if match is None or match.group(1) != indent:
+                    break
+                groups.setdefault(match.group(4), []).append((match.group(2), match.group(3)))
+                i += 1
+            groups = [(selector, tuple(props)) for selector, props in groups.items()]
+            file_runs.append((start, i, indent, groups))
+            for group in groups:
+                uses[group] = uses.get(group, 0) + 1
+        runs[file] = (lines, file_runs)
+
+    hoisted = {}
+    for group, count in uses.items():
+        if count >= min_uses:
+            name = "style_local_" + hashlib.sha256(repr(group).encode("utf-8")).hexdigest()[:8]
+            hoisted[group] = (name,) + hoisted_style_code(name, group[1])
+
+    # Replace the hoisted groups with lv_obj_add_style()
+    updated = dict(contents)
+    for file, (lines, file_runs) in runs.items():
+        for start, end, indent, groups in reversed(file_runs):
+            newline = "\r\n" if lines[start].endswith("\r\n") else "\n"
+            replacement = []
+            for selector, props in groups:
+                if (selector, props) in hoisted:
+                    reference = hoisted[(selector, props)][3]
+                    replacement.append(f"{indent}lv_obj_add_style(obj, {reference}, {selector});{newline}")
+                else:
+                    replacement += [f"{indent}lv_obj_set_style_{prop}(obj, {value}, {selector});{newline}" for prop, value in props]
+            lines[start:end] = replacement
+        updated[file] = "".join(lines)
+
+    # Shared styles of earlier imports stay as long as a screen file uses them
+    section = updated["styles.c"].split(HOISTED_STYLES_MARKER, 1)
+    blocks = {}
+    if len(section) == 2:
+        for block in re.findall(r"^// style_local_\w+\r?\n.*?(?=^// style_local_|\Z)", section[1], re.M | re.S):
+            blocks[block.split()[1]] = block.rstrip() + "\n"
+    declarations = {name: line for line, name in re.findall(
+        r"^((?:extern const lv_style_t |lv_style_t \*get_)(style_local_\w+?)(?:\(\))?;)\r?$", updated["styles.h"], re.M)}
+    for name, definition, declaration, reference in hoisted.values():
+        blocks[name] = definition
+        declarations[name] = declaration
+    used = set(re.findall(r"\b(?:get_)?(style_local_[0-9a-f]{8})\b", "".join(updated[f] for f in runs)))
+    names = sorted(name for name in blocks if name in used)
+
+    styles_c_content = section[0].rstrip("\r\n") + "\n"
+    styles_h_content = re.sub(rf"{re.escape(HOISTED_STYLES_MARKER)}\r?\n(?:.*style_local_.*\r?\n)*\r?\n?", "", updated["styles.h"])
+    if names:
+        styles_c_content += f"\n{HOISTED_STYLES_MARKER}\n\n" + "\n".join(blocks[name] for name in names)
+        header_section = f"{HOISTED_STYLES_MARKER}\n" + "".join(declarations[name] + "\n" for name in names) + "\n"
+        position = styles_h_content.rfind("#ifdef __cplusplus")
+        styles_h_content = styles_h_content[:position] + header_section + styles_h_content[position:]
+    elif len(section) == 1:
+        styles_c_content = updated["styles.c"]
+    updated["styles.c"] = styles_c_content
+    updated["styles.h"] = styles_h_content
+
+    written_files = []
+    for file, content in updated.items():
+        if content != contents[file]:
+            if write_if_changed(os.path.join(project_dir, file), content, project_dir):
+                written_files.append(os.path.join(project_dir, file))
+        else:
+            record_io(skipped=1)
+
+    # Report what the hoisted styles save
+    total_heap = total_flash = 0
+    report = []
+    for (selector, props), (name, definition, declaration, reference) in sorted(hoisted.items(), key=lambda item: item[1][0]):
+        is_const = declaration.startswith("extern const")
+        heap_saved, flash_saved = hoisting_savings(props, uses[(selector, props)], is_const)
+        total_heap += heap_saved
+        total_flash += flash_saved
+        report.append({"style": name, "const": is_const, "props": len(props), "uses": uses[(selector, props)],
+                       "selector": selector, "heap_saved": heap_saved, "flash_saved": flash_saved})
+        print(f"  {name}  {'const' if is_const else 'runtime':<7} {len(props):>2} props  {uses[(selector, props)]:>4} objects  "
+              f"heap {heap_saved:>+6} B  flash {flash_saved:>+6} B  {selector}")
+    print(f"Hoisted {len(hoisted)} local style group(s) into shared styles. "
+          f"Estimated savings: {total_heap} bytes of LVGL heap, {total_flash} bytes of flash.")
+    if current_stage is not None:
+        current_stage["hoisted_styles"] = report
+    return written_files
+
+
+def add_include(content, include):
+    """
+    Adds an #include line after the last unconditional #include in front of
+    the first screen function (or of the whole file if it has none).
+
+    Args:
+        content: Content of the C file.
+        include: The #include line.
+
+    Returns:
+        str: The content with the include.
+    """
+    if include in content:
+        return content
+    first = SCREEN_FUNCTION_RE.search(content)
+    head = content[:first.start()] if first else content
+    includes = []
+    depth = 0
+    for directive in re.finditer(r"^#\s*(if|ifdef|ifndef|endif|include)\b.*?(\r?\n)", head, re.M):
+        if directive.group(1).startswith("if"):
+            depth += 1
+        elif directive.group(1) == "endif":
+            depth -= 1
+        elif depth == 0:
+            includes.append(directive)
+    if not includes:
+        return include + "\n" + content
+    last = includes[-1]
+    return content[:last.end()] + include + last.group(2) + content[last.end():]
+
+
+def wrap_function(code, begin, end):
+    """
+    Adds a line at the start and one at the end of a C function.
+
+    Args:
+        code: The function, from its signature to its closing brace.
+        begin: Line added after the opening brace.
+        end: Line added before the closing brace.
+
+    Returns:
+        str: The wrapped function.
+    """
+    newline = "\r\n" if "\r\n" in code else "\n"
+    start = code.index("{") + 1 + len(newline)
+    close = code.rindex("}")
+    return code[:start] + f"    {begin}{newline}" + code[start:close] + f"    {end}{newline}" + code[close:]
+
+
+@import_stage("profile")
+def profile_screens(project_dir=DEFAULT_PROJECT_DIR):
+    """
+    Adds timing probes around the body of every create_screen_<name>(),
+    tick_screen_<name>() and ui_init().
+
+    The probes are macros of ui_probe.h, which is written to project_dir. They
+    use esp_timer_get_time() and the free heap on the device, and
+    clock_gettime() and lv_mem_monitor() on a host, and print lines that
+    parse_ui_probes.py turns into per-screen tables. Run it before
+    split_screens(), so the screen files get the include.
+
+    Args:
+        project_dir: Path to the UI project directory.
+
+    Returns:
+        list: Paths of the files that were written.
+    """
+    print(f"\nAdding timing probes to the screens in '{project_dir}'.")
+    record_transform(project_dir, "profile")
+    written_files = []
+    probed_functions = 0
+    header_file = os.path.join(project_dir, PROBE_HEADER_FILE)
+    if write_if_changed(header_file, PROBE_HEADER):
+        written_files.append(header_file)
+
+    def probe(match):
+        nonlocal probed_functions
+        code = match.group(0)
+        if "UI_PROBE_" in code:
+            return code
+        probed_functions += 1
+        kind, name = match.group(1), match.group(2)
+        if kind == "create":
+            body = wrap_function(code[:code.rindex("}") + 1], "UI_PROBE_BEGIN(ui_probe);",
+                                 f'UI_PROBE_END(ui_probe, "create", "{name}");')
+        else:
+            body = wrap_function(code[:code.rindex("}") + 1], "UI_PROBE_TICK_BEGIN(ui_probe);",
+                                 f'UI_PROBE_TICK_END(ui_probe, "{name}");')
+        return body + code[code.rindex("}") + 1:]
+
+    for file in screen_source_files(project_dir) + ["ui.c"]:
+        file_path = os.path.join(project_dir, file)
+        if not os.path.isfile(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            content = f.read()
+        record_io(bytes_read=len(content))
+        if file == "ui.c":
+            updated = UI_INIT_RE.sub(
+                lambda match: match.group(0) if "UI_PROBE_" in match.group(0) else wrap_function(
+                    match.group(0), "UI_PROBE_BEGIN(ui_probe);", 'UI_PROBE_END(ui_probe, "init", "ui_init");'),
+                content)
+        else:
+            updated = SCREEN_FUNCTION_RE.sub(probe, content)
+        if "UI_PROBE_" in updated:
+            updated = add_include(updated, PROBE_INCLUDE)
+        if updated != content:
+            if write_if_changed(file_path, updated, project_dir):
+                written_files.append(file_path)
+        else:
+            record_io(skipped=1)
+    print(f"Added timing probes to {probed_functions} screen function(s), {len(written_files)} files updated.")
+    return written_files
+
+
+@import_stage("estimate_memory")
+def estimate_screen_memory(project_dir=DEFAULT_PROJECT_DIR, resident=0, budget=None):
+    """
+    Estimates the LVGL heap every screen uses and compares the peak with
+    LV_MEM_SIZE of the project, or with budget.
+
+    Uses estimate_ui_memory, which counts the widgets, local styles, texts and
+    event callbacks of every create_screen_<name>() function.
+
+    Args:
+        project_dir: Path to the UI project directory.
+        resident: Number of resident screens of lazy screens, 0 if every
+            screen is created at ui_init().
+        budget: Heap in KB the screens may use, or None to use LV_MEM_SIZE.
+
+    Returns:
+        bool: False if the screens need more heap than the budget, True otherwise.
+    """
+    import estimate_ui_memory
+
+    print(f"\nEstimating the LVGL heap of the screens in '{project_dir}'.")
+    estimate = estimate_ui_memory.estimate_memory(project_dir, resident)
+    return estimate_ui_memory.print_estimate(estimate, budget * 1024 if budget is not None else None)
+
+
+def start_inotify(directory):
+    """
+    Starts watching a directory tree with inotify.
+
+    Only available on Linux. Uses libc through ctypes so no extra package is
+    needed.
+
+    Args:
+        directory: Directory to watch, including its subdirectories.
+
+    Returns:
+        dict: Watcher state (libc, fd, directory and watch descriptor to
+        directory map), or None if inotify is not available.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    watcher = {"libc": libc, "fd": fd, "directory": directory, "watches": {}}
+    for root, dirs, files in os.walk(directory):
+        add_inotify_watch(watcher, root)
+    return watcher
+
+
+def add_inotify_watch(watcher, path):
+    """
+    Adds an inotify watch for a single directory.
+
+    Args:
+        watcher: Watcher state returned by start_inotify().
+        path: Directory to watch.
+    """
+    wd = watcher["libc"].inotify_add_watch(watcher["fd"], os.fsencode(path), IN_WATCH_MASK)
+    if wd >= 0:
+        watcher["watches"][wd] = path
+
+
+def read_inotify_events(watcher, timeout):
+    """
+    Reads the pending inotify events.
+
+    Args:
+        watcher: Watcher state returned by start_inotify().
+        timeout: Seconds to wait for the first event.
+
+    Returns:
+        set: Changed file paths, relative to the watched directory.
+    """
+    changed = set()
+    readable, _, _ = select.select([watcher["fd"]], [], [], timeout)
+    if not readable:
+        return changed
+    buffer = os.read(watcher["fd"], 64 * 1024)
+    offset = 0
+    # struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+    while offset + 16 <= len(buffer):
+        wd, mask, cookie, length = struct.unpack_from("iIII", buffer, offset)
+        name = buffer[offset + 16:offset + 16 + length].split(b"\0", 1)[0]
+        offset += 16 + length
+        if not name or wd not in watcher["watches"]:
+            continue
+        path = os.path.join(watcher["watches"][wd], os.fsdecode(name))
+        if mask & IN_ISDIR:
+            # Watch new subdirectories and pick up the files already in them
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                for root, dirs, files in os.walk(path):
+                    add_inotify_watch(watcher, root)
+                    changed.update(os.path.join(root, file) for file in files)
+            continue
+        changed.add(path)
+    return {os.path.relpath(path, watcher["directory"]).replace(os.sep, "/") for path in changed}
+
+
+def snapshot_tree(directory):
+    """
+    Records the size and mtime of every file under a directory.
+
+    Used by watch_ui() to detect changes when inotify is not available.
+
+    Args:
+        directory: Directory to scan.
+
+    Returns:
+        dict: Mapping of relative file path to (size, mtime_ns).
+    """
+    snapshot = {}
+    for rel_path in list_tree(directory):
+        try:
+            file_stat = os.stat(os.path.join(directory, rel_path))
+        except OSError:
+            continue
+        snapshot[rel_path] = (file_stat.st_size, file_stat.st_mtime_ns)
+    return snapshot
+
+
+def wait_for_changes(source_dir, watcher, snapshot, debounce):
+    """
+    Blocks until files change in source_dir and returns them as one batch.
+
+    After the first change, waits until no new change was seen for `debounce`
+    seconds, so an export writing many files results in a single batch.
+
+    Args:
+        source_dir: Watched directory.
+        watcher: Watcher state returned by start_inotify(), or None to poll.
+        snapshot: Last result of snapshot_tree(), updated in place when polling.
+        debounce: Quiet period in seconds that ends a batch.
+
+    Returns:
+        set: Changed file paths, relative to source_dir.
+    """
+    def poll(timeout):
+        if watcher is not None:
+            return read_inotify_events(watcher, timeout)
+        time.sleep(timeout)
+        current = snapshot_tree(source_dir)
+        changed = {rel_path for rel_path in set(current) | set(snapshot)
+                   if current.get(rel_path) != snapshot.get(rel_path)}
+        snapshot.clear()
+        snapshot.update(current)
+        return changed
+
+    batch = set()
+    while not batch:
+        batch = poll(WATCH_POLL_INTERVAL)
+    # Coalesce the burst of writes of an export into one batch
+    while True:
+        changed = poll(debounce)
+        if not changed:
+            return batch
+        batch |= changed
+
+
+def import_transforms(fixup_passes, hoist=False, profile=False, split=False, resident=0):
+    """
+    Lists the in-place transforms an import applies after copying the files.
+
+    Args:
+        fixup_passes: Names of the fixup passes the import runs.
+        hoist: Hoist shared local styles.
+        profile: Add timing probes.
+        split: Split screens.c into one file per screen.
+        resident: Number of resident lazy screens, 0 if lazy screens are off.
+
+    Returns:
+        dict: Transform name -> option, as recorded by record_transform().
+    """
+    transforms = {name: True for name in fixup_passes if name not in DEFAULT_FIXUP_PASSES}
+    if hoist:
+        transforms["hoist_styles"] = True
+    if profile:
+        transforms["profile"] = True
+    if split:
+        transforms["split_screens"] = True
+    if resident:
+        transforms["lazy_screens"] = resident
+    return transforms
+
+
+def watch_ui(source_dir, project_dir, debounce=DEFAULT_WATCH_DEBOUNCE, workers=DEFAULT_WORKERS, mirror=False, hoist=False, split=False, resident=0, fixup_passes=DEFAULT_FIXUP_PASSES, profile=False, estimate=False, memory_budget=None, flow_support="auto", project_file=None):
+    """
+    Watches the UI source directory and re-imports changed files.
+
+    Uses inotify on Linux and falls back to polling elsewhere. Every batch of
+    changes only copies the changed files to project_dir and only runs the
+    fixups on those files (and on actions.c if actions.h changed). If the
+    enabled transforms differ from the ones applied to project_dir, the first
+    batch imports every file. Runs until interrupted with Ctrl+C.
+
+    Args:
+        source_dir: Path to the UI source directory exported by EEZ-Studio.
+        project_dir: Path to the UI project directory.
+        debounce: Quiet period in seconds that ends a batch of changes.
+        workers: Number of worker threads used to hash and copy files.
+        mirror: Delete files from project_dir that were deleted from source_dir.
+        hoist: Hoist shared local styles when screens.c changed.
+        split: Split screens.c into one file per screen when it changed.
+        resident: Make the screens lazy with this many resident screens when
+            screens.c, screens.h or ui.c changed. 0 disables it.
+        fixup_passes: Names of the fixup passes run on the changed files.
+        profile: Add timing probes when screens.c or ui.c changed.
+        estimate: Estimate the LVGL heap of the screens when screens.c or
+            styles.c changed.
+        memory_budget: Heap in KB the screens may use, or None to use LV_MEM_SIZE.
+        flow_support: 'auto', 'on' or 'off', see fix_flow(). Checked again
+            when the flow files, ui.c or screens.c change.
+        project_file: Path to the .eez-project file, or None to search it.
+    """
+    if not validate_ui_source(source_dir):
+        return
+    watcher = start_inotify(source_dir)
+    snapshot = snapshot_tree(source_dir) if watcher is None else None
+    method = "inotify" if watcher is not None else f"polling every {WATCH_POLL_INTERVAL}s"
+    print(f"\nWatching '{source_dir}' ({method}). Press Ctrl+C to stop.")
+    transforms = import_transforms(fixup_passes, hoist, profile, split, resident)
+    try:
+        while True:
+            changed = wait_for_changes(source_dir, watcher, snapshot, debounce)
+            print(f"\nDetected {len(changed)} changed file(s) in '{source_dir}'.")
+            if load_manifest_transforms(project_dir) != transforms:
+                # The modified files are copied again, so every transform has to run
+                changed = set(list_tree(source_dir))
+            copied_files, unchanged_files, removed_files = sync_tree(source_dir, project_dir, sorted(changed), workers, mirror, transforms)
+            print(f"Copied {copied_files} files, {unchanged_files} unchanged, {removed_files} removed.")
+            if copied_files:
+                if not split and "screens.c" in changed:
+                    unsplit_screens(source_dir, project_dir)
+                if not resident and changed & {"screens.c", "screens.h", "ui.c"}:
+                    unlazy_screens(source_dir, project_dir)
+                run_fixups(project_dir, fixup_passes, only=changed)
+                if changed & (FLOW_SOURCE_FILES | {"ui.c", "screens.c"}):
+                    fix_flow(project_dir, source_dir, project_file, flow_support)
+                if hoist and "screens.c" in changed:
+                    hoist_styles(project_dir)
+                if profile and changed & {"screens.c", "ui.c"}:
+                    profile_screens(project_dir)
+                if split and "screens.c" in changed:
+                    split_screens(project_dir)
+                if resident and changed & {"screens.c", "screens.h", "ui.c"}:
+                    lazy_screens(project_dir, resident)
+                if estimate and changed & {"screens.c", "styles.c"}:
+                    estimate_screen_memory(project_dir, resident, memory_budget)
+            print(f"\nWaiting for changes in '{source_dir}'.")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        if watcher is not None:
+            os.close(watcher["fd"])
+
+
+def main():
+    """
+    Main function to run the script with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Running EEZ UI Importer')
+    parser.add_argument('-d', '--directory',nargs='?', const='', help='Source directory for UI files')
+    parser.add_argument('-b', '--backup-directory',nargs='?', const='', help='Backup directory for UI files')
+    parser.add_argument('-m', '--mode', choices=['config', 'backup-ui', 'restore-ui', 'delete-backup', 'copy-ui', 'fix-headers', 'fix-cmake', 'fix-actions', 'fix-flow', 'fix-screens', 'static-text', 'hoist-styles', 'profile', 'split-screens', 'lazy-screens', 'estimate-memory', 'convert-images', 'watch', 'list-backups', 'generate', 'all'], default=None) 
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of threads used to hash and copy files')
+    parser.add_argument('--snapshot', default=None, help='Name of the backup snapshot restore-ui restores (default: newest)')
+    parser.add_argument('--keep', type=int, default=None, help='Number of backup snapshots to keep (0 keeps all)')
+    parser.add_argument('--keep-days', type=float, default=None, help='Delete backup snapshots older than this many days (0 disables it)')
+    parser.add_argument('--mirror', action='store_true', default=None, help='Delete files of earlier imports that were removed from the source directory')
+    parser.add_argument('--report', default=None, help='Save the per-stage timing report as JSON to this file')
+    parser.add_argument('--cache-bindings', action='store_true', default=None, help='With generate, read every bound variable once per tick and only read display-only widgets when their variable changed')
+    parser.add_argument('--static-text', action='store_true', default=None, help='Use lv_label_set_text_static() for literal label texts after importing')
+    parser.add_argument('--hoist-styles', action='store_true', default=None, help='Replace local styles shared by several objects with shared styles after importing')
+    parser.add_argument('--profile', action='store_true', default=None, help='Add timing probes to the screen functions and ui_init() after importing')
+    parser.add_argument('--split-screens', action='store_true', default=None, help='Split screens.c into one file per screen after importing')
+    parser.add_argument('--lazy-screens', type=int, nargs='?', const=DEFAULT_RESIDENT_SCREENS, default=None, metavar='RESIDENT', help=f'Create screens on first load and keep at most RESIDENT screens (default: {DEFAULT_RESIDENT_SCREENS}) after importing')
+    parser.add_argument('--estimate-memory', action='store_true', default=None, help='Estimate the LVGL heap of every screen after importing')
+    parser.add_argument('--memory-budget', type=int, default=None, metavar='KB', help='Heap the screens may use, instead of LV_MEM_SIZE. Fails the import if the estimate is larger')
+    parser.add_argument('--convert-images', action='store_true', default=None, help='Convert the bitmaps of the .eez-project file (and --image-dir) into LVGL image C files before importing')
+    parser.add_argument('--image-dir', default=None, help='Directory with PNG and JPEG files convert-images converts as well')
+    parser.add_argument('--image-format', default=None, metavar='FORMAT', help='LVGL color format of all converted images, e.g. TRUE_COLOR or INDEXED_4BIT (default: the format of every bitmap)')
+    parser.add_argument('--image-max-error', type=int, default=None, metavar='N', help='Quantize converted images to the smallest indexed format that changes no color channel by more than N (0-255, 0: only lossless)')
+    parser.add_argument('--image-manifest', default=None, help='Format of every image picked by advise_ui_images.py, used by convert-images')
+    parser.add_argument('--analyze-images', action='store_true', default=None, help='Print the formats every converted image can be stored in, with flash size and estimated draw time')
+    parser.add_argument('--color-order', choices=['auto', 'rgb', 'bgr'], default=None, help='Channel order of the panel that converted images and generated colors are built for (default: auto, RGB like LVGL)')
+    parser.add_argument('--ui-rotation', type=int, choices=[0, 90, 180, 270], default=None, help='With generate and convert-images, rotate the screens and images for the panel so the flush doesn\'t rotate them (needs Rotation 0 in menuconfig). Only screens of panels, containers and images can be rotated')
+    parser.add_argument('--flow-support', choices=['auto', 'on', 'off'], default=None, help='Build eez-flow.cpp: auto detects whether the UI uses EEZ Flow (default: auto)')
+    parser.add_argument('--project', default=None, help='Path to the .eez-project file used by generate (default: searched next to the source directory)')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_WATCH_DEBOUNCE, help='Seconds without changes before watch mode imports a batch')
+    help_parser = argparse.ArgumentParser(description='Import EEZ UI', formatter_class=argparse.RawDescriptionHelpFormatter, epilog='''
+                                     
+  -d, --directory         -Set the source directory for UI files exported from EEZ-Studio. Must be in folder called ui
+                            Default: ./example/eez-project/project_name/src/ui
+                            Example: python import_eez_ui.py -d ./example/eez-project/project_name/src/ui
+    
+  -b, --backup-directory  -Set the backup directory for .components/ui files. 
+                            Default: ./backup/ui
+                            Example: python import_eez_ui.py -b ./backup/ui
+    
+  -j, --jobs              -Number of threads used to hash and copy files. Can also be set with
+                            'workers' in the config file.
+                            Default: number of CPUs, up to 8
+                            Example: python import_eez_ui.py -m copy-ui -j 4
+    
+  --report <file>         -Save the time, bytes read/written and files touched/skipped of every stage
+                            as JSON. Can also be set with 'report_file' in the config file.
+                            Example: python import_eez_ui.py --report import_report.json
     
   -m, --mode:             -Run a specific mode.
                             Default: ALL Modes unless set by config, then user selected modes.
@@ -447,10 +2985,15 @@ def main():
         Optional Modes:
               
         config         -Run Interactive Config
-        backup-ui      -Copy UI files from ./components/ui to backup directory
-        restore-ui     -Copy UI files from backup directory to ./components/ui
+        backup-ui      -Store a snapshot of ./components/ui in the backup directory. Unchanged files are
+                        hard linked from the previous snapshot. Use --keep <count> and
+                        --keep-days <days> to set how many snapshots are kept
+        restore-ui     -Copy UI files from the newest backup snapshot to ./components/ui.
+                        Use --snapshot <name> to restore an older one
+        list-backups   -List the backup snapshots
         delete-backup  -Delete backup directory
-        copy-ui        -Copy UI files from source directory to ./components/ui
+        copy-ui        -Copy UI files from source directory to ./components/ui. Add --mirror to also
+                        delete files of earlier imports that no longer exist in the source directory
         fix-headers    -Fix header files - if ui files from EEZ-Studio still link to lvgl/lvgl.h this will 
                         replace it with the correct lvgl.h.
         fix-cmake      -Fix CMakeLists.txt - if you accidently delete CMakeLists.txt, this will replace it 
@@ -458,8 +3001,53 @@ def main():
         fix-actions    -Fix actions.c - if custom actions are defined in EEZ-Studio this will create stubs for 
                         you to implement
         fix-flow       -Fix for eez-flow - if ui.h from EEZ-Studio still links to eez-flow.c even if not used 
-                        this will add in the correct eez-flow.h
+                        this will add in the correct eez-flow.h. If the UI doesn't use EEZ Flow (flowSupport
+                        in the .eez-project file and the flow API in the UI sources), eez-flow.cpp is left
+                        out of CMakeLists.txt. Force it with --flow-support on|off or 'flow_support' in
+                        the config file
         fix-screens    -Fix screens - changes lv_obj_create(0) to lv_obj_create(NULL) in all screens
+        generate       -Generate the UI files in the source directory from the .eez-project file without
+                        EEZ-Studio. Use --project <file> or 'project_file' in the config file to
+                        select the project (only projects without flow support). Add --cache-bindings
+                        (or 'cache_bindings = true' in the config file) to read every bound variable
+                        once per tick and skip reading bars whose variable didn't change. Add
+                        --ui-rotation <degrees> (or 'ui_rotation' in the config file) to rotate the
+                        screens for the panel, so the flush doesn't rotate every frame
+        static-text    -Use lv_label_set_text_static() for label and checkbox texts that are string
+                        literals, so LVGL doesn't copy them into its heap, and report the heap
+                        reclaimed per screen. Add --static-text (or 'static_text = true' in the
+                        config file) to do it after every import
+        hoist-styles   -Replace identical local styles of several objects with one shared style in
+                        styles.c (const in flash where possible) and report the heap and flash saved.
+                        Add --hoist-styles (or 'hoist_styles = true' in the config file) to do it
+                        after every import
+        profile        -Add timing probes around every create_screen_*(), tick_screen_*() and ui_init()
+                        that print their time and heap use. Read the log with parse_ui_probes.py.
+                        Add --profile (or 'profile = true' in the config file) to do it after every
+                        import
+        split-screens  -Split screens.c into one screen_<name>.c file per screen, so the screens compile
+                        in parallel and only changed screens are rebuilt. Add --split-screens (or
+                        'split_screens = true' in the config file) to do it after every import
+        lazy-screens   -Create every screen when it is first loaded instead of at ui_init(), and delete
+                        the least recently used screens when more than --lazy-screens <count> exist
+                        (default 2). Add --lazy-screens (or 'lazy_screens = <count>' in the config
+                        file) to do it after every import
+        estimate-memory -Estimate the LVGL heap of every screen from its widgets, local styles, texts and
+                        events, and compare the peak with LV_MEM_SIZE or --memory-budget <KB>. Add
+                        --estimate-memory (or 'estimate_memory = true' in the config file) to do it
+                        after every import
+        convert-images -Convert the bitmaps of the .eez-project file, and the PNG and JPEG files of
+                        --image-dir <dir>, into ui_image_<name>.c files in the source directory (needs
+                        NumPy and Pillow). Unchanged images are not converted again. Use
+                        --image-format <format> to set the LVGL color format of all images, or
+                        --image-max-error <N> to quantize images to indexed formats. Use
+                        --analyze-images to print the flash size and draw time of every format, and
+                        --image-manifest <file> for the formats advise_ui_images.py picked. The
+                        images are rotated by --ui-rotation like the screens. Add
+                        --convert-images (or 'convert_images = true' in the config file) to do it
+                        before every import
+        watch          -Watch the source directory and re-import changed files after every EEZ-Studio
+                        export. Use --debounce <seconds> to set how long to wait for an export to finish
         all            -Run all modes(Except delete-backup) with settings from config file
                         ''')
     args = parser.parse_args()
@@ -469,6 +3057,39 @@ def main():
     # Set script variables from config variables
     source_dir = config.get('ImportSettings', 'source_dir', fallback=DEFAULT_SOURCE_DIR)
     backup_dir = config.get('ImportSettings', 'backup_dir', fallback=DEFAULT_BACKUP_DIR)
+    project_dir = config.get('ImportSettings', 'project_dir', fallback=DEFAULT_PROJECT_DIR)
+    workers = args.jobs or config.getint('ImportSettings', 'workers', fallback=DEFAULT_WORKERS)
+    mirror = args.mirror or config.getboolean('ImportSettings', 'mirror', fallback=False)
+    # Backup snapshot retention, from the command line or the config file
+    keep = args.keep if args.keep is not None else config.getint('ImportSettings', 'backup_keep', fallback=DEFAULT_BACKUP_KEEP)
+    keep_days = args.keep_days if args.keep_days is not None else config.getfloat('ImportSettings', 'backup_keep_days', fallback=DEFAULT_BACKUP_KEEP_DAYS)
+    report_file = args.report or config.get('ImportSettings', 'report_file', fallback=None)
+    project_file = args.project or config.get('ImportSettings', 'project_file', fallback=None)
+    cache_bindings = args.cache_bindings or config.getboolean('ImportSettings', 'cache_bindings', fallback=False)
+    flow_support = args.flow_support or config.get('ImportSettings', 'flow_support', fallback='auto')
+    fixup_passes = list(DEFAULT_FIXUP_PASSES)
+    if args.static_text or config.getboolean('ImportSettings', 'static_text', fallback=False):
+        fixup_passes.append("static_text")
+    hoist = args.hoist_styles or config.getboolean('ImportSettings', 'hoist_styles', fallback=False)
+    profile = args.profile or config.getboolean('ImportSettings', 'profile', fallback=False)
+    split = args.split_screens or config.getboolean('ImportSettings', 'split_screens', fallback=False)
+    # Number of resident screens of lazy screens, 0 creates all screens at ui_init()
+    resident = args.lazy_screens if args.lazy_screens is not None else config.getint('ImportSettings', 'lazy_screens', fallback=0)
+    # In-place transforms of an 'all' import, the copy undoes the ones that were turned off
+    transforms = import_transforms(fixup_passes, hoist, profile, split, resident)
+    # Heap in KB the screens may use, None compares with LV_MEM_SIZE
+    memory_budget = args.memory_budget if args.memory_budget is not None else config.getint('ImportSettings', 'memory_budget', fallback=None)
+    estimate = args.estimate_memory or config.getboolean('ImportSettings', 'estimate_memory', fallback=False) or memory_budget is not None
+    image_dir = args.image_dir or config.get('ImportSettings', 'image_dir', fallback=None)
+    image_format = args.image_format or config.get('ImportSettings', 'image_format', fallback=None)
+    color_order = args.color_order or config.get('ImportSettings', 'color_order', fallback='auto')
+    # Largest channel error of quantized images, None never quantizes
+    image_max_error = args.image_max_error if args.image_max_error is not None else config.getint('ImportSettings', 'image_max_error', fallback=None)
+    analyze_images = args.analyze_images or config.getboolean('ImportSettings', 'analyze_images', fallback=False)
+    image_manifest = args.image_manifest or config.get('ImportSettings', 'image_manifest', fallback=None)
+    convert = args.convert_images or config.getboolean('ImportSettings', 'convert_images', fallback=False)
+    # Degrees the screens and images are rotated for the panel, 0 leaves the rotation to the flush
+    ui_rotation = args.ui_rotation if args.ui_rotation is not None else config.getint('ImportSettings', 'ui_rotation', fallback=0)
     user_selected_modes = config.get('ImportSettings', 'user_selected_modes', fallback=DEFAULT_USER_SELECTED_MODES).split(',')
     
      # Handle -d (directory) flag
@@ -510,13 +3131,32 @@ def main():
     if args.mode is None and not args.backup_directory and not args.directory:
         # If user_selected_mode is set to 'all' from config (default before config)
         if 'all' in user_selected_modes:
-            backup_ui(source_dir, backup_dir)
-            copy_ui(source_dir)
-            fix_headers()
-            fix_cmake()
-            fix_actions()
-            fix_flow()
-            fix_screens()
+            if convert and not convert_images(source_dir, project_file, image_dir, image_format, color_order, image_max_error, analyze_images, image_manifest, ui_rotation):
+                print_stage_report(report_file)
+                sys.exit(1)
+            backup_ui(source_dir, backup_dir, workers, keep, keep_days)
+            copy_ui(source_dir, project_dir, workers, mirror, transforms)
+            if not split:
+                unsplit_screens(source_dir, project_dir)
+            if not resident:
+                unlazy_screens(source_dir, project_dir)
+            fix_cmake(project_dir)
+            fix_flow(project_dir, source_dir, project_file, flow_support)
+            # fix_headers, fix_actions and fix_screens (and static_text) in a single pass
+            run_fixups(project_dir, fixup_passes)
+            if hoist:
+                hoist_styles(project_dir)
+            if profile:
+                profile_screens(project_dir)
+            if split:
+                split_screens(project_dir)
+            if resident:
+                lazy_screens(project_dir, resident)
+            fits = estimate_screen_memory(project_dir, resident, memory_budget) if estimate else True
+            print_stage_report(report_file)
+            if not fits:
+                print("\nThe screens need more heap than the budget. See the memory estimate above.\n")
+                sys.exit(1)
             print("\nAll operations completed successfully.\nFull Clean and Build the project to verify.\n")
             sys.exit(0)
         # If user_selected_mode is to any other value, run each mode that is specified.
@@ -526,55 +3166,132 @@ def main():
                 if mode == 'config':
                     config_mode(config)
                 elif mode == 'backup-ui':
-                    backup_ui(DEFAULT_PROJECT_DIR, backup_dir)
+                    backup_ui(DEFAULT_PROJECT_DIR, backup_dir, workers, keep, keep_days)
                 elif mode == 'restore-ui':
-                    restore_ui(DEFAULT_PROJECT_DIR, backup_dir)
+                    restore_ui(DEFAULT_PROJECT_DIR, backup_dir, workers, args.snapshot)
                 elif mode == 'delete-backup':
                     # Delete backup directory
                     shutil.rmtree(backup_dir, ignore_errors=True)
                     print(f"\nDeleted backup directory: {backup_dir}")
+                elif mode == 'generate':
+                    if not generate_ui_sources(project_file, source_dir, cache_bindings, color_order, ui_rotation):
+                        print_stage_report(report_file)
+                        sys.exit(1)
+                elif mode == 'convert-images':
+                    if not convert_images(source_dir, project_file, image_dir, image_format, color_order, image_max_error, analyze_images, image_manifest, ui_rotation):
+                        print_stage_report(report_file)
+                        sys.exit(1)
                 elif mode == 'copy-ui':
-                    copy_ui(source_dir)
+                    # Only the transforms of the selected modes follow the copy
+                    selected_transforms = import_transforms(
+                        ["static_text"] if 'static-text' in user_selected_modes else [], 'hoist-styles' in user_selected_modes,
+                        'profile' in user_selected_modes, 'split-screens' in user_selected_modes,
+                        (resident or DEFAULT_RESIDENT_SCREENS) if 'lazy-screens' in user_selected_modes else 0)
+                    copy_ui(source_dir, project_dir, workers, mirror, selected_transforms)
+                    if 'split-screens' not in user_selected_modes:
+                        unsplit_screens(source_dir, project_dir)
+                    if 'lazy-screens' not in user_selected_modes:
+                        unlazy_screens(source_dir, project_dir)
                 elif mode == 'fix-headers':
-                    fix_headers()
+                    fix_headers(project_dir)
                 elif mode == 'fix-cmake':
-                    fix_cmake()
+                    fix_cmake(project_dir)
                 elif mode == 'fix-actions':
-                    fix_actions()
+                    fix_actions(project_dir)
                 elif mode == 'fix-flow':
-                    fix_flow()
+                    fix_flow(project_dir, source_dir, project_file, flow_support)
                 elif mode == 'fix-screens':
-                    fix_screens()
+                    fix_screens(project_dir)
+                elif mode == 'static-text':
+                    run_fixups(project_dir, ["static_text"])
+                elif mode == 'hoist-styles':
+                    hoist_styles(project_dir)
+                elif mode == 'profile':
+                    profile_screens(project_dir)
+                elif mode == 'split-screens':
+                    split_screens(project_dir)
+                elif mode == 'lazy-screens':
+                    lazy_screens(project_dir, resident or DEFAULT_RESIDENT_SCREENS)
+                elif mode == 'estimate-memory':
+                    if not estimate_screen_memory(project_dir, resident, memory_budget):
+                        print_stage_report(report_file)
+                        sys.exit(1)
+            print_stage_report(report_file)
             print("\nSelected operations completed successfully.\nFull Clean and Build the project to verify.\n")
         sys.exit(0)
     # Run only the selected mode when -m is passed
     else:
         if args.mode == 'backup-ui':
-            backup_ui(DEFAULT_PROJECT_DIR, backup_dir)
+            backup_ui(DEFAULT_PROJECT_DIR, backup_dir, workers, keep, keep_days)
         elif args.mode == 'restore-ui':
-            restore_ui(DEFAULT_PROJECT_DIR, backup_dir)
+            restore_ui(DEFAULT_PROJECT_DIR, backup_dir, workers, args.snapshot)
         elif args.mode == 'delete-backup':
             shutil.rmtree(backup_dir, ignore_errors=True)
             print(f"\nDeleted backup directory: {backup_dir}")
+        elif args.mode == 'generate':
+            if not generate_ui_sources(project_file, source_dir, cache_bindings, color_order, ui_rotation):
+                sys.exit(1)
+        elif args.mode == 'convert-images':
+            if not convert_images(source_dir, project_file, image_dir, image_format, color_order, image_max_error, analyze_images, image_manifest, ui_rotation):
+                print_stage_report(report_file)
+                sys.exit(1)
         elif args.mode == 'copy-ui':
-            copy_ui(source_dir)
+            copy_ui(source_dir, project_dir, workers, mirror)
         elif args.mode == 'fix-headers':
-            fix_headers()
+            fix_headers(project_dir)
         elif args.mode == 'fix-cmake':
-            fix_cmake()
+            fix_cmake(project_dir)
         elif args.mode == 'fix-actions':
-            fix_actions()
+            fix_actions(project_dir)
         elif args.mode == 'fix-flow':
-            fix_flow()
+            fix_flow(project_dir, source_dir, project_file, flow_support)
         elif args.mode == 'fix-screens':
-            fix_screens()
+            fix_screens(project_dir)
+        elif args.mode == 'static-text':
+            run_fixups(project_dir, ["static_text"])
+        elif args.mode == 'hoist-styles':
+            hoist_styles(project_dir)
+        elif args.mode == 'profile':
+            profile_screens(project_dir)
+        elif args.mode == 'split-screens':
+            split_screens(project_dir)
+        elif args.mode == 'lazy-screens':
+            lazy_screens(project_dir, resident or DEFAULT_RESIDENT_SCREENS)
+        elif args.mode == 'estimate-memory':
+            if not estimate_screen_memory(project_dir, resident, memory_budget):
+                print_stage_report(report_file)
+                sys.exit(1)
+        elif args.mode == 'list-backups':
+            list_backups(backup_dir)
+        elif args.mode == 'watch':
+            watch_ui(source_dir, project_dir, args.debounce, workers, mirror, hoist, split, resident, fixup_passes, profile, estimate, memory_budget, flow_support, project_file)
         elif args.mode == 'all':
-            backup_ui(source_dir, backup_dir)
-            copy_ui(source_dir)
-            fix_headers()
-            fix_cmake()
-            fix_actions()
+            if convert and not convert_images(source_dir, project_file, image_dir, image_format, color_order, image_max_error, analyze_images, image_manifest, ui_rotation):
+                print_stage_report(report_file)
+                sys.exit(1)
+            backup_ui(source_dir, backup_dir, workers, keep, keep_days)
+            copy_ui(source_dir, project_dir, workers, mirror, transforms)
+            if not split:
+                unsplit_screens(source_dir, project_dir)
+            if not resident:
+                unlazy_screens(source_dir, project_dir)
+            fix_cmake(project_dir)
+            fix_flow(project_dir, source_dir, project_file, flow_support)
+            # fix_headers and fix_actions (and static_text) in a single pass
+            run_fixups(project_dir, [p for p in fixup_passes if p != "screens"])
+            if hoist:
+                hoist_styles(project_dir)
+            if profile:
+                profile_screens(project_dir)
+            if split:
+                split_screens(project_dir)
+            if resident:
+                lazy_screens(project_dir, resident)
+            if estimate and not estimate_screen_memory(project_dir, resident, memory_budget):
+                print_stage_report(report_file)
+                sys.exit(1)
             print("\n{args.mode} completed successfully.\nFull Clean and Build the project to verify.\n")
+        print_stage_report(report_file)
     sys.exit(0) # End script with success
             
 
@@ -0,0 +1,152 @@
+import re
+import sys
+import json
+import argparse
+
+# A probe line, anywhere in a line of the log (idf.py monitor adds colours and
+# other output may share the line)
+PROBE_RE = re.compile(r"UIPROBE (create|init|tick) (\w+) (-?\d+) (-?\d+)(?: (-?\d+))?")
+
+SORT_KEYS = {
+    'max': lambda screen: screen["create_max_us"],
+    'first': lambda screen: screen["create_first_us"],
+    'heap': lambda screen: screen["heap_bytes"],
+    'tick': lambda screen: screen["tick_avg_us"],
+    'name': None,
+}
+
+
+def parse_log(lines):
+    """
+    Collects the probe lines of a log captured from a UI with timing probes.
+
+    Args:
+        lines: Lines of the log.
+
+    Returns:
+        dict: 'init' -> list of (microseconds, heap bytes) of ui_init(), and
+            'screens' -> screen name -> {'creates': [(microseconds, heap bytes)],
+            'ticks': [(ticks, total microseconds, max microseconds)]}.
+    """
+    result = {"init": [], "screens": {}}
+    for line in lines:
+        for event, name, first, second, third in PROBE_RE.findall(line):
+            if event == "init":
+                result["init"].append((int(first), int(second)))
+                continue
+            screen = result["screens"].setdefault(name, {"creates": [], "ticks": []})
+            if event == "create":
+                screen["creates"].append((int(first), int(second)))
+            elif third:
+                screen["ticks"].append((int(first), int(second), int(third)))
+    return result
+
+
+def summarize(parsed):
+    """
+    Summarizes the probes of every screen.
+
+    Args:
+        parsed: Result of parse_log().
+
+    Returns:
+        dict: 'init' -> {'count', 'first_us', 'max_us', 'heap_bytes'} or None, and
+            'screens' -> list of per-screen summaries.
+    """
+    init = None
+    if parsed["init"]:
+        init = {
+            "count": len(parsed["init"]),
+            "first_us": parsed["init"][0][0],
+            "max_us": max(us for us, _ in parsed["init"]),
+            "heap_bytes": parsed["init"][0][1],
+        }
+    screens = []
+    for name, probes in parsed["screens"].items():
+        creates = probes["creates"]
+        ticks = sum(count for count, _, _ in probes["ticks"])
+        tick_total = sum(total for _, total, _ in probes["ticks"])
+        screens.append({
+            "screen": name,
+            "creates": len(creates),
+            "create_first_us": creates[0][0] if creates else 0,
+            "create_avg_us": sum(us for us, _ in creates) / len(creates) if creates else 0,
+            "create_max_us": max((us for us, _ in creates), default=0),
+            # The first creation is the one that counts for the heap, later ones
+            # may reuse memory of the deleted screen
+            "heap_bytes": creates[0][1] if creates else 0,
+            "ticks": ticks,
+            "tick_avg_us": tick_total / ticks if ticks else 0,
+            "tick_max_us": max((longest for _, _, longest in probes["ticks"]), default=0),
+        })
+    return {"init": init, "screens": screens}
+
+
+def print_summary(summary, sort):
+    """
+    Prints the per-screen tables of a summary.
+
+    Args:
+        summary: Result of summarize().
+        sort: Key of SORT_KEYS the screens are sorted by, slowest first.
+    """
+    init = summary["init"]
+    if init:
+        print(f"\nui_init(): {init['first_us'] / 1000:.2f} ms, {init['heap_bytes'] / 1024:.1f} KB heap"
+              + (f" ({init['count']} calls, max {init['max_us'] / 1000:.2f} ms)" if init["count"] > 1 else ""))
+    screens = summary["screens"]
+    if SORT_KEYS[sort] is None:
+        screens = sorted(screens, key=lambda screen: screen["screen"])
+    else:
+        screens = sorted(screens, key=SORT_KEYS[sort], reverse=True)
+
+    created = [screen for screen in screens if screen["creates"]]
+    if created:
+        print("\nScreen creation")
+        print(f"  {'screen':<24} {'creates':>8} {'first (ms)':>11} {'avg (ms)':>9} {'max (ms)':>9} {'heap (KB)':>10}")
+        for screen in created:
+            print(f"  {screen['screen']:<24} {screen['creates']:>8} {screen['create_first_us'] / 1000:>11.2f} "
+                  f"{screen['create_avg_us'] / 1000:>9.2f} {screen['create_max_us'] / 1000:>9.2f} "
+                  f"{screen['heap_bytes'] / 1024:>10.1f}")
+        total_us = sum(screen["create_first_us"] for screen in created)
+        total_heap = sum(screen["heap_bytes"] for screen in created)
+        print(f"  {'total (first creation)':<24} {'':>8} {total_us / 1000:>11.2f} {'':>9} {'':>9} {total_heap / 1024:>10.1f}")
+
+    ticked = [screen for screen in screens if screen["ticks"]]
+    if ticked:
+        print("\nScreen ticks")
+        print(f"  {'screen':<24} {'ticks':>8} {'avg (us)':>9} {'max (us)':>9}")
+        for screen in ticked:
+            print(f"  {screen['screen']:<24} {screen['ticks']:>8} {screen['tick_avg_us']:>9.1f} {screen['tick_max_us']:>9}")
+
+    if not init and not screens:
+        print("No UIPROBE lines found. Import with --profile and capture the log with 'idf.py monitor'.")
+
+
+def main():
+    """
+    Main function to run the parser with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Summarize the timing probes added by import_eez_ui.py --profile')
+    parser.add_argument('logs', nargs='*', help='Captured log files (default: read stdin)')
+    parser.add_argument('-s', '--sort', choices=sorted(SORT_KEYS), default='max', help='Sort the screens by this column, slowest first')
+    parser.add_argument('--json', default=None, help='Also save the summary as JSON to this file')
+    args = parser.parse_args()
+
+    if args.logs:
+        lines = []
+        for log in args.logs:
+            with open(log, "r", encoding="utf-8", errors="replace") as f:
+                lines += f.readlines()
+    else:
+        lines = sys.stdin
+    summary = summarize(parse_log(lines))
+    print_summary(summary, args.sort)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSummary saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import os
+import re
+import io
+import json
+import sys
+import copy
+import base64
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import generate_eez_ui
+import convert_ui_images
+from benchmark_lvgl_host import (CC, CFLAGS, DEFAULT_BUILD_DIR, EXAMPLE_PROJECT, LVGL_DIR, REPO_DIR, build_lvgl,
+                                 synthetic_widget)
+
+# Port whose rotate_copy_pixel() rotates the frame in the flush. The harness
+# compiles it as it is, so the upright screens are rotated exactly like on
+# the device.
+LVGL_PORT_SOURCE = os.path.join(REPO_DIR, "main", "lvgl_port.c")
+ROTATE_FUNCTION_RE = re.compile(r"^IRAM_ATTR static void rotate_copy_pixel\(.*?^}$", re.M | re.S)
+# Upright size of the synthetic screens, the panel is 800 x 480
+SYNTHETIC_DISPLAY = (480, 800)
+
+HARNESS_TEMPLATE = """#include <stdio.h>
+#include <stdint.h>
+#include <string.h>
+
+#include <lvgl.h>
+#include "screens.h"
+
+#define HOR_RES {width}
+#define VER_RES {height}
+#define ROTATION {rotation}
+#define IRAM_ATTR
+
+{rotate_function}
+
+static lv_color_t draw_buf_pixels[HOR_RES * 40];
+static lv_color_t frame[HOR_RES * VER_RES];
+static uint16_t rotated[HOR_RES * VER_RES];
+
+// Collects the flushed areas into a whole frame, like the RGB panel's frame buffer
+static void flush_cb(lv_disp_drv_t *drv, const lv_area_t *area, lv_color_t *color_p) {{
+    lv_coord_t width = lv_area_get_width(area);
+    for (lv_coord_t y = area->y1; y <= area->y2; y++) {{
+        memcpy(&frame[y * HOR_RES + area->x1], color_p, width * sizeof(lv_color_t));
+        color_p += width;
+    }}
+    lv_disp_flush_ready(drv);
+}}
+
+typedef struct {{
+    const char *name;
+    lv_obj_t **screen;
+}} screen_t;
+
+static const screen_t screens[] = {{
+{screens}
+}};
+
+// Draws every screen and writes its frame, rotated by ROTATION like the flush
+// of the LVGL port does, to <directory>/<screen>.raw
+int main(int argc, char **argv) {{
+    const char *directory = argc > 1 ? argv[1] : ".";
+
+    lv_init();
+    static lv_disp_draw_buf_t draw_buf;
+    lv_disp_draw_buf_init(&draw_buf, draw_buf_pixels, NULL, HOR_RES * 40);
+    static lv_disp_drv_t disp_drv;
+    lv_disp_drv_init(&disp_drv);
+    disp_drv.hor_res = HOR_RES;
+    disp_drv.ver_res = VER_RES;
+    disp_drv.flush_cb = flush_cb;
+    disp_drv.draw_buf = &draw_buf;
+    lv_disp_drv_register(&disp_drv);
+    create_screens();
+
+    for (size_t i = 0; i < sizeof(screens) / sizeof(screens[0]); i++) {{
+        lv_scr_load(*screens[i].screen);
+        lv_obj_invalidate(*screens[i].screen);
+        lv_refr_now(NULL);
+        const void *pixels = frame;
+        if (ROTATION != 0) {{
+            rotate_copy_pixel((const uint16_t *)frame, rotated, 0, 0, HOR_RES - 1, VER_RES - 1, HOR_RES, VER_RES, ROTATION);
+            pixels = rotated;
+        }}
+        char path[512];
+        snprintf(path, sizeof(path), "%s/%s.raw", directory, screens[i].name);
+        FILE *f = fopen(path, "wb");
+        if (f == NULL || fwrite(pixels, sizeof(frame), 1, f) != 1) {{
+            fprintf(stderr, "Could not write %s\\n", path);
+            return 1;
+        }}
+        fclose(f);
+    }}
+    return 0;
+}}
+"""
+
+
+def synthetic_bitmap(name, width, height, opaque):
+    """
+    Creates a bitmap of an EEZ-Studio project with a pattern that looks
+    different in every orientation.
+
+    Args:
+        name: Name of the bitmap.
+        width: Width in pixels.
+        height: Height in pixels.
+        opaque: Without alpha channel (bpp 24), else with a transparent corner (bpp 32).
+
+    Returns:
+        dict: The bitmap, with the PNG embedded as data URL.
+    """
+    numpy, Image = convert_ui_images.load_image_libraries()
+    y, x = numpy.mgrid[0:height, 0:width]
+    rgba = numpy.empty((height, width, 4), dtype=numpy.uint8)
+    rgba[..., 0] = x * 255 // max(width - 1, 1)
+    rgba[..., 1] = y * 255 // max(height - 1, 1)
+    rgba[..., 2] = (x * 7 + y * 3) % 256
+    rgba[..., 3] = 0xFF
+    if not opaque:
+        # Transparent top-right triangle with a soft edge
+        rgba[..., 3] = numpy.clip((y * width - x * height) * 4 // max(width, 1) + 128, 0, 255)
+    output = io.BytesIO()
+    Image.fromarray(rgba if not opaque else rgba[..., :3]).save(output, "PNG")
+    return {"name": name, "bpp": 32 if not opaque else 24,
+            "image": "data:image/png;base64," + base64.b64encode(output.getvalue()).decode("ascii")}
+
+
+def synthetic_project():
+    """
+    Creates an EEZ-Studio project with the build files of the example project
+    and upright screens made of the widgets and styles that can be rotated:
+    panels with asymmetric paddings, borders and outlines, a named style, sizes
+    in % and content, and opaque and transparent images.
+
+    Returns:
+        dict: The project.
+    """
+    project = copy.deepcopy(generate_eez_ui.load_project(EXAMPLE_PROJECT))
+    general = project["settings"]["general"]
+    general["displayWidth"], general["displayHeight"] = SYNTHETIC_DISPLAY
+    project["bitmaps"] = [synthetic_bitmap("Arrow", 48, 32, opaque=False), synthetic_bitmap("Photo", 120, 90, opaque=True)]
+    project["lvglStyles"] = {"styles": [{"name": "Card", "definition": {"MAIN": {"DEFAULT": {
+        "bg_color": "#2a3440", "pad_left": 6, "pad_top": 20, "pad_right": 12, "pad_bottom": 2,
+        "border_side": "BOTTOM", "border_width": 4, "border_color": "#e0a020", "radius": 10,
+    }}}}]}
+    content = ("px", "px", "content", "content")
+    panel = synthetic_widget(
+        "LVGLPanelWidget", 20, 30, 200, 120,
+        styles={"bg_color": "#304860", "radius": 12, "border_width": 3, "border_color": "#80c0ff",
+                "border_side": "LEFT", "pad_left": 4, "pad_top": 16, "pad_right": 8, "pad_bottom": 2},
+        children=[
+            synthetic_widget("LVGLContainerWidget", 10, 5, 60, 40,
+                             styles={"bg_color": "#c04040", "bg_opa": 255, "radius": 6, "outline_width": 2,
+                                     "outline_pad": 2, "outline_color": "#ffffff"}),
+            synthetic_widget("LVGLImageWidget", 90, 10, 0, 0, content, image="Arrow"),
+        ],
+    )
+    card = synthetic_widget(
+        "LVGLContainerWidget", 30, 400, 180, 250, style={"useStyle": "Card"},
+        children=[synthetic_widget("LVGLPanelWidget", 0, 0, 100, 50, ("px", "px", "%", "%"),
+                                   styles={"bg_color": "#609040", "radius": 0, "border_width": 0})],
+    )
+    screens = [
+        [panel, card,
+         synthetic_widget("LVGLPanelWidget", 240, 200, 50, 200, ("px", "px", "%", "px"),
+                          styles={"bg_color": "#a0a0c0", "radius": 30, "border_width": 1}),
+         synthetic_widget("LVGLImageWidget", 300, 600, 120, 90, image="Photo")],
+        [synthetic_widget("LVGLImageWidget", 0, 0, 0, 0, content, image="Photo"),
+         synthetic_widget("LVGLPanelWidget", 400, 700, 70, 90,
+                          styles={"bg_color": "#f0f0f0", "radius": 35, "outline_width": 3, "outline_color": "#40a040"})],
+    ]
+    project["userPages"] = []
+    for index, children in enumerate(screens):
+        root = synthetic_widget("LVGLScreenWidget", 0, 0, *SYNTHETIC_DISPLAY, styles={"bg_color": "#101418"},
+                                children=children)
+        project["userPages"].append({"name": f"Screen {index}", "components": [root]})
+    return project
+
+
+def rotate_function():
+    """
+    Returns the source of rotate_copy_pixel() of the LVGL port.
+    """
+    with open(LVGL_PORT_SOURCE, "r", encoding="utf-8") as f:
+        match = ROTATE_FUNCTION_RE.search(f.read())
+    if match is None:
+        print(f"ERROR: rotate_copy_pixel() not found in '{LVGL_PORT_SOURCE}'.")
+        sys.exit(1)
+    return match.group(0)
+
+
+def write_ui(project, rotation, ui_dir):
+    """
+    Generates the UI files of a project and converts its bitmaps, both in a rotation.
+
+    Args:
+        project: The parsed project.
+        rotation: Rotation in degrees.
+        ui_dir: Directory the files are written to.
+    """
+    files, warnings = generate_eez_ui.generate_ui(project, rotation=rotation)
+    for warning in warnings:
+        print(f"Warning: {warning}")
+    os.makedirs(ui_dir)
+    for name, content in files.items():
+        with open(os.path.join(ui_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+    project_file = os.path.join(ui_dir, "project.eez-project")
+    with open(project_file, "w", encoding="utf-8") as f:
+        f.write(json.dumps(project))
+    result = convert_ui_images.convert_images(convert_ui_images.project_images(project_file), ui_dir, rotation=rotation)
+    for name, error in result["failed"]:
+        print(f"ERROR: Could not convert '{name}': {error}")
+        sys.exit(1)
+
+
+def render_screens(ui_dir, build_dir, library, width, height, rotation):
+    """
+    Builds the harness with the UI files of a directory, draws every screen
+    and rotates the frames like the flush of the LVGL port.
+
+    Args:
+        ui_dir: Directory with the UI files.
+        build_dir: Build directory with lv_conf.h.
+        library: Path of liblvgl.a.
+        width: Horizontal resolution the screens are drawn with.
+        height: Vertical resolution.
+        rotation: Degrees rotate_copy_pixel() rotates the frames by, 0 keeps them.
+
+    Returns:
+        dict: Screen name -> frame as bytes.
+    """
+    with open(os.path.join(ui_dir, "screens.h"), "r", encoding="utf-8") as f:
+        names = re.findall(r"^void create_screen_(\w+)\(\);", f.read(), re.M)
+    harness = HARNESS_TEMPLATE.format(
+        width=width, height=height, rotation=rotation, rotate_function=rotate_function(),
+        screens="\n".join(f"    {{ \"{name}\", &objects.{name} }}," for name in names),
+    )
+    harness_file = os.path.join(ui_dir, "rotation_harness.c")
+    with open(harness_file, "w", encoding="utf-8") as f:
+        f.write(harness)
+    sources = [harness_file] + [os.path.join(ui_dir, file) for file in sorted(os.listdir(ui_dir))
+                                if file in ("screens.c", "styles.c", "images.c") or re.fullmatch(r"ui_image_\w+\.c", file)]
+    binary = os.path.join(ui_dir, "rotation_harness")
+    command = [CC, *CFLAGS, f"-I{build_dir}", f"-I{LVGL_DIR}", f"-I{ui_dir}", *sources, library, "-lm", "-o", binary]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(f"ERROR: Building '{binary}' failed.")
+        sys.exit(1)
+    result = subprocess.run([binary, ui_dir], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(f"ERROR: '{binary}' failed with exit code {result.returncode}")
+        sys.exit(1)
+    frames = {}
+    for name in names:
+        with open(os.path.join(ui_dir, f"{name}.raw"), "rb") as f:
+            frames[name] = f.read()
+    return frames
+
+
+def compare_frames(upright, rotated, width):
+    """
+    Compares the frames of the upright screens, rotated by the flush, with the
+    frames of the screens generated rotated.
+
+    Args:
+        upright: Screen name -> frame of the upright screens after rotate_copy_pixel().
+        rotated: Screen name -> frame of the rotated screens.
+        width: Width of the frames in pixels (of the panel).
+
+    Returns:
+        bool: True if every frame is pixel-identical.
+    """
+    numpy, _ = convert_ui_images.load_image_libraries()
+    identical = True
+    for name, frame in upright.items():
+        expected = numpy.frombuffer(frame, dtype=numpy.uint16)
+        actual = numpy.frombuffer(rotated[name], dtype=numpy.uint16)
+        different = numpy.flatnonzero(expected != actual)
+        if len(different):
+            identical = False
+            y, x = divmod(int(different[0]), width)
+            print(f"  {name:<12} {len(different)} pixels differ, the first at ({x}, {y})")
+        else:
+            print(f"  {name:<12} identical ({len(expected)} pixels)")
+    return identical
+
+
+def main():
+    """
+    Main function to run the check with the given arguments.
+    """
+    parser = argparse.ArgumentParser(description='Check with LVGL built for the host that screens generated rotated '
+                                                 '(generate_eez_ui.py --rotation) draw the same pixels as the upright '
+                                                 'screens rotated by rotate_copy_pixel() of the LVGL port')
+    parser.add_argument('project', nargs='?', default=None, help='.eez-project file (default: a synthetic project of every rotatable widget)')
+    parser.add_argument('-r', '--rotation', type=int, choices=generate_eez_ui.ROTATIONS[1:], action='append',
+                        help='Rotation to check, can be repeated (default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of parallel compilers')
+    parser.add_argument('--build-dir', default=DEFAULT_BUILD_DIR, help='Directory LVGL is built in and reused from')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated files and frames')
+    args = parser.parse_args()
+
+    try:
+        convert_ui_images.load_image_libraries()
+    except ImportError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    project = generate_eez_ui.load_project(args.project) if args.project else synthetic_project()
+    general = project["settings"]["general"]
+    width, height = general["displayWidth"], general["displayHeight"]
+    library = build_lvgl(args.build_dir, args.jobs)
+
+    workspace = tempfile.mkdtemp(prefix="eez_rotation_")
+    identical = True
+    try:
+        write_ui(project, 0, os.path.join(workspace, "upright"))
+        for rotation in args.rotation or generate_eez_ui.ROTATIONS[1:]:
+            try:
+                write_ui(project, rotation, os.path.join(workspace, str(rotation)))
+            except ValueError as e:
+                print(f"ERROR: {e}")
+                sys.exit(1)
+            panel = (height, width) if rotation != 180 else (width, height)
+            print(f"\nRotation {rotation}: {width} x {height} upright, {panel[0]} x {panel[1]} rotated")
+            upright = render_screens(os.path.join(workspace, "upright"), args.build_dir, library, width, height, rotation)
+            rotated = render_screens(os.path.join(workspace, str(rotation)), args.build_dir, library, *panel, 0)
+            identical = compare_frames(upright, rotated, panel[0]) and identical
+    finally:
+        if args.keep:
+            print(f"\nFiles kept in {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+    if not identical:
+        print("\nERROR: The rotated screens don't draw the same pixels.")
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()